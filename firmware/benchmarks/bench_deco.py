@@ -0,0 +1,98 @@
+"""Benchmark du moteur de décompression ZHL-16C.
+
+Compare, pour des profils de 1k, 10k et 100k mesures à 5 Hz :
+* le rejeu complet en Python pur (`buehlmann_zhl16c_ndl_palier`) ;
+* l'intégration incrémentale (`TissueState.advance`, une mesure à la fois) ;
+* l'intégration vectorisée d'un profil complet (`integrate_profile`).
+Mesure aussi la latence du calcul du NDL (budget : 2 ms par mesure sur la cible).
+
+Usage : python benchmarks/bench_deco.py [--repeat N]
+"""
+
+import argparse, math, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.utils import TissueState, buehlmann_zhl16c_ndl_palier  # noqa: E402
+from utils.deco_numpy import integrate_profile  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+PERIOD = 0.2  # s, période d'échantillonnage du thread capteurs
+AIR = {"O2": 0.21, "N2": 0.79, "He": 0.0}
+
+
+def make_profile(n):
+    """Profil synthétique : descente, fond ondulé autour de 30 m, remontée."""
+    times, depths = [], []
+    for i in range(n):
+        phase = i / n
+        if phase < 0.1:
+            depth = 30.0 * phase / 0.1
+        elif phase < 0.8:
+            depth = 30.0 + 2.0 * math.sin(i / 50.0)
+        else:
+            depth = 30.0 * (1.0 - phase) / 0.2
+        times.append(i * PERIOD)
+        depths.append(depth)
+    return times, depths
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(n, repeat):
+    times, depths = make_profile(n)
+    profile = [
+        {"t": t, "timestamp": f"{t:012.1f}", "profondeur_m": d}
+        for t, d in zip(times, depths)
+    ]
+
+    def incremental():
+        state = TissueState(AIR)
+        for t, d in zip(times, depths):
+            state.advance(t, d)
+        state.ceiling()
+
+    results = {
+        "python": best_of(repeat, lambda: buehlmann_zhl16c_ndl_palier(profile, AIR)),
+        "incremental": best_of(repeat, incremental),
+        "numpy": best_of(repeat, lambda: integrate_profile(times, depths, AIR)),
+    }
+    return results
+
+
+def bench_ndl(repeat):
+    """Latence (s) d'un calcul de NDL, à l'air et au trimix."""
+    results = {}
+    for name, gaz in (("air", AIR), ("trimix", {"O2": 0.21, "N2": 0.44, "He": 0.35})):
+        state = TissueState(gaz)
+        state.advance(0.0, 0.0)
+        state.advance(90.0, 30.0)
+        results[name] = best_of(repeat, lambda: [state.ndl() for _ in range(100)]) / 100
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mesures':>8} {'python (ms)':>12} {'incr. (ms)':>12} {'numpy (ms)':>12}")
+    for n in SIZES:
+        r = bench(n, args.repeat)
+        print(
+            f"{n:>8} {r['python'] * 1e3:>12.1f} {r['incremental'] * 1e3:>12.1f} "
+            f"{r['numpy'] * 1e3:>12.2f}  (x{r['python'] / r['numpy']:.0f})"
+        )
+    for name, latency in bench_ndl(args.repeat).items():
+        print(f"NDL {name}: {latency * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
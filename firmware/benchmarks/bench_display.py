@@ -0,0 +1,114 @@
+"""Benchmark de la conversion RGB565 et de l'écriture dans le framebuffer.
+
+Compare le débit (images/s) de :
+* l'ancienne conversion pixel par pixel en Python suivie de seek(0) + write ;
+* la conversion NumPy écrite directement dans un framebuffer projeté (mmap) ;
+* la mise à jour partielle (zones modifiées + diff des lignes) quand seuls
+  l'heure et la profondeur changent, avec le volume écrit par image.
+Le framebuffer est simulé par un fichier temporaire de la taille de /dev/fb1.
+
+Usage : python benchmarks/bench_display.py [--frames N]
+"""
+
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from display.framebuffer import Framebuffer  # noqa: E402
+from display.screens.general_screen import GeneralScreen  # noqa: E402
+from utils.utils import FB_HEIGHT, FB_WIDTH  # noqa: E402
+
+
+def legacy_rgb565(img):
+    """Conversion d'origine, pixel par pixel."""
+    arr = bytearray()
+    for r, g, b in img.getdata():
+        rgb = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        arr.append((rgb >> 8) & 0xFF)
+        arr.append(rgb & 0xFF)
+    return bytes(arr)
+
+
+def sample_image():
+    screen = GeneralScreen()
+    for name in screen.fields:
+        if name.startswith("val_"):
+            screen.modify_field(name, "12.34")
+    return screen.generate_image()
+
+
+def changing_screen():
+    """Écran général dont seuls l'heure et la profondeur changent à chaque image."""
+    screen = GeneralScreen()
+    for name in screen.fields:
+        if name.startswith("val_"):
+            screen.modify_field(name, "12.34")
+    screen.generate_image()
+    ticks = iter(range(10**9))
+
+    def next_image():
+        i = next(ticks)
+        screen.modify_field("val_time", f"{i // 60 % 1000:03d}:{i % 60:02d}")
+        screen.modify_field("val_depth", f"{12 + i % 10 / 10:.1f}")
+        img = screen.generate_image()
+        return img, screen.dirty_rects
+
+    return next_image
+
+
+def fps(frames, func):
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    img = sample_image()
+    with tempfile.NamedTemporaryFile() as tmp:
+        tmp.write(bytes(FB_WIDTH * FB_HEIGHT * 2))
+        tmp.flush()
+
+        with open(tmp.name, "r+b") as fb:
+
+            def before():
+                fb.seek(0)
+                fb.write(legacy_rgb565(img))
+
+            fps_before = fps(max(1, args.frames // 10), before)
+
+        framebuffer = Framebuffer(tmp.name, FB_WIDTH, FB_HEIGHT)
+
+        def full():
+            framebuffer.invalidate()
+            framebuffer.show(img)
+
+        fps_after = fps(args.frames * 10, full)
+        assert framebuffer.mmap[:] == legacy_rgb565(img)
+
+        next_image = changing_screen()
+        framebuffer.show(next_image()[0])
+        framebuffer.bytes_written = framebuffer.frames = 0
+        fps_partial = fps(args.frames * 10, lambda: framebuffer.show(*next_image()))
+        img, _ = next_image()
+        framebuffer.show(img)
+        assert framebuffer.mmap[:] == legacy_rgb565(img)
+        per_frame = framebuffer.bytes_written / framebuffer.frames
+        framebuffer.close()
+
+    print(f"avant  (Python + write) : {fps_before:8.1f} images/s")
+    print(f"après  (NumPy + mmap)   : {fps_after:8.1f} images/s")
+    print(f"gain                    : x{fps_after / fps_before:.0f}")
+    print(
+        f"partiel (zones + diff)  : {fps_partial:8.1f} images/s, "
+        f"{per_frame:.0f} octets/image sur {FB_WIDTH * FB_HEIGHT * 2} "
+        f"({per_frame * 10 / 1024:.1f} Kio/s à 10 Hz)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark du cache de glyphes pour les champs numériques.
+
+Compare le temps de rendu d'une image de l'écran général (`generate_image`) :
+* avec FreeType pour chaque `draw.text` (cache de glyphes désactivé) ;
+* avec le cache de glyphes pré-rastérisés (`GLYPHS`).
+Deux cas : rendu complet (changement d'écran) et rendu partiel typique (toutes
+les valeurs changent, indicateurs figés dans la couche statique).
+
+Usage : python benchmarks/bench_glyphs.py [--frames N]
+"""
+
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import display.screens.template_screen as template_screen  # noqa: E402
+from display.screens.general_screen import GeneralScreen  # noqa: E402
+from utils.utils import GLYPHS  # noqa: E402
+
+
+def fill_values(screen, i):
+    screen.modify_field("val_time", f"12:{i // 60 % 60:02d}:{i % 60:02d}")
+    screen.modify_field("val_battery", f"{i % 100:02d}%")
+    screen.modify_field("val_pressure", f"{200 - i % 200:03d}")
+    screen.modify_field("val_ndl", f"{99 - i % 99:02d}")
+    screen.modify_field("val_depth", f"{12 + i % 100 / 100:.2f}")
+    screen.modify_field("val_updown", f"↓ {i % 20:02d}")
+    screen.modify_field("val_temp", f"{18 + i % 10 / 10:.2f}")
+    screen.modify_field("val_mod", "56")
+    screen.modify_field("val_palier", "-")
+    screen.modify_field("val_timer", f"{i // 60:03d}:{i % 60:02d}")
+
+
+def frame_time(frames, full):
+    """Temps moyen (s) de génération d'une image."""
+    screen = GeneralScreen()
+    fill_values(screen, 0)
+    screen.generate_image()
+    start = time.perf_counter()
+    for i in range(1, frames + 1):
+        fill_values(screen, i)
+        if full:
+            screen.invalidate()
+        screen.generate_image()
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, full in (("complet", True), ("partiel", False)):
+        template_screen.GLYPHS = {}
+        freetype = frame_time(args.frames, full)
+        template_screen.GLYPHS = GLYPHS
+        atlas = frame_time(args.frames, full)
+        print(
+            f"rendu {name:8}: FreeType {freetype * 1e3:6.2f} ms, "
+            f"glyphes {atlas * 1e3:6.2f} ms  (x{freetype / atlas:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Configuration de la suite pytest-benchmark (`pytest benchmarks/`).
+
+Les références sont propres à chaque machine et ne sont pas versionnées : elles
+sont stockées dans `benchmarks/baselines/<hôte>-<architecture>/` (ou
+`benchmarks/baselines/$BENCHMARK_MACHINE/`, nom fixe utilisé par la CI dont les
+hôtes changent à chaque exécution). Avec `--benchmark-compare`, un chemin dont la
+médiane régresse au-delà de la dispersion mesurée entre les `KEEP_RUNS` dernières
+références (avec une marge) fait échouer la suite, sauf si
+`--benchmark-compare-fail` est donné explicitement. Il faut au moins `MIN_RUNS`
+références pour estimer cette dispersion ; en deçà, la comparaison est affichée
+sans seuil.
+"""
+
+import glob, json, math, os, platform, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+MACHINE = os.environ.get("BENCHMARK_MACHINE") or (
+    f"{platform.node()}-{platform.machine()}"
+)
+BASELINES = os.path.join(HERE, "baselines", MACHINE)
+COMPARE_FIELD = "median"
+MIN_RUNS = 3  # Références nécessaires pour estimer la dispersion
+KEEP_RUNS = 10  # Références les plus récentes prises en compte
+FAIL_MARGIN = 1.5  # Seuil = dispersion maximale observée x marge
+MIN_FAIL_PCT = 10
+
+
+def run_to_run_spread(path, field=COMPARE_FIELD):
+    """Plus grand écart relatif (max / min - 1) de `field` entre les `KEEP_RUNS`
+    dernières références.
+
+    @return: float, ou None s'il y a moins de `MIN_RUNS` références.
+    """
+    runs = sorted(glob.glob(os.path.join(path, "*", "*.json")), key=os.path.basename)
+    values = {}
+    for run in runs[-KEEP_RUNS:]:
+        with open(run, encoding="utf-8") as f:
+            for bench in json.load(f)["benchmarks"]:
+                values.setdefault(bench["fullname"], []).append(bench["stats"][field])
+    spreads = [max(v) / min(v) - 1 for v in values.values() if len(v) >= MIN_RUNS]
+    return max(spreads) if spreads else None
+
+
+def pytest_configure(config):
+    option = config.option
+    if not hasattr(option, "benchmark_storage"):
+        return  # pytest-benchmark absent : les modules sont ignorés
+    if option.benchmark_storage == "file://./.benchmarks":
+        option.benchmark_storage = "file://" + BASELINES
+    if option.benchmark_compare and not option.benchmark_compare_fail:
+        from pytest_benchmark.utils import parse_compare_fail
+
+        spread = run_to_run_spread(BASELINES)
+        if spread is None:
+            print(
+                f"Benchmarks : moins de {MIN_RUNS} références, comparaison sans seuil"
+            )
+            return
+        pct = max(MIN_FAIL_PCT, math.ceil(spread * FAIL_MARGIN * 100))
+        option.benchmark_compare_fail = [parse_compare_fail(f"{COMPARE_FIELD}:{pct}%")]
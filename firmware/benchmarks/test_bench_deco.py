@@ -0,0 +1,29 @@
+"""Benchmarks pytest du moteur de décompression ZHL-16C."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bench_deco import AIR, make_profile  # noqa: E402
+from utils.utils import TissueState, buehlmann_zhl16c_ndl_palier  # noqa: E402
+
+
+@pytest.mark.parametrize("n", [1_000, 10_000, 100_000])
+def test_buehlmann_full_profile(benchmark, n):
+    times, depths = make_profile(n)
+    profile = [
+        {"t": t, "timestamp": f"{t:012.1f}", "profondeur_m": d}
+        for t, d in zip(times, depths)
+    ]
+    rounds = max(3, 100_000 // n)
+    result = benchmark.pedantic(
+        buehlmann_zhl16c_ndl_palier, args=(profile, AIR), rounds=rounds
+    )
+    assert len(result) == 3
+
+
+def test_tissue_state_ndl(benchmark):
+    state = TissueState(AIR)
+    state.advance(0.0, 0.0)
+    state.advance(90.0, 30.0)
+    assert benchmark(state.ndl) > 0
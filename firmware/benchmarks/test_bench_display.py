@@ -0,0 +1,61 @@
+"""Benchmarks pytest du rendu des écrans et de la conversion RGB565."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from display.display_manager import DisplayManager  # noqa: E402
+from display.screens.config_screen import ConfigScreen  # noqa: E402
+from display.screens.exit_screen import ExitScreen  # noqa: E402
+from display.screens.general_screen import GeneralScreen  # noqa: E402
+from display.screens.palier_screen import PalierScreen  # noqa: E402
+from utils.sample import DiveFrame  # noqa: E402
+
+FRAME = DiveFrame(18.5, 23.47, 90.0, mod=56, ndl="12", palier="3", palier_time="2")
+SCREENS = {
+    "config": ConfigScreen,
+    "general": GeneralScreen,
+    "palier": PalierScreen,
+    "exit": ExitScreen,
+}
+
+
+def make_screen(name):
+    screen = SCREENS[name]()
+    if name == "config":
+        screen.update_values()
+    else:
+        screen.update_values(FRAME, "012:34")
+    return screen
+
+
+@pytest.mark.parametrize("name", list(SCREENS))
+def test_generate_image_full(benchmark, name):
+    screen = make_screen(name)
+
+    def render():
+        screen.invalidate()  # Image entière redessinée
+        return screen.generate_image()
+
+    img = benchmark(render)
+    assert img.size == (480, 320)
+
+
+@pytest.mark.parametrize("name", ["general", "palier"])
+def test_generate_image_depth_change(benchmark, name):
+    screen = make_screen(name)
+    screen.generate_image()
+    depths = iter(range(10**9))
+
+    def render():
+        screen.modify_field("val_depth", f"{next(depths) % 4000 / 100:.2f}")
+        return screen.generate_image()
+
+    benchmark(render)
+
+
+def test_image_to_rgb565(benchmark):
+    img = make_screen("general").generate_image()
+    dm = DisplayManager.__new__(DisplayManager)
+    data = benchmark(dm.image_to_rgb565, img)
+    assert len(data) == 480 * 320 * 2
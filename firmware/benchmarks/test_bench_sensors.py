@@ -0,0 +1,65 @@
+"""Benchmarks pytest du chemin d'acquisition : calcul MS5837, journal, vitesse."""
+
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import sensors.ms5837 as ms5837  # noqa: E402
+import utils.utils as utils  # noqa: E402
+from utils.dive_log import DiveLogWriter  # noqa: E402
+from utils.sample import Sample  # noqa: E402
+from utils.vertical_speed import VerticalSpeedEstimator  # noqa: E402
+
+LOG_SIZES = [1_000, 10_000, 100_000]
+
+
+def make_sample(i):
+    return Sample(
+        t=i * 0.2,
+        epoch=1_700_000_000.0 + i * 0.2,
+        temperature_c=18.5,
+        pression_mbar=3012.4,
+        profondeur_m=20.0 + (i % 50) / 100,
+        profondeur_brute_m=20.0 + (i % 50) / 100,
+        azimut_deg=123.4,
+    )
+
+
+def test_ms5837_calculate(benchmark):
+    sensor = ms5837.MS5837_30BA(Mock())
+    sensor._C = [0, 34982, 36352, 20328, 22354, 26646, 26146]
+    sensor._D1, sensor._D2 = 4958179, 6815414  # Exemple du datasheet
+    benchmark(sensor._calculate)
+    assert sensor.pressure() > 0
+
+
+@pytest.mark.parametrize("n", LOG_SIZES)
+def test_log_measurement(benchmark, tmp_path, n):
+    """Ajout d'une mesure (`SensorsManager.log_measurement`) à un journal de `n`
+    lignes."""
+    log = DiveLogWriter(str(tmp_path / "mesures.json"))
+    for i in range(n):
+        log.write(make_sample(i).to_record())
+    log.flush()
+    samples = iter(range(n, 10**9))
+    benchmark(lambda: log.write(make_sample(next(samples)).to_record()))
+    log.close()
+
+
+@pytest.mark.parametrize("n", LOG_SIZES)
+def test_up_down(benchmark, monkeypatch, n):
+    """Vitesse verticale affichée après `n` mesures (remplace up_down_from_file)."""
+    vspeed = VerticalSpeedEstimator()
+    monkeypatch.setattr(utils, "VSPEED", vspeed)
+    for i in range(n):
+        vspeed.update(i * 0.2, 10.0 + i * 0.01)
+    ticks = iter(range(n, 10**9))
+
+    def update():
+        i = next(ticks)
+        vspeed.update(i * 0.2, 10.0 + i * 0.01)
+        return utils.up_down()
+
+    assert benchmark(update).startswith("↓")  # Descente à 3 m/min
@@ -1,21 +1,26 @@
 import time, threading
-import RPi.GPIO as GPIO
+
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None  # Hors Raspberry Pi : fournir `gpio` (ex. sim.gpio.SimGPIO)
 from display.screens.exit_screen import ExitScreen
-from display.screens.general_screen import GeneralScreen
-from utils.utils import CONF_OPT
+from utils.utils import CONF_OPT, DIAG_HOLD_S
 
 
 class ButtonManager:
     """Gestionnaire des boutons GPIO pour l'affichage et les capteurs."""
 
-    def __init__(self, display, sensors):
+    def __init__(self, display, sensors, gpio=None):
         """Initialise le ButtonManager.
 
         @param display: instance responsable de l'interface utilisateur (écrans, méthodes press_*)
         @param sensors: instance gérant les capteurs (start/stop, calibrations, état)
+        @param gpio: module GPIO à utiliser (par défaut RPi.GPIO)
         """
         # Initiate button PIN const
         self.PINS = [5, 6, 13, 26]
+        self.back_since = None  # Début de l'appui en cours sur BACK (appui long)
 
         # Initiate threads
         self.stop_thread = True
@@ -24,6 +29,7 @@ class ButtonManager:
         # Retrieve parameters
         self.display = display
         self.sensors = sensors
+        self.gpio = gpio if gpio is not None else GPIO
 
     def action(self, channel):
         """Callback exécuté lorsqu'un événement GPIO est détecté sur une broche.
@@ -43,12 +49,14 @@ class ButtonManager:
                             self.sensors.start()
                             self.display.dive_mode()
                     case CONF_OPT.CMP_CL:
-                        self.sensors.calibrate_qmc5883l()
-                        self.display.calibrated(self.sensors.is_calibrated())
+                        self.sensors.calibrate_qmc5883l(
+                            on_progress=self.display.calibration_progress,
+                            on_done=self.display.calibrated,
+                        )
                     case CONF_OPT.BLE_CN:
                         print("Bluetooth not implemented")
                     case False:
-                        self.display.screen = GeneralScreen()
+                        self.display.resume_dive()
         elif channel == 6:
             self.display.press_down()
 
@@ -56,20 +64,38 @@ class ButtonManager:
             self.display.press_up()
 
         elif channel == 26:
+            self.back_since = time.monotonic()
             self.display.press_back()
 
+    def check_long_press(self):
+        """Signale l'appui long sur BACK s'il est maintenu `DIAG_HOLD_S` secondes."""
+        if self.back_since is None:
+            return
+        try:
+            held = self.gpio.input(26) == self.gpio.HIGH
+        except Exception as e:
+            print("BM input exception:", e)
+            held = False
+        if not held:
+            self.back_since = None
+        elif time.monotonic() - self.back_since >= DIAG_HOLD_S:
+            self.back_since = None
+            self.display.press_back_long()
+
     def job(self):
         """Boucle d'arrière-plan exécutée par `thread` pour surveiller les GPIO."""
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.PINS, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+        gpio = self.gpio
+        gpio.setmode(gpio.BCM)
+        gpio.setup(self.PINS, gpio.IN, pull_up_down=gpio.PUD_DOWN)
         for pin in self.PINS:
-            GPIO.remove_event_detect(pin)  # Clean previous config
-            GPIO.add_event_detect(
-                pin, GPIO.RISING, callback=self.action, bouncetime=300
+            gpio.remove_event_detect(pin)  # Clean previous config
+            gpio.add_event_detect(
+                pin, gpio.RISING, callback=self.action, bouncetime=300
             )
 
         while not self.stop_thread:
             time.sleep(0.1)
+            self.check_long_press()
 
     def start(self):
         """Démarre le thread de surveillance des boutons.
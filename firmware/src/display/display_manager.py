@@ -1,35 +1,109 @@
 import time, threading
+import numpy as np
 
 from display.screens.exit_screen import ExitScreen
 from display.screens.general_screen import GeneralScreen
 from display.screens.config_screen import ConfigScreen
+from display.screens.diag_screen import DiagScreen
 from display.screens.palier_screen import PalierScreen
-from utils.utils import BUTTON, CONF_OPT, init_display
+from display.framebuffer import rgb565
+from utils.metrics import METRICS
+from utils.utils import (
+    BUTTON,
+    CONF_OPT,
+    DISPLAY_MAX_INTERVAL,
+    DISPLAY_MIN_INTERVAL,
+    init_display,
+)
 
 
 class DisplayManager:
-    """Gestionnaire central de l'affichage"""
+    """Gestionnaire central de l'affichage.
 
-    def __init__(self):
+    Un unique thread d'affichage vit pendant toute l'exécution ; changer d'écran
+    revient à remplacer `screen` sous `screen_lock`. Les écrans de plongée sont
+    créés une seule fois (`screens`) et reçoivent les dernières valeurs de plongée
+    au moment où ils deviennent actifs.
+
+    Le thread d'affichage dort tant qu'aucun champ de l'écran courant n'a changé :
+    il est réveillé par `TemplateScreen.changed`, au plus tôt `min_interval`
+    après l'image précédente et au plus tard après `max_interval`.
+
+    `display` (par défaut `init_display()`) est l'écran cible : un `Framebuffer`
+    ou, hors cible, un `VirtualFramebuffer`.
+
+    En configuration, un appui long sur BACK (`press_back_long`, détecté par
+    `ButtonManager`) ouvre l'écran de diagnostic caché (`DiagScreen`) ; BACK y
+    ramène à la configuration.
+    """
+
+    def __init__(
+        self,
+        min_interval=DISPLAY_MIN_INTERVAL,
+        max_interval=DISPLAY_MAX_INTERVAL,
+        display=None,
+    ):
         # Initiate Attributs
-        self.display = init_display()
+        self.display = display if display is not None else init_display()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
         self.screen = ConfigScreen()
+        self.screens = {
+            "general": GeneralScreen(),
+            "palier": PalierScreen(),
+            "exit": ExitScreen(),
+        }
+        self.values = None  # Dernières valeurs de plongée (frame, timer)
+        self.compas = CONF_OPT.CMP_NOT  # État du compas, conservé entre les écrans
         self.dive_start = None
         self.gaz_per = None
+        self.diag_return = None  # Écran de configuration masqué par le diagnostic
+        self.diag_metrics = False  # État de METRICS avant l'ouverture du diagnostic
 
         # Initiate Thread attributs
         self.screen_lock = threading.Lock()
         self.thread = None
         self.stop_thread = True
 
+    def switch_screen(self, screen):
+        """Active `screen` (à appeler avec `screen_lock` acquis).
+
+        L'écran est synchronisé avec les dernières valeurs puis entièrement
+        redessiné à la prochaine image ; le thread d'affichage est réveillé.
+        """
+        previous = self.screen
+        if screen is previous:
+            return
+        if self.values is not None and screen in self.screens.values():
+            screen.update_values(*self.values)
+        screen.invalidate()
+        self.screen = screen
+        previous.wake()
+
+    def update_values(self, frame=None, timer=None):
+        """Transmet les nouvelles valeurs à l'écran actif.
+
+        @param frame: DiveFrame - valeurs de plongée (None hors plongée).
+        @param timer: str - durée de plongée.
+        """
+        with self.screen_lock:
+            screen = self.screen
+            if frame is not None:
+                self.values = (frame, timer)
+        if frame is None:
+            screen.update_values()
+        else:
+            screen.update_values(frame, timer)
+
     def dive_mode(self):
-        """Passe en mode plongée"""
+        """Passe en mode plongée (écrans vidés des valeurs de la plongée précédente)"""
         with self.screen_lock:
             self.dive_start = time.time()
             self.gaz_per = self.screen.get_per() / 100
-            self.stop()
-            self.screen = GeneralScreen()
-            self.start()
+            self.values = None
+            for screen in self.screens.values():
+                screen.reset()
+            self.switch_screen(self.screens["general"])
 
     def is_in_dive_mode(self):
         return (
@@ -41,7 +115,14 @@ class DisplayManager:
     def config_mode(self):
         """Passe en mode configuration"""
         with self.screen_lock:
-            self.screen = ConfigScreen()
+            screen = ConfigScreen()
+            screen.compas = self.compas
+            self.switch_screen(screen)
+
+    def resume_dive(self):
+        """Quitte l'écran de sortie et revient à l'écran général."""
+        with self.screen_lock:
+            self.switch_screen(self.screens["general"])
 
     def dive_time(self):
         """Retourne la durée écoulée depuis le début de la plongée au format MM:SS."""
@@ -51,31 +132,62 @@ class DisplayManager:
 
     def calibrated(self, it_is):
         """Met à jour l'état du compas selon la calibration."""
-        if it_is:
-            self.screen.compas = CONF_OPT.CMP_OK
-        else:
-            self.screen.compas = CONF_OPT.CMP_NOT
+        with self.screen_lock:
+            self.compas = CONF_OPT.CMP_OK if it_is else CONF_OPT.CMP_NOT
+            if isinstance(self.screen, ConfigScreen):
+                self.screen.compas = self.compas
+                self.screen.compas_progress = None
+
+    def calibration_progress(self, fraction):
+        """Affiche l'avancement de la calibration du compas (0 à 1)."""
+        with self.screen_lock:
+            if isinstance(self.screen, ConfigScreen):
+                self.screen.compas_progress = fraction
 
     def press_back(self):
         """Traite la pression du bouton BACK selon le mode et l'écran courant."""
         with self.screen_lock:
             if self.is_in_dive_mode():
-                self.stop()
-                self.screen = ExitScreen()
-                self.start()
+                exit_screen = self.screens["exit"]
+                exit_screen.reset()
+                self.switch_screen(exit_screen)
+            elif isinstance(self.screen, DiagScreen):
+                self.close_diag()
             else:
                 self.screen.update(BUTTON.BACK_BUTTON)
 
+    def press_back_long(self):
+        """Appui long sur BACK : ouvre le diagnostic depuis la configuration."""
+        with self.screen_lock:
+            if isinstance(self.screen, ConfigScreen):
+                self.open_diag()
+
+    def open_diag(self):
+        """Affiche l'écran de diagnostic (à appeler avec `screen_lock` acquis).
+
+        L'instrumentation est activée le temps du diagnostic si elle ne l'était pas.
+        """
+        self.diag_return = self.screen
+        self.diag_metrics = METRICS.enabled
+        METRICS.enable()
+        self.switch_screen(DiagScreen())
+
+    def close_diag(self):
+        """Revient à l'écran de configuration (à appeler avec `screen_lock` acquis)."""
+        screen = self.diag_return
+        self.diag_return = None
+        METRICS.enable(self.diag_metrics)
+        screen.compas = self.compas
+        self.switch_screen(screen)
+
     def press_up(self):
         """Traite la pression du bouton UP et change l'écran si en mode plongée."""
         with self.screen_lock:
             if self.is_in_dive_mode() and not isinstance(self.screen, ExitScreen):
-                self.stop()
                 if isinstance(self.screen, GeneralScreen):
-                    self.screen = PalierScreen()
+                    self.switch_screen(self.screens["palier"])
                 elif isinstance(self.screen, PalierScreen):
-                    self.screen = GeneralScreen()
-                self.start()
+                    self.switch_screen(self.screens["general"])
             else:
                 self.screen.update(BUTTON.UP_BUTTON)
 
@@ -83,44 +195,58 @@ class DisplayManager:
         """Traite la pression du bouton DOWN et change l'écran si en mode plongée."""
         with self.screen_lock:
             if self.is_in_dive_mode() and not isinstance(self.screen, ExitScreen):
-                self.stop()
                 if isinstance(self.screen, GeneralScreen):
-                    self.screen = PalierScreen()
+                    self.switch_screen(self.screens["palier"])
                 else:
-                    self.screen = GeneralScreen()
-                self.start()
+                    self.switch_screen(self.screens["general"])
             else:
                 self.screen.update(BUTTON.DOWN_BUTTON)
 
     def press_enter(self):
         """Traite la pression du bouton ENTER et renvoie le résultat de l'action de l'écran."""
         with self.screen_lock:
-            return self.screen.update(BUTTON.ENTER_BUTTON)
+            result = self.screen.update(BUTTON.ENTER_BUTTON)
+            if result == CONF_OPT.CMP_CL:
+                self.compas = CONF_OPT.CMP_CL  # Jusqu'à `calibrated`
+            return result
 
     def image_to_rgb565(self, img):
-        """Convertit une image PIL en format RGB565 pour l'affichage."""
-        arr = bytearray()
-        for r, g, b in img.getdata():
-            rgb = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-            arr.append((rgb >> 8) & 0xFF)
-            arr.append(rgb & 0xFF)
-        return bytes(arr)
+        """Convertit une image PIL en format RGB565 (big-endian) pour l'affichage."""
+        return rgb565(np.asarray(img)).astype(">u2").tobytes()
 
     def update_display(self):
         with self.screen_lock:
-            img = self.screen.generate_image()
-        # Send image to buffer
-        self.display.seek(0)
-        self.display.write(self.image_to_rgb565(img))
+            with METRICS.timer("display.render"):
+                img = self.screen.generate_image()
+            dirty = self.screen.dirty_rects
+        if not dirty:
+            return  # Aucun champ n'a changé depuis la dernière image
+        # Send changed rows of the dirty rects to buffer
+        self.display.show(img, dirty)
+        METRICS.count("display.frames")
 
     def job(self):
         """Boucle principale du thread qui met à jour l'affichage."""
         while not self.stop_thread:
             try:
+                drawn_at = time.monotonic()
                 self.update_display()
-                time.sleep(0.1)
+                if time.monotonic() - drawn_at > self.min_interval:
+                    METRICS.count("display.overrun")  # Image hors budget
+                screen = self.screen
+                screen.wait_change(
+                    self.max_interval,
+                    lambda: self.stop_thread or self.screen is not screen,
+                )
+                if self.screen is not screen:
+                    continue  # Changement d'écran : affichage immédiat
+                # Regroupe les modifications rapprochées en une seule image
+                remaining = self.min_interval - (time.monotonic() - drawn_at)
+                if remaining > 0 and not self.stop_thread:
+                    time.sleep(remaining)
             except Exception as e:
                 print("DM job exception:", e)
+                time.sleep(self.min_interval)
 
     def start(self):
         """Démarre le thread de mise à jour de l'affichage."""
@@ -137,6 +263,7 @@ class DisplayManager:
         """Arrête le thread de mise à jour de l'affichage."""
         try:
             self.stop_thread = True
+            self.screen.wake()
             self.thread.join()
         except Exception as e:
             print("DM stop exception:", e)
@@ -0,0 +1,186 @@
+import mmap, time
+from collections import deque
+import numpy as np
+from PIL import Image
+from utils.metrics import METRICS
+
+
+def rgb565(pixels):
+    """Convertit un tableau RGB888 (h, w, 3) en tableau RGB565 (h, w) uint16."""
+    pixels = pixels.astype(np.uint16)
+    return (
+        ((pixels[..., 0] & 0xF8) << 8)
+        | ((pixels[..., 1] & 0xFC) << 3)
+        | (pixels[..., 2] >> 3)
+    )
+
+
+class Framebuffer:
+    """Accès au framebuffer de l'écran, projeté en mémoire (mmap).
+
+    `pixels` est une vue NumPy (hauteur, largeur) en RGB565 big-endian directement
+    sur la mémoire du framebuffer : y écrire met à jour l'écran sans copie
+    intermédiaire. Si le périphérique ne supporte pas mmap, `pixels` vaut None et
+    `write` retombe sur seek/write.
+
+    Une copie de la dernière image envoyée (`shadow`) permet de n'écrire que les
+    portions de lignes réellement modifiées. Avec `path` à None, aucun
+    périphérique n'est ouvert (voir `VirtualFramebuffer`).
+    """
+
+    def __init__(self, path, width, height):
+        # Initiate Attributs
+        self.width = width
+        self.height = height
+        self.size = width * height * 2
+        self.shadow = None  # Dernière image RGB565 écrite (None : inconnue)
+        self.bytes_written = 0
+        self.frames = 0
+        self.rate_start = time.monotonic()
+        self.rate_bytes = 0
+        self.file = None
+        self.mmap = None
+        self.pixels = None
+        if path is None:
+            return
+        self.file = open(path, "r+b")
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), self.size)
+            self.pixels = np.ndarray((height, width), dtype=">u2", buffer=self.mmap)
+        except Exception as e:
+            print(f"Framebuffer mmap exception ({e}), mode write")
+            self.mmap = None
+            self.pixels = None
+
+    def show(self, img, rects=None):
+        """Convertit une image PIL en RGB565 et écrit les zones modifiées.
+
+        @param rects: list - zones (x0, y0, x1, y1) à examiner ; par défaut l'écran
+                      entier. Dans chaque zone, seules les lignes qui diffèrent de
+                      l'image précédente sont écrites, réduites à leur étendue de
+                      colonnes modifiées.
+        @return: int - nombre d'octets écrits dans le framebuffer.
+        """
+        pixels = np.asarray(img)
+        if self.shadow is None:
+            with METRICS.timer("display.rgb565"):
+                self.shadow = rgb565(pixels)
+            with METRICS.timer("display.write"):
+                self.blit(self.shadow, 0, 0)
+            written = self.size
+        else:
+            if rects is None:
+                rects = [(0, 0, self.width, self.height)]
+            written = 0
+            for x0, y0, x1, y1 in rects:
+                written += self.update_rect(pixels, x0, y0, x1, y1)
+        self.bytes_written += written
+        self.rate_bytes += written
+        METRICS.count("display.bytes", written)
+        self.frames += 1
+        return written
+
+    def update_rect(self, pixels, x0, y0, x1, y1):
+        """Compare une zone à l'image précédente et écrit les plages modifiées."""
+        with METRICS.timer("display.rgb565"):
+            frame = rgb565(pixels[y0:y1, x0:x1])
+        previous = self.shadow[y0:y1, x0:x1]
+        diff = frame != previous
+        rows = np.flatnonzero(diff.any(axis=1))
+        if len(rows) == 0:
+            return 0
+        written = 0
+        # Regroupe les lignes modifiées consécutives en bandes
+        breaks = np.flatnonzero(np.diff(rows) > 1) + 1
+        for band in np.split(rows, breaks):
+            top, bottom = band[0], band[-1] + 1
+            cols = np.flatnonzero(diff[top:bottom].any(axis=0))
+            left, right = cols[0], cols[-1] + 1
+            tile = frame[top:bottom, left:right]
+            previous[top:bottom, left:right] = tile
+            with METRICS.timer("display.write"):
+                self.blit(tile, x0 + left, y0 + top)
+            written += tile.size * 2
+        return written
+
+    def blit(self, tile, x, y):
+        """Écrit un bloc RGB565 (h, w) à la position (x, y) du framebuffer."""
+        h, w = tile.shape
+        if self.pixels is not None:
+            self.pixels[y : y + h, x : x + w] = tile
+            return
+        data = tile.astype(">u2")
+        for row in range(h):
+            self.write(data[row].tobytes(), ((y + row) * self.width + x) * 2)
+
+    def invalidate(self):
+        """Oublie l'image précédente : la prochaine image sera écrite en entier."""
+        self.shadow = None
+
+    def bytes_per_second(self):
+        """Débit moyen (octets/s) depuis l'appel précédent ; remet la fenêtre à zéro."""
+        now = time.monotonic()
+        elapsed = now - self.rate_start
+        rate = self.rate_bytes / elapsed if elapsed > 0 else 0.0
+        self.rate_start = now
+        self.rate_bytes = 0
+        return rate
+
+    def write(self, data, offset=0):
+        """Écrit des octets bruts à la position `offset` du framebuffer."""
+        if self.mmap is not None:
+            self.mmap[offset : offset + len(data)] = data
+        else:
+            self.file.seek(offset)
+            self.file.write(data)
+
+    def close(self):
+        """Libère la projection mémoire et ferme le périphérique."""
+        if self.mmap is not None:
+            self.pixels = None
+            self.mmap.close()
+            self.mmap = None
+        if self.file is not None:
+            self.file.close()
+
+
+class VirtualFramebuffer(Framebuffer):
+    """Framebuffer en mémoire, pour la simulation et les tests hors cible.
+
+    Se comporte comme `Framebuffer` (mêmes écritures partielles, mêmes
+    compteurs) et enregistre en plus l'instant (`time.monotonic()`) et le
+    nombre d'octets de chaque image. Les `keep` dernières images RGB565 sont
+    conservées dans `images`.
+    """
+
+    def __init__(self, width, height, keep=0, history=100000):
+        super().__init__(None, width, height)
+        # Initiate Attributs
+        self.pixels = np.zeros((height, width), dtype=">u2")
+        self.frame_times = deque(maxlen=history)
+        self.frame_bytes = deque(maxlen=history)
+        self.images = deque(maxlen=keep)
+
+    def show(self, img, rects=None):
+        written = super().show(img, rects)
+        self.frame_times.append(time.monotonic())
+        self.frame_bytes.append(written)
+        if self.images.maxlen:
+            self.images.append(self.pixels.copy())
+        return written
+
+    def write(self, data, offset=0):
+        raw = self.pixels.view(np.uint8).reshape(-1)
+        raw[offset : offset + len(data)] = np.frombuffer(data, dtype=np.uint8)
+
+    def to_image(self):
+        """Retourne le contenu courant de l'écran en image PIL RGB."""
+        pixels = self.pixels.astype(np.uint16)
+        rgb = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        rgb[..., 0] = (pixels >> 8) & 0xF8
+        rgb[..., 1] = (pixels >> 3) & 0xFC
+        rgb[..., 2] = (pixels << 3) & 0xF8
+        return Image.fromarray(rgb, "RGB")
+
+    def close(self):
+        pass
@@ -0,0 +1,66 @@
+from PIL import Image, ImageDraw
+
+# Caractères des champs numériques (valeurs, heure, pourcentages, flèches)
+NUMERIC_CHARSET = "0123456789:.,-+%/ ↑↓"
+
+
+class GlyphAtlas:
+    """Cache de glyphes pré-rastérisés pour une police donnée.
+
+    Chaque caractère de `charset` est rastérisé une seule fois par FreeType en un
+    masque 8 bits ; un texte composé uniquement de ces caractères est ensuite
+    dessiné en plaquant les masques côte à côte (`ImageDraw.bitmap`), avec les
+    mêmes avances que FreeType. Les autres textes doivent passer par `draw.text`.
+    """
+
+    def __init__(self, font, charset=NUMERIC_CHARSET):
+        # Initiate Attributs
+        self.font = font
+        # char -> (masque ou None, (gauche, haut, droite, bas), avance)
+        self.glyphs = {}
+        try:
+            for char in charset:
+                left, top, right, bottom = font.getbbox(char)
+                mask = None
+                if right > left and bottom > top:
+                    mask = Image.new("L", (right - left, bottom - top), 0)
+                    ImageDraw.Draw(mask).text((-left, -top), char, font=font, fill=255)
+                self.glyphs[char] = (
+                    mask,
+                    (left, top, right, bottom),
+                    font.getlength(char),
+                )
+        except Exception as e:
+            print("GlyphAtlas exception:", e)
+            self.glyphs = {}
+
+    def covers(self, text):
+        """Indique si `text` peut être dessiné entièrement depuis le cache."""
+        return (
+            isinstance(text, str)
+            and text != ""
+            and all(char in self.glyphs for char in text)
+        )
+
+    def draw(self, draw, xy, text, fill="black"):
+        """Dessine `text` à la position `xy` (mêmes conventions que `draw.text`).
+
+        @return: tuple - zone (gauche, haut, droite, bas) relative à `xy`,
+                 équivalente à `font.getbbox(text)`.
+        """
+        x, y = xy
+        pen = 0.0
+        left = top = right = bottom = None
+        for char in text:
+            mask, (g_left, g_top, g_right, g_bottom), advance = self.glyphs[char]
+            offset = round(pen)
+            if mask is not None:
+                draw.bitmap((x + offset + g_left, y + g_top), mask, fill=fill)
+            if left is None:
+                left, top, right, bottom = g_left, g_top, g_right, g_bottom
+            else:
+                top = min(top, g_top)
+                right = max(right, offset + g_right)
+                bottom = max(bottom, g_bottom)
+            pen += advance
+        return (left, top, right, bottom)
@@ -16,6 +16,7 @@ class ConfigScreen(TemplateScreen):
         self.gaz_p = 21
         self.alarm = CONF_OPT.VM
         self.compas = CONF_OPT.CMP_NOT
+        self.compas_progress = None  # Avancement de la calibration (0 à 1)
         self.ble = CONF_OPT.BLE_NOT
 
         # Initiate Indicators
@@ -95,11 +96,17 @@ class ConfigScreen(TemplateScreen):
         else:
             self.alarm = self.alarm.next()
 
+    def compas_text(self):
+        """Texte du champ compas, avec l'avancement pendant la calibration."""
+        if self.compas == CONF_OPT.CMP_CL and self.compas_progress is not None:
+            return f"Calibration {int(self.compas_progress * 100):3d}%"
+        return self.compas.value
+
     def update_values(self):
         self.modify_field("val_gaz", self.gaz.value)
         self.modify_field("val_gaz_perc", str(self.gaz_p) + "%")
         self.modify_field("val_alarme", self.alarm.value)
-        self.modify_field("val_compas", self.compas.value)
+        self.modify_field("val_compas", self.compas_text())
         self.modify_field("val_ble", self.ble.value)
         self.modifiy_x_y("selector", self.phase.value)
 
@@ -0,0 +1,68 @@
+from display.screens.template_screen import TemplateScreen
+from utils.metrics import METRICS
+from utils.utils import FT_SMALL
+
+# Chronomètres affichés : (nom dans METRICS, libellé)
+DIAG_TIMERS = [
+    ("sensors.acquire", "Capteurs"),
+    ("sensors.get_data", "Lecture"),
+    ("log.write", "Journal"),
+    ("deco", "Déco"),
+    ("main.tick", "Boucle"),
+    ("display.render", "Rendu"),
+    ("display.rgb565", "RGB565"),
+    ("display.write", "Écriture"),
+]
+# Compteurs de dépassement de budget des boucles : (nom dans METRICS, abréviation)
+DIAG_OVERRUNS = [
+    ("sensors.overrun", "C"),
+    ("main.overrun", "B"),
+    ("display.overrun", "A"),
+]
+
+
+class DiagScreen(TemplateScreen):
+    """Écran de diagnostic caché : latences des chemins critiques (p50 / p99).
+
+    Affiche la dernière fenêtre close de `METRICS` (la fenêtre courante tant
+    qu'aucune n'est close). L'instrumentation est activée par `DisplayManager`
+    le temps de l'affichage.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Initiate Indicators
+        self.add_field("ind_title", 5, 5, FT_SMALL, static=True)
+        self.modify_field("ind_title", "Diagnostic  p50 / p99 (ms)")
+        for i, (_, label) in enumerate(DIAG_TIMERS):
+            self.add_field(f"ind_{i}", 5, 40 + 30 * i, FT_SMALL, static=True)
+            self.modify_field(f"ind_{i}", label)
+        overruns = "Dépass. " + "/".join(short for _, short in DIAG_OVERRUNS)
+        self.add_field(
+            "ind_overruns", 5, 40 + 30 * len(DIAG_TIMERS), FT_SMALL, static=True
+        )
+        self.modify_field("ind_overruns", overruns)
+
+        # Initiate Values
+        for i in range(len(DIAG_TIMERS)):
+            self.add_field(f"val_{i}", 230, 40 + 30 * i, FT_SMALL)
+        self.add_field("val_overruns", 230, 40 + 30 * len(DIAG_TIMERS), FT_SMALL)
+        self.update_values()
+
+    def update_values(self):
+        stats = METRICS.last or METRICS.snapshot()
+        for i, (name, _) in enumerate(DIAG_TIMERS):
+            summary = stats["timers"].get(name)
+            if summary is None or not summary["count"]:
+                self.modify_field(f"val_{i}", "-")
+            else:
+                p50, p99 = summary["p50"] * 1e3, summary["p99"] * 1e3
+                self.modify_field(f"val_{i}", f"{p50:.2f} / {p99:.2f}")
+        counters = stats["counters"]
+        self.modify_field(
+            "val_overruns",
+            "/".join(str(counters.get(name, 0)) for name, _ in DIAG_OVERRUNS),
+        )
+
+    def update(self, button):
+        return None  # Sortie gérée par DisplayManager (bouton BACK)
@@ -12,17 +12,22 @@ class ExitScreen(TemplateScreen):
         self.quit = EXIT_SELECTOR.NON
 
         # Initiate Indicators
-        self.add_field("stop_dive", 20, 100, FT_BIG)
+        self.add_field("stop_dive", 20, 100, FT_BIG, static=True)
         self.modify_field("stop_dive", "Arrêter la plongée ? ")
-        self.add_field("non", 100, 200, FT_BIG)
+        self.add_field("non", 100, 200, FT_BIG, static=True)
         self.modify_field("non", "NON")
-        self.add_field("oui", 300, 200, FT_BIG)
+        self.add_field("oui", 300, 200, FT_BIG, static=True)
         self.modify_field("oui", "OUI")
 
         # Initiate Selectors
         self.add_field("selector", 135, 150, FT_BIG)
         self.modify_field("selector", "↓")
 
+    def reset(self):
+        """Replace le sélecteur sur NON (à chaque affichage de l'écran)."""
+        self.quit = EXIT_SELECTOR.NON
+        self.modifiy_x_y("selector", self.quit.value)
+
     def move_selector(self):
         if self.quit == EXIT_SELECTOR.NON:
             self.quit = EXIT_SELECTOR.OUI
@@ -30,7 +35,7 @@ class ExitScreen(TemplateScreen):
             self.quit = EXIT_SELECTOR.NON
         self.modifiy_x_y("selector", self.quit.value)
 
-    def update_values(self, sensor_raw, timer):
+    def update_values(self, frame, timer):
         pass  # We don't use because we have no values
 
     def update(self, button):
@@ -1,6 +1,6 @@
 from display.screens.template_screen import TemplateScreen
 from datetime import datetime, timezone, timedelta
-from utils.utils import up_down_from_file, FT_SMALL, FT_BIG
+from utils.utils import up_down, FT_SMALL, FT_BIG
 
 
 class GeneralScreen(TemplateScreen):
@@ -42,18 +42,18 @@ class GeneralScreen(TemplateScreen):
         self.add_field("val_palier", 290, 235, FT_SMALL)
         self.add_field("val_timer", 290, 280, FT_SMALL)
 
-    def update_values(self, sensor_raw, timer):
+    def update_values(self, frame, timer):
         self.modify_field(
             "val_time", datetime.now(timezone(timedelta(hours=2))).strftime("%H:%M:%S")
         )
         self.modify_field("val_battery", "00" + "%")
         self.modify_field("val_pressure", "000")
-        self.modify_field("val_ndl", sensor_raw[5])
-        self.modify_field("val_depth", f"{sensor_raw[2]:.2f}")
-        self.modify_field("val_updown", up_down_from_file())
-        self.modify_field("val_temp", f"{sensor_raw[0]:.2f}")
-        self.modify_field("val_mod", str(sensor_raw[4]))
-        self.modify_field("val_palier", sensor_raw[6])
+        self.modify_field("val_ndl", frame.ndl)
+        self.modify_field("val_depth", f"{frame.profondeur_m:.2f}")
+        self.modify_field("val_updown", up_down())
+        self.modify_field("val_temp", f"{frame.temperature_c:.2f}")
+        self.modify_field("val_mod", str(frame.mod))
+        self.modify_field("val_palier", frame.palier)
         self.modify_field("val_timer", str(timer))
 
     def update(self, button):
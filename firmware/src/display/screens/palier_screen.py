@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, timedelta
 from display.screens.template_screen import TemplateScreen
-from utils.utils import up_down_from_file, FT_SMALL, FT_BIG
+from utils.utils import up_down, FT_SMALL, FT_BIG
 
 
 class PalierScreen(TemplateScreen):
@@ -19,6 +19,10 @@ class PalierScreen(TemplateScreen):
         self.modify_field("ind_depth", "m")
         self.add_field("ind_updown", 370, 134, FT_SMALL)
         self.modify_field("ind_updown", "m/min")
+        self.add_field("ind_tts", 170, 150, FT_SMALL)
+        self.modify_field("ind_tts", "TTS")
+        self.add_field("ind_tts_unit", 285, 150, FT_SMALL)
+        self.modify_field("ind_tts_unit", "MIN")
         self.add_field("ind_palier", 60, 190, FT_SMALL)
         self.modify_field("ind_palier", "Palier:")
         self.add_field("ind_palier_unit", 150, 235, FT_SMALL)
@@ -37,21 +41,23 @@ class PalierScreen(TemplateScreen):
         self.add_field("val_ndl", 30, 115, FT_BIG)
         self.add_field("val_depth", 170, 95, FT_BIG)
         self.add_field("val_updown", 320, 95, FT_BIG)
+        self.add_field("val_tts", 230, 150, FT_SMALL)
         self.add_field("val_palier", 60, 220, FT_BIG)
         self.add_field("val_palier_time", 270, 220, FT_BIG)
         self.add_field("val_timer", 290, 280, FT_SMALL)
 
-    def update_values(self, sensor_raw, timer):
+    def update_values(self, frame, timer):
         self.modify_field(
             "val_time", datetime.now(timezone(timedelta(hours=2))).strftime("%H:%M:%S")
         )
         self.modify_field("val_battery", "00" + "%")
         self.modify_field("val_pressure", "000")
-        self.modify_field("val_ndl", sensor_raw[5])
-        self.modify_field("val_depth", f"{sensor_raw[2]:.2f}")
-        self.modify_field("val_updown", up_down_from_file())
-        self.modify_field("val_palier", sensor_raw[6])
-        self.modify_field("val_palier_time", sensor_raw[7])
+        self.modify_field("val_ndl", frame.ndl)
+        self.modify_field("val_depth", f"{frame.profondeur_m:.2f}")
+        self.modify_field("val_updown", up_down())
+        self.modify_field("val_palier", frame.palier)
+        self.modify_field("val_palier_time", frame.palier_time)
+        self.modify_field("val_tts", frame.tts)
         self.modify_field("val_timer", str(timer))
 
     def update(self, button):
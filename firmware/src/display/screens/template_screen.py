@@ -1,9 +1,20 @@
 import threading
 from PIL import Image, ImageDraw
+from utils.utils import GLYPHS
 
 
 class TemplateScreen:
-    """Classe de base pour la gestion d'un écran graphique simple."""
+    """Classe de base pour la gestion d'un écran graphique simple.
+
+    Les champs statiques (indicateurs) sont dessinés une seule fois dans une couche
+    de fond ; à chaque image, seuls les champs dont la valeur ou la position a changé
+    sont effacés (depuis la couche de fond) puis redessinés. Les zones modifiées sont
+    exposées dans `dirty_rects` pour le chemin d'affichage.
+
+    Chaque modification effective d'un champ incrémente `version` et réveille les
+    threads en attente sur `changed` : l'affichage ne régénère une image que
+    lorsque `version` diffère de celle de la dernière image produite.
+    """
 
     def __init__(self):
         # Initiate Attributs
@@ -11,38 +22,192 @@ class TemplateScreen:
         self.height = 320
         self.background = "#d3d3d3"  # light grey
         self.fields = {}
+        self.frame = None  # Image courante, réutilisée d'une image à l'autre
+        self.static_layer = None  # Fond + champs statiques
+        self.draw = None
+        self.dirty_rects = []
+        self.version = 0  # Incrémentée à chaque modification effective
+        self.rendered_version = None  # Version de la dernière image générée
         # Initiate Threading
         self.fields_lock = threading.Lock()
+        self.changed = threading.Condition(self.fields_lock)
+
+    def add_field(self, name, x, y, font, static=None):
+        """Ajoute un champ textuel au dictionnaire `fields`.
 
-    def add_field(self, name, x, y, font):
-        """Ajoute un champ textuel au dictionnaire `fields`."""
+        @param static: bool - champ dessiné une fois dans la couche de fond ;
+                       par défaut, les champs préfixés "ind_" sont statiques.
+        """
+        if static is None:
+            static = name.startswith("ind_")
         with self.fields_lock:
-            self.fields[name] = {"pos": (x, y), "value": "", "font": font}
+            self.fields[name] = {
+                "pos": (x, y),
+                "value": "",
+                "font": font,
+                "static": static,
+                "drawn": None,  # (pos, value) dessinés lors de la dernière image
+                "bbox": None,  # Zone occupée lors de la dernière image
+            }
+            self.frame = None
+            self.mark_changed()
 
     def modify_field(self, name, value):
         """Modifie la valeur textuelle d'un champ existant."""
         with self.fields_lock:
-            self.fields[name]["value"] = value
+            field = self.fields[name]
+            if field["value"] == value:
+                return
+            field["value"] = value
+            if field["static"] and field["drawn"] != (field["pos"], value):
+                self.frame = None
+            self.mark_changed()
 
     def modifiy_x_y(self, name, x_y):
         """Met à jour la position (x, y) d'un champ existant."""
         with self.fields_lock:
-            self.fields[name]["pos"] = x_y
+            field = self.fields[name]
+            if field["pos"] == x_y:
+                return
+            field["pos"] = x_y
+            if field["static"] and field["drawn"] != (x_y, field["value"]):
+                self.frame = None
+            self.mark_changed()
+
+    def reset(self):
+        """Vide les champs de valeurs ("val_"), par exemple en début de plongée."""
+        for name in list(self.fields):
+            if name.startswith("val_"):
+                self.modify_field(name, "")
+
+    def invalidate(self):
+        """Force un rendu complet à la prochaine image (ex. retour sur cet écran)."""
+        with self.fields_lock:
+            self.frame = None
+            self.mark_changed()
+
+    def mark_changed(self):
+        """Signale une modification (à appeler avec `fields_lock` acquis)."""
+        self.version += 1
+        self.changed.notify_all()
+
+    def wait_change(self, timeout, stop=None):
+        """Attend une modification postérieure à la dernière image générée.
+
+        @param timeout: float - attente maximale en secondes.
+        @param stop: callable - interrompt l'attente s'il renvoie True.
+        @return: bool - True si une nouvelle image est nécessaire.
+        """
+        with self.changed:
+            self.changed.wait_for(
+                lambda: self.version != self.rendered_version
+                or (stop is not None and stop()),
+                timeout,
+            )
+            return self.version != self.rendered_version
+
+    def wake(self):
+        """Réveille les threads en attente sur `changed` sans modifier l'écran."""
+        with self.changed:
+            self.changed.notify_all()
 
     def generate_image(self):
         """Construit et retourne une image PIL représentant l'écran actuel.
 
         @return: PIL.Image.Image — objet image prêt à être affiché ou envoyé vers un écran.
         """
-        img = Image.new("RGB", (self.width, self.height), self.background)
-        draw = ImageDraw.Draw(img)
         with self.fields_lock:
-            for field, info in self.fields.items():
-                pos = info["pos"]
-                value = info["value"]
-                font = info["font"]
-                draw.text((pos[0], pos[1]), value, font=font, fill="black")
-        return img
+            if self.frame is None:
+                self.render_full()
+            else:
+                self.render_dirty()
+            self.rendered_version = self.version
+            return self.frame
+
+    def render_full(self):
+        """Redessine entièrement l'écran et reconstruit la couche statique."""
+        self.frame = Image.new("RGB", (self.width, self.height), self.background)
+        self.draw = ImageDraw.Draw(self.frame)
+        dynamic = []
+        for info in self.fields.values():
+            if info["static"]:
+                self.draw_field(info)
+            else:
+                dynamic.append(info)
+        self.static_layer = self.frame.copy()
+        for info in dynamic:
+            self.draw_field(info)
+        self.dirty_rects = [(0, 0, self.width, self.height)]
+
+    def render_dirty(self):
+        """Efface et redessine uniquement les champs dynamiques modifiés."""
+        dynamic = {
+            name: info for name, info in self.fields.items() if not info["static"]
+        }
+        changed = [
+            name
+            for name, info in dynamic.items()
+            if info["drawn"] != (info["pos"], info["value"])
+        ]
+        dirty = []
+        for name in changed:
+            box = dynamic[name]["bbox"]
+            if box is not None:
+                self.restore(box)
+                dirty.append(box)
+        # Un champ inchangé chevauchant une zone effacée doit être redessiné
+        for name, info in dynamic.items():
+            if name in changed or info["bbox"] is None:
+                continue
+            if any(intersects(info["bbox"], box) for box in dirty):
+                changed.append(name)
+        for name in changed:
+            self.draw_field(dynamic[name])
+            box = dynamic[name]["bbox"]
+            if box is not None and box not in dirty:
+                dirty.append(box)
+        self.dirty_rects = dirty
+
+    def draw_field(self, info):
+        """Dessine un champ dans l'image courante et mémorise sa zone.
+
+        Les valeurs numériques passent par le cache de glyphes de la police
+        (`GLYPHS`), le reste par FreeType.
+        """
+        pos = info["pos"]
+        value = info["value"]
+        info["drawn"] = (pos, value)
+        if value == "":
+            info["bbox"] = None
+            return
+        font = info["font"]
+        atlas = GLYPHS.get(font)
+        if atlas is not None and atlas.covers(value):
+            left, top, right, bottom = atlas.draw(self.draw, pos, value)
+        else:
+            self.draw.text((pos[0], pos[1]), value, font=font, fill="black")
+            left, top, right, bottom = font.getbbox(value)
+        info["bbox"] = self.clip(
+            (pos[0] + left, pos[1] + top, pos[0] + right, pos[1] + bottom)
+        )
+
+    def restore(self, box):
+        """Recopie une zone de la couche statique dans l'image courante."""
+        self.frame.paste(self.static_layer.crop(box), box[:2])
+
+    def clip(self, box):
+        """Restreint une zone aux dimensions de l'écran (None si vide)."""
+        x0, y0, x1, y1 = (int(v) for v in box)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1)
 
     def update(self, button):
         pass
+
+
+def intersects(a, b):
+    """Indique si deux rectangles (x0, y0, x1, y1) se chevauchent."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
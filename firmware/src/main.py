@@ -2,33 +2,56 @@ import time
 from button.buttons import ButtonManager
 from display.display_manager import DisplayManager
 from sensors.sensors import SensorsManager
-from utils.utils import calc_mod, log_end, ndl_palier_tpalier
-def main():
-    sensors_data = None
-    dm = DisplayManager()
-    sm = SensorsManager()
-    bm = ButtonManager(dm, sm)
+from utils.metrics import METRICS
+from utils.sample import DiveFrame
+from utils.utils import (
+    MAIN_PERIOD,
+    METRICS_ENABLED,
+    calc_mod,
+    log_end,
+    ndl_palier_tpalier,
+    time_to_surface,
+)
+def main(display=None, ms5837=None, qmc5883l=None, gpio=None, stop=None):
+    """Lance le firmware jusqu'à Ctrl+C ou jusqu'à ce que `stop` soit levé.
+
+    `display`, `ms5837`, `qmc5883l` et `gpio` remplacent le matériel (voir `sim`).
+    L'instrumentation (`METRICS`) est active si `METRICS_ENABLED`.
+    """
+    METRICS.enable(METRICS_ENABLED)
+    dm = DisplayManager(display=display)
+    sm = SensorsManager(ms5837=ms5837, qmc5883l=qmc5883l)
+    bm = ButtonManager(dm, sm, gpio)
+    dm.calibrated(sm.is_calibrated())  # Calibration du compas enregistrée
     dm.start()
     bm.start()
     try:
-        while True:
-            if dm.is_in_dive_mode():
-                sensors_data = sm.get_data()
-                sensors_data.append(calc_mod(dm.gaz_per))
-                d1, d2, d3 = ndl_palier_tpalier(dm.gaz_per)
-                sensors_data.append(d1)
-                sensors_data.append(d2)
-                sensors_data.append(d3)
-                print("sensors data: ", sensors_data)
-                dm.screen.update_values(sensors_data, dm.dive_time())
-            else:
-                dm.screen.update_values()
-            time.sleep(0.5)
+        while stop is None or not stop.is_set():
+            started = time.monotonic()
+            with METRICS.timer("main.tick"):
+                sample = sm.get_data()
+                # Pas de valeurs de plongée avant la première mesure publiée
+                if dm.is_in_dive_mode() and sample.t is not None:
+                    with METRICS.timer("deco"):
+                        ndl, palier, palier_time = ndl_palier_tpalier(dm.gaz_per)
+                        tts = time_to_surface()
+                    frame = DiveFrame.from_sample(
+                        sample, calc_mod(dm.gaz_per), ndl, palier, palier_time, tts
+                    )
+                    dm.update_values(frame, dm.dive_time())
+                elif not dm.is_in_dive_mode():
+                    dm.update_values()
+            if time.monotonic() - started > MAIN_PERIOD:
+                METRICS.count("main.overrun")
+            METRICS.tick()  # Statistiques périodiques (logs/stats.json)
+            time.sleep(MAIN_PERIOD)
     except KeyboardInterrupt:
-        try:
-            log_end(dm.dive_time())
-        except Exception as e:
-            print(e)
-        dm.stop()
-        sm.stop()
-        bm.stop()
\ No newline at end of file
+        pass
+    try:
+        log_end(dm.dive_time())
+    except Exception as e:
+        print(e)
+    dm.stop()
+    sm.stop()
+    bm.stop()
+    METRICS.close()
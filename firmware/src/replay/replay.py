@@ -0,0 +1,321 @@
+"""Rejoue le moteur de décompression sur des journaux de plongée enregistrés.
+
+Chaque journal (`mesures.json`, JSON Lines ou ancien tableau) est lu en flux et
+découpé en plongées (enregistrement de fin ou interruption de plus de
+`DIVE_GAP_S`). Les tensions tissulaires de toute la plongée sont intégrées en
+une passe vectorisée (`deco_numpy.integrate_profile`), puis, pour chaque
+réglage de gradient factors, le plafond, le prochain palier, le NDL et le temps
+au palier sont calculés à chaque mesure. Les journaux sont répartis sur un pool
+de processus.
+
+Sorties (dans `--out`) : une série temporelle par plongée et par réglage GF
+(CSV, ou Parquet si pyarrow est installé) et `summary.csv`. Un journal illisible
+n'interrompt pas le rejeu : il figure dans le résumé (colonne `error`) et le code
+de sortie est non nul.
+
+Usage : python src/replay/replay.py logs/ [--gf 30/85 --gf 50/80] [--o2 0.32]
+"""
+
+import argparse, csv, math, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # Sortie Parquet indisponible : CSV uniquement
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.deco_numpy import (  # noqa: E402
+    can_surface,
+    ceiling,
+    depth_m_to_amb_bar,
+    inspired_pp,
+    integrate_profile,
+)
+from utils.dive_log import iter_log  # noqa: E402
+from utils.utils import (  # noqa: E402
+    LOG_FILE,
+    TissueState,
+    normalize_gaz,
+    parse_iso_timestamp,
+)
+
+DIVE_GAP_S = 600.0  # Interruption (s) au-delà de laquelle une plongée est close
+SERIES_COLUMNS = [
+    "t",
+    "profondeur_m",
+    "ceiling_m",
+    "next_stop_m",
+    "ndl_min",
+    "stop_min",
+    "tts_min",
+]
+SUMMARY_COLUMNS = [
+    "log",
+    "dive",
+    "gf",
+    "start",
+    "duration_min",
+    "samples",
+    "max_depth_m",
+    "max_ceiling_m",
+    "min_ndl_min",
+    "max_tts_min",
+    "output",
+    "error",
+]
+
+
+def iter_dives(path, gap_s=DIVE_GAP_S):
+    """Itère sur les plongées d'un journal : tableaux (t epoch, profondeur_m) triés.
+
+    Une plongée se termine sur un enregistrement de fin (`dive_time`) ou quand
+    deux mesures sont séparées de plus de `gap_s` secondes.
+    """
+    t, depth = [], []
+    for record in iter_log(path):
+        if "dive_time" in record:
+            if t:
+                yield _sorted_dive(t, depth)
+            t, depth = [], []
+            continue
+        if record.get("profondeur_m") is None:
+            continue
+        rt = record.get("t")
+        if rt is None:
+            rt = parse_iso_timestamp(record["timestamp"])
+        if t and rt - t[-1] > gap_s:
+            yield _sorted_dive(t, depth)
+            t, depth = [], []
+        t.append(rt)
+        depth.append(record["profondeur_m"])
+    if t:
+        yield _sorted_dive(t, depth)
+
+
+def _sorted_dive(t, depth):
+    t = np.array(t, dtype=float)
+    depth = np.array(depth, dtype=float)
+    order = np.argsort(t, kind="stable")
+    return t[order], depth[order]
+
+
+def replay_dive(t, depth_m, gaz, gf_settings, stop_interval_m=3.0):
+    """Séries de décompression d'une plongée pour chaque réglage GF.
+
+    Les tensions ne dépendent pas des gradient factors : elles sont intégrées
+    une seule fois. Le prochain palier et son temps sont ceux qu'afficherait la
+    montre (`TissueState.ndl_palier_tpalier`). Le NDL n'est défini que hors
+    décompression, le temps au palier et la durée de remontée (TTS) seulement en
+    décompression (NaN sinon).
+
+    @param gf_settings: list - couples (gf_low, gf_high).
+    @return: dict {(gf_low, gf_high): {colonne: tableau (n,)}}.
+    """
+    t = np.asarray(t, dtype=float)
+    depth_m = np.asarray(depth_m, dtype=float)
+    _, fN2, fHe = normalize_gaz(gaz)
+    pamb = depth_m_to_amb_bar(depth_m)
+    Pn2_hist, Phe_hist = integrate_profile(t, depth_m, gaz, history=True)
+    # État initial (équilibre à la première profondeur) puis état après chaque pas
+    Pn2 = np.vstack([np.full((1, 16), inspired_pp(pamb[0], fN2)), Pn2_hist])
+    Phe = np.vstack([np.full((1, 16), inspired_pp(pamb[0], fHe)), Phe_hist])
+
+    results = {}
+    for gf_low, gf_high in gf_settings:
+        ceiling_m = ceiling(Pn2, Phe, pamb, gf_low, gf_high)
+        first_stop = np.ceil(ceiling_m / stop_interval_m) * stop_interval_m
+        next_stop = np.where(
+            can_surface(Pn2, Phe, gf_high),
+            0.0,
+            np.maximum(first_stop, stop_interval_m),
+        )
+        ndl = np.full(len(t), np.nan)
+        stop_min = np.full(len(t), np.nan)
+        tts = np.full(len(t), np.nan)
+        state = TissueState(gaz, gf_low, gf_high, stop_interval_m)
+        for i, (ti, di, Pn2_i, Phe_i, stop) in enumerate(
+            zip(
+                t.tolist(),
+                depth_m.tolist(),
+                Pn2.tolist(),
+                Phe.tolist(),
+                next_stop.tolist(),
+            )
+        ):
+            state.t, state.depth, state.Pn2, state.Phe = ti, di, Pn2_i, Phe_i
+            if stop <= 0.0:
+                ndl[i] = state.ndl()
+            else:
+                plan = state.plan()  # Mémoïsé entre mesures proches
+                if plan["stops"]:  # Premier palier non nul, comme à l'affichage
+                    next_stop[i], stop_min[i] = plan["stops"][0]
+                else:
+                    stop_min[i] = 0
+                tts[i] = plan["tts"]
+        results[(gf_low, gf_high)] = {
+            "t": t,
+            "profondeur_m": depth_m,
+            "ceiling_m": ceiling_m,
+            "next_stop_m": next_stop,
+            "ndl_min": ndl,
+            "stop_min": stop_min,
+            "tts_min": tts,
+        }
+    return results
+
+
+def gf_label(gf):
+    return f"{round(gf[0] * 100)}-{round(gf[1] * 100)}"
+
+
+def write_series(path, series, fmt="csv"):
+    """Écrit une série (dict de colonnes) en CSV (NaN -> vide) ou en Parquet."""
+    if fmt == "parquet":
+        table = pyarrow.table({name: series[name] for name in SERIES_COLUMNS})
+        pyarrow.parquet.write_table(table, path)
+        return
+    columns = [series[name].tolist() for name in SERIES_COLUMNS]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SERIES_COLUMNS)
+        for row in zip(*columns):
+            writer.writerow(["" if math.isnan(v) else round(v, 4) for v in row])
+
+
+def _nan_stat(func, values):
+    """Statistique en ignorant les NaN (None si toutes les valeurs sont NaN)."""
+    values = values[~np.isnan(values)]
+    return round(float(func(values)), 2) if len(values) else None
+
+
+def replay_log(index, path, gaz, gf_settings, out, fmt="csv"):
+    """Rejoue toutes les plongées d'un journal et écrit leurs séries.
+
+    Une erreur arrête le journal sans propager l'exception : les plongées déjà
+    rejouées sont conservées et une ligne `error` est ajoutée au résumé.
+
+    @return: list - une ligne de résumé (dict) par plongée et par réglage GF.
+    """
+    rows = []
+    try:
+        for dive, (t, depth_m) in enumerate(iter_dives(path)):
+            for gf, series in replay_dive(t, depth_m, gaz, gf_settings).items():
+                name = f"log{index:03d}_dive{dive:02d}_gf{gf_label(gf)}.{fmt}"
+                write_series(os.path.join(out, name), series, fmt)
+                rows.append(
+                    {
+                        "log": path,
+                        "dive": dive,
+                        "gf": gf_label(gf),
+                        "start": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t[0])),
+                        "duration_min": round((t[-1] - t[0]) / 60.0, 2),
+                        "samples": len(t),
+                        "max_depth_m": round(float(depth_m.max()), 2),
+                        "max_ceiling_m": round(float(series["ceiling_m"].max()), 2),
+                        "min_ndl_min": _nan_stat(np.min, series["ndl_min"]),
+                        "max_tts_min": _nan_stat(np.max, series["tts_min"]),
+                        "output": name,
+                    }
+                )
+    except Exception as e:
+        print("Replay exception:", path, e)
+        rows.append({"log": path, "error": f"{type(e).__name__}: {e}"})
+    return rows
+
+
+def find_logs(paths):
+    """Journaux à rejouer : fichiers donnés et `mesures.json` des dossiers donnés."""
+    name = os.path.basename(LOG_FILE)
+    logs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                if name in files:
+                    logs.append(os.path.join(root, name))
+        else:
+            logs.append(path)
+    return logs
+
+
+def replay(logs, gaz, gf_settings, out, fmt="csv", jobs=None):
+    """Rejoue les journaux (en parallèle si `jobs` != 1) et écrit `summary.csv`.
+
+    @return: list - lignes du résumé, dans l'ordre des journaux.
+    """
+    os.makedirs(out, exist_ok=True)
+    args = [(i, path, gaz, gf_settings, out, fmt) for i, path in enumerate(logs)]
+    if jobs == 1:
+        results = [replay_log(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(replay_log, *zip(*args))) if args else []
+    rows = [row for result in results for row in result]
+    with open(os.path.join(out, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def parse_gf(text):
+    """Convertit "30/85" en (0.30, 0.85)."""
+    try:
+        low, high = (int(v) / 100.0 for v in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"GF invalide (attendu bas/haut) : {text}")
+    if not 0 < low <= high <= 1:
+        raise argparse.ArgumentTypeError(f"GF hors limites : {text}")
+    return low, high
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="journaux ou dossiers de journaux")
+    parser.add_argument(
+        "--gf", type=parse_gf, action="append", help="gradient factors (ex. 30/85)"
+    )
+    parser.add_argument("--o2", type=float, default=0.21, help="fraction d'O2")
+    parser.add_argument("--he", type=float, default=0.0, help="fraction d'hélium")
+    parser.add_argument("--out", default="replay-out", help="dossier de sortie")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "parquet"),
+        default="csv",
+        help="format des séries (parquet : pyarrow requis)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="processus (défaut : nombre de CPU)"
+    )
+    args = parser.parse_args()
+    if args.format == "parquet" and pyarrow is None:
+        parser.error("--format parquet nécessite pyarrow")
+
+    gaz = {"O2": args.o2, "N2": 1.0 - args.o2 - args.he, "He": args.he}
+    logs = find_logs(args.logs)
+    started = time.monotonic()
+    gf_settings = args.gf or [(0.3, 0.85)]
+    rows = replay(logs, gaz, gf_settings, args.out, args.format, args.jobs)
+    elapsed = time.monotonic() - started
+    failed = [row["log"] for row in rows if row.get("error")]
+    series = [row for row in rows if not row.get("error")]
+    dives = [row for row in series if row["gf"] == gf_label(gf_settings[0])]
+    samples = sum(row["samples"] for row in dives)
+    print(
+        f"{len(logs)} journaux, {len(dives)} plongées, {len(series)} séries, "
+        f"{samples} mesures "
+        f"en {elapsed:.1f} s -> {os.path.join(args.out, 'summary.csv')}"
+    )
+    if failed:
+        print(f"{len(failed)} journaux en erreur : {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
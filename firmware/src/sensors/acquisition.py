@@ -0,0 +1,113 @@
+import math
+import sensors.ms5837 as ms5837
+from utils.vertical_speed import VerticalSpeedEstimator
+
+# Paliers d'acquisition :
+# (vitesse verticale max en m/min, suréchantillonnage, période en s)
+# - profondeur stable (surface, paliers) : pleine résolution, 2 Hz
+# - déplacement modéré : cadence d'origine (5 Hz)
+# - remontée/descente rapide : 10 Hz pour l'alarme de vitesse, OSR réduit
+DEFAULT_TIERS = [
+    (3.0, ms5837.OSR_8192, 0.5),
+    (9.0, ms5837.OSR_4096, 0.2),
+    (math.inf, ms5837.OSR_1024, 0.1),
+]
+
+
+class AcquisitionPolicy:
+    """Choisit le suréchantillonnage du MS5837 et la période d'acquisition.
+
+    La vitesse verticale est estimée par régression sur les `window_s` dernières
+    secondes de mesures, sans lissage pour réagir au plus vite. Le palier le plus
+    rapide dont le seuil couvre cette vitesse est adopté immédiatement ; un retour
+    vers un palier plus lent n'a lieu qu'après `hold_s` secondes passées sous le
+    seuil, pour éviter les oscillations.
+    """
+
+    def __init__(self, tiers=None, window_s=2.0, hold_s=5.0):
+        # Initiate Attributs
+        self.tiers = sorted(tiers or DEFAULT_TIERS)
+        self.hold_s = hold_s
+        self.speed = VerticalSpeedEstimator(window_s, alpha=1.0)
+        self.tier = len(self.tiers) - 1  # Démarrage prudent : palier le plus rapide
+        self.slower_since = None
+        self.rate = 0.0  # m/min, positif en descente
+
+    @property
+    def oversampling(self):
+        return self.tiers[self.tier][1]
+
+    @property
+    def period(self):
+        return self.tiers[self.tier][2]
+
+    def update(self, t, depth):
+        """Ajoute une mesure et retourne (suréchantillonnage, période) à appliquer."""
+        self.rate = self.speed.update(t, depth)
+        speed = abs(self.rate)
+        wanted = next(i for i, (limit, _, _) in enumerate(self.tiers) if speed <= limit)
+        if wanted >= self.tier:
+            self.tier = wanted
+            self.slower_since = None
+        elif self.slower_since is None:
+            self.slower_since = t
+        elif t - self.slower_since >= self.hold_s:
+            self.tier = wanted
+            self.slower_since = None
+        return self.oversampling, self.period
+
+    def reset(self):
+        """Repart du palier le plus rapide (nouvelle plongée)."""
+        self.speed.reset()
+        self.tier = len(self.tiers) - 1
+        self.slower_since = None
+        self.rate = 0.0
+
+
+class TemperatureSchedule:
+    """Décide quand refaire la conversion D2 (température) du MS5837.
+
+    La température de l'eau évolue à l'échelle de la minute : entre deux
+    rafraîchissements, `MS5837.read(temperature=False)` réutilise le dernier D2
+    et ne convertit que D1, ce qui divise par deux le temps d'acquisition.
+    D2 est rafraîchi toutes les `every` mesures, ou dès que la profondeur a varié
+    de `depth_step_m` depuis le dernier rafraîchissement (traversée possible
+    d'une thermocline).
+
+    Borne d'erreur : un D2 périmé de dT °C décale la pression compensée de
+    ∂P/∂T ≈ 2,2 mbar/°C par bar au-delà de ~1,7 bar absolu (coefficients du
+    datasheet MS5837-30BA) : ~5 mbar/°C à 30 m, ~19 mbar/°C à 90 m, soit
+    1 cm de profondeur par mbar. Avec les valeurs par défaut, dT est borné par
+    l'évolution de la température sur 10 mesures (≤ 5 s) ou sur 0,5 m de
+    dénivelé, typiquement < 0,2 °C : l'erreur ajoutée reste sous 1 mbar (1 cm)
+    à 30 m.
+    """
+
+    def __init__(self, every=10, depth_step_m=0.5):
+        # Initiate Attributs
+        self.every = every
+        self.depth_step_m = depth_step_m
+        self.count = 0
+        self.ref_depth = None
+
+    def due(self, depth):
+        """Indique si la prochaine lecture doit reconvertir la température.
+
+        @param depth: float - dernière profondeur connue (None si inconnue).
+        """
+        self.count += 1
+        if (
+            self.ref_depth is None
+            or depth is None
+            or self.count >= self.every
+            or abs(depth - self.ref_depth) >= self.depth_step_m
+        ):
+            self.count = 0
+            self.ref_depth = depth
+            return True
+        return False
+
+    def reset(self):
+        """Force une conversion de température à la prochaine lecture."""
+        self.count = 0
+        self.ref_depth = None
@@ -0,0 +1,153 @@
+import json, os, threading, time
+
+
+class CompassCalibrator:
+    """Calibration du compas QMC5883L en tâche de fond.
+
+    Pendant la calibration, un thread dédié lit le magnétomètre et met à jour les
+    extremums de chaque axe au fil de l'eau. En fin de calibration, on en déduit :
+    * la correction de fer dur : décalage = centre de l'ellipse (min + max) / 2 ;
+    * la correction de fer doux (diagonale) : facteur d'échelle par axe ramenant
+      l'ellipse à un cercle de rayon moyen.
+    Les coefficients sont enregistrés dans `path` et rechargés au démarrage.
+    """
+
+    def __init__(self, path, min_span=100):
+        # Initiate Attributs
+        self.path = path
+        self.min_span = min_span  # Amplitude minimale par axe (LSB) pour valider
+        self.x_offset = None
+        self.y_offset = None
+        self.x_scale = 1.0
+        self.y_scale = 1.0
+        self.bounds = None  # [xmin, xmax, ymin, ymax] de la calibration en cours
+        self.progress = None  # Avancement (0..1) de la calibration en cours
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def is_calibrated(self):
+        return self.x_offset is not None and self.y_offset is not None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def correct(self, x, y):
+        """Applique les corrections de fer dur et de fer doux à une mesure brute."""
+        with self.lock:
+            return (
+                (x - self.x_offset) * self.x_scale,
+                (y - self.y_offset) * self.y_scale,
+            )
+
+    def start(self, read_raw, duration=10, period=0.05, on_progress=None, on_done=None):
+        """Lance la calibration dans un thread et rend la main immédiatement.
+
+        @param read_raw: callable - retourne une mesure brute (x, y, z).
+        @param on_progress: callable(float) - avancement entre 0 et 1.
+        @param on_done: callable(bool) - appelé en fin de calibration avec l'état
+                        de calibration (une calibration ratée conserve la
+                        précédente).
+        @return: bool - False si une calibration est déjà en cours.
+        """
+        if self.is_running():
+            return False
+        self.bounds = None
+        self.progress = 0.0
+        self.thread = threading.Thread(
+            target=self.run,
+            args=(read_raw, duration, period, on_progress, on_done),
+            daemon=True,
+        )
+        self.thread.start()
+        return True
+
+    def run(self, read_raw, duration, period, on_progress, on_done):
+        """Boucle du thread de calibration."""
+        start = time.monotonic()
+        elapsed = 0.0
+        while elapsed < duration:
+            try:
+                x, y, _ = read_raw()
+                self.add_sample(x, y)
+            except Exception as e:
+                print("Compass calibration exception:", e)
+            elapsed = time.monotonic() - start
+            self.progress = min(elapsed / duration, 1.0)
+            if on_progress is not None:
+                on_progress(self.progress)
+            time.sleep(period)
+        self.finish()
+        self.progress = None
+        if on_done is not None:
+            on_done(self.is_calibrated())
+
+    def add_sample(self, x, y):
+        """Intègre une mesure brute aux extremums courants."""
+        if self.bounds is None:
+            self.bounds = [x, x, y, y]
+            return
+        b = self.bounds
+        b[0], b[1] = min(b[0], x), max(b[1], x)
+        b[2], b[3] = min(b[2], y), max(b[3], y)
+
+    def finish(self):
+        """Calcule et enregistre les coefficients à partir des extremums.
+
+        @return: bool - True si la rotation a couvert assez d'amplitude.
+        """
+        if self.bounds is None:
+            return False
+        xmin, xmax, ymin, ymax = self.bounds
+        x_radius = (xmax - xmin) / 2
+        y_radius = (ymax - ymin) / 2
+        if min(x_radius, y_radius) * 2 < self.min_span:
+            print("Compass calibration: rotation insuffisante")
+            return False
+        radius = (x_radius + y_radius) / 2
+        with self.lock:
+            self.x_offset = (xmax + xmin) / 2
+            self.y_offset = (ymax + ymin) / 2
+            self.x_scale = radius / x_radius
+            self.y_scale = radius / y_radius
+        self.save()
+        return True
+
+    def save(self):
+        """Enregistre les coefficients sur disque (écriture atomique)."""
+        data = {
+            "x_offset": self.x_offset,
+            "y_offset": self.y_offset,
+            "x_scale": self.x_scale,
+            "y_scale": self.y_scale,
+        }
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Compass calibration save exception:", e)
+            return False
+        return True
+
+    def load(self):
+        """Recharge les coefficients enregistrés.
+
+        @return: bool - True si une calibration valide a été chargée.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self.lock:
+                self.x_offset = float(data["x_offset"])
+                self.y_offset = float(data["y_offset"])
+                self.x_scale = float(data.get("x_scale", 1.0))
+                self.y_scale = float(data.get("y_scale", 1.0))
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print("Compass calibration load exception:", e)
+            return False
+        return True
@@ -0,0 +1,54 @@
+class PassThroughFilter:
+    """Filtre neutre : la valeur mesurée est publiée telle quelle."""
+
+    def __init__(self):
+        # Initiate Attributs
+        self.value = None
+
+    def update(self, t, value):
+        self.value = value
+        return value
+
+    def reset(self):
+        self.value = None
+
+
+class AlphaBetaFilter:
+    """Filtre alpha-bêta (position + vitesse) à pas de temps variable.
+
+    À chaque mesure : prédiction x += v * dt, puis correction par le résidu
+    r = mesure - x : x += alpha * r et v += beta * r / dt. Coût constant par
+    mesure. `alpha` règle le lissage de la valeur, `beta` celui de la vitesse ;
+    des valeurs faibles lissent davantage mais réagissent plus lentement. La
+    vitesse ne sert qu'à la prédiction : la vitesse verticale affichée est
+    estimée par `VSPEED` sur la profondeur filtrée.
+    """
+
+    def __init__(self, alpha=0.3, beta=0.03):
+        # Initiate Attributs
+        self.alpha = alpha
+        self.beta = beta
+        self.value = None
+        self.velocity = 0.0  # unités/s
+        self.t = None
+
+    def update(self, t, value):
+        """Intègre une mesure à l'instant `t` (s) et retourne la valeur filtrée."""
+        if self.value is None:
+            self.value = value
+            self.t = t
+            return value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+        predicted = self.value + self.velocity * dt
+        residual = value - predicted
+        self.value = predicted + self.alpha * residual
+        self.velocity += self.beta * residual / dt
+        self.t = t
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.velocity = 0.0
+        self.t = None
@@ -0,0 +1,75 @@
+import threading
+import smbus2
+from smbus2 import i2c_msg
+
+
+class I2CBus:
+    """Bus I2C partagé par tous les capteurs.
+
+    Possède l'unique descripteur SMBus du bus et sérialise les transactions des
+    différents threads (acquisition, calibration du compas). Expose le
+    sous-ensemble de l'API smbus2 utilisé par les pilotes, si bien qu'il peut
+    remplacer un `smbus2.SMBus` (ex. dans `MS5837`).
+
+    Les lectures de registres passent par une transaction combinée `i2c_rdwr`
+    (écriture du registre + lecture, avec condition de redémarrage) : une seule
+    transaction noyau et pas de limite de 32 octets.
+    """
+
+    def __init__(self, bus=1, smbus=None):
+        # Initiate Attributs
+        self.id = bus
+        self.rdwr = True  # i2c_rdwr disponible (sinon lecture de bloc SMBus)
+        if smbus is not None:
+            self.smbus = smbus
+        else:
+            try:
+                self.smbus = smbus2.SMBus(bus)
+            except Exception as e:
+                print(f"Erreur ({e}): bus I2C {bus} indisponible")
+                self.smbus = None
+
+        # Initiate Threading
+        self.lock = threading.RLock()
+
+    def is_open(self):
+        return self.smbus is not None
+
+    def check(self):
+        if self.smbus is None:
+            raise OSError(f"Bus I2C {self.id} indisponible")
+
+    def write_byte(self, addr, value):
+        with self.lock:
+            self.check()
+            self.smbus.write_byte(addr, value)
+
+    def write_byte_data(self, addr, register, value):
+        with self.lock:
+            self.check()
+            self.smbus.write_byte_data(addr, register, value)
+
+    def read_word_data(self, addr, register):
+        with self.lock:
+            self.check()
+            return self.smbus.read_word_data(addr, register)
+
+    def read_i2c_block_data(self, addr, register, length):
+        """Lit `length` octets à partir de `register` en une transaction combinée."""
+        with self.lock:
+            self.check()
+            if self.rdwr:
+                try:
+                    write = i2c_msg.write(addr, [register])
+                    read = i2c_msg.read(addr, length)
+                    self.smbus.i2c_rdwr(write, read)
+                    return list(read)
+                except (AttributeError, NotImplementedError):
+                    self.rdwr = False  # Pilote sans I2C_RDWR
+            return self.smbus.read_i2c_block_data(addr, register, length)
+
+    def close(self):
+        with self.lock:
+            if self.smbus is not None:
+                self.smbus.close()
+                self.smbus = None
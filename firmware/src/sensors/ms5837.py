@@ -8,7 +8,7 @@ try:
 except:
     print('Try sudo apt-get install python-smbus2')
     
-from time import sleep
+from time import monotonic, sleep
 
 # Models
 MODEL_02BA = 0
@@ -62,7 +62,8 @@ class MS5837(object):
         self._model = model
         
         try:
-            self._bus = smbus.SMBus(bus)
+            # An already opened bus (e.g. the shared I2CBus) can be passed instead of a number
+            self._bus = smbus.SMBus(bus) if isinstance(bus, int) else bus
         except:
             print("Bus %d is not available."%bus)
             print("Available busses are listed as /dev/i2c*")
@@ -118,7 +119,12 @@ class MS5837(object):
         else:
             self._model = MODEL_UNKNOWN
         
-    def read(self, oversampling=OSR_8192):
+    # temperature=False reuses the last D2 (temperature) conversion and only
+    # converts D1 (pressure), halving the conversion time. See
+    # sensors.acquisition.TemperatureSchedule for the resulting error bound.
+    # idle, if given, is called while each conversion runs so that other
+    # devices on the bus can be served instead of sleeping.
+    def read(self, oversampling=OSR_8192, temperature=True, idle=None):
         if self._bus is None:
             print("No bus!")
             return False
@@ -133,19 +139,20 @@ class MS5837(object):
         # Maximum conversion time increases linearly with oversampling
         # max time (seconds) ~= 2.2e-6(x) where x = OSR = (2^8, 2^9, ..., 2^13)
         # We use 2.5e-6 for some overhead
-        sleep(2.5e-6 * 2**(8+oversampling))
+        self._wait(2.5e-6 * 2**(8+oversampling), idle)
         
         d = self._bus.read_i2c_block_data(self._MS5837_ADDR, self._MS5837_ADC_READ, 3)
         self._D1 = d[0] << 16 | d[1] << 8 | d[2]
         
-        # Request D2 conversion (temperature)
-        self._bus.write_byte(self._MS5837_ADDR, self._MS5837_CONVERT_D2_256 + 2*oversampling)
-    
-        # As above
-        sleep(2.5e-6 * 2**(8+oversampling))
- 
-        d = self._bus.read_i2c_block_data(self._MS5837_ADDR, self._MS5837_ADC_READ, 3)
-        self._D2 = d[0] << 16 | d[1] << 8 | d[2]
+        if temperature or self._D2 == 0:
+            # Request D2 conversion (temperature)
+            self._bus.write_byte(self._MS5837_ADDR, self._MS5837_CONVERT_D2_256 + 2*oversampling)
+        
+            # As above
+            self._wait(2.5e-6 * 2**(8+oversampling), idle)
+     
+            d = self._bus.read_i2c_block_data(self._MS5837_ADDR, self._MS5837_ADC_READ, 3)
+            self._D2 = d[0] << 16 | d[1] << 8 | d[2]
 
         # Calculate compensated pressure and temperature
         # using raw ADC values and internal calibration
@@ -153,6 +160,16 @@ class MS5837(object):
         
         return True
     
+    def _wait(self, delay, idle=None):
+        if idle is None:
+            sleep(delay)
+            return
+        deadline = monotonic() + delay
+        idle()
+        remaining = deadline - monotonic()
+        if remaining > 0:
+            sleep(remaining)
+        
     def setFluidDensity(self, denisty):
         self._fluidDensity = denisty
         
@@ -1,23 +1,62 @@
-import time, math, json, threading
-from datetime import datetime
-from utils.utils import LOG_FILE, LOCK_JSON, init_ms5837, init_qmc5883l, QMC5883L_ADDR
+import time, math, threading
+import sensors.ms5837 as ms5837
+from sensors.acquisition import AcquisitionPolicy, TemperatureSchedule
+from sensors.compass_calibration import CompassCalibrator
+from sensors.filters import AlphaBetaFilter
+from utils.metrics import METRICS
+from utils.sample import Sample
+from utils.utils import (
+    COMPASS_CALIBRATION_FILE,
+    DIVE_LOG,
+    QMC5883L_ADDR,
+    QMC5883L_DATA,
+    QMC5883L_DRDY,
+    QMC5883L_STATUS,
+    SAMPLES,
+    VSPEED,
+    init_ms5837,
+    init_qmc5883l,
+)
 
 
 class SensorsManager:
-    """Gestionnaire des capteurs de plongée"""
+    """Gestionnaire des capteurs de plongée.
 
-    def __init__(self):
+    Le thread d'acquisition lit les capteurs et journalise sans aucun verrou, puis
+    publie un nouvel instantané (`Sample` jamais modifié après publication) en
+    remplaçant la référence `sensors_data`. Les lecteurs n'attendent donc jamais
+    le bus I2C ni le disque.
+
+    Le suréchantillonnage et la période d'acquisition sont choisis par `policy`
+    selon la vitesse verticale mesurée ; `temperature_schedule` décide quand la
+    température doit être reconvertie.
+
+    Les deux capteurs partagent le bus `get_i2c()`, ouvert à l'initialisation du
+    premier capteur réel ; le compas est interrogé pendant les conversions du
+    MS5837 plutôt qu'avant elles.
+
+    La profondeur publiée, mise en tampon et utilisée par la décompression est
+    celle de `depth_filter` (objet exposant update(t, valeur) et reset()) ; la
+    mesure brute reste disponible (`profondeur_brute_m`) et est journalisée.
+
+    `ms5837` et `qmc5883l` remplacent les capteurs détectés sur le bus (par
+    exemple par les capteurs simulés de `sim`).
+    """
+
+    def __init__(self, policy=None, depth_filter=None, ms5837=None, qmc5883l=None):
         # Initiate Attributs
-        self.ms5837 = init_ms5837()
-        self.qmc5883l = init_qmc5883l()
-        self.x_offset = None
-        self.y_offset = None
-        self.sensors_data = {
-            "temp": None,
-            "press": None,
-            "depth": None,
-            "azimuth": None,
-        }
+        self.policy = policy if policy is not None else AcquisitionPolicy()
+        self.depth_filter = (
+            depth_filter if depth_filter is not None else AlphaBetaFilter()
+        )
+        self.temperature_schedule = TemperatureSchedule()
+        self.ms5837 = ms5837 if ms5837 is not None else init_ms5837()
+        self.qmc5883l = qmc5883l if qmc5883l is not None else init_qmc5883l()
+        self.compass = CompassCalibrator(COMPASS_CALIBRATION_FILE)
+        self.compass.load()
+        self.compass_raw = None  # Dernière mesure brute (x, y, z) du compas
+        self.compass_fresh = False  # Mesure du compas lue pendant ce cycle
+        self.sensors_data = Sample()
 
         # Initiate Threading
         self.stop_thread = True
@@ -25,31 +64,49 @@ class SensorsManager:
         self.thread = threading.Thread(target=self.job)
 
     def get_data(self):
-        with self.sensors_data_lock:
-            return [
-                self.sensors_data["temp"],
-                self.sensors_data["press"],
-                self.sensors_data["depth"],
-                self.sensors_data["azimuth"],
-            ]
-
-    def calibrate_qmc5883l(self, duration=10):
-        xmin = ymin = 99999
-        xmax = ymax = -99999
-        start = time.time()
-        while time.time() - start < duration:
-            x, y, z = self.read_raw_qmc5883l()
-            xmin, xmax = min(xmin, x), max(xmax, x)
-            ymin, ymax = min(ymin, y), max(ymax, y)
-            time.sleep(0.05)
-        self.x_offset = (xmax + xmin) / 2
-        self.y_offset = (ymax + ymin) / 2
+        """Retourne le dernier instantané publié (`Sample`, à ne pas modifier)."""
+        with METRICS.timer("sensors.get_data"):
+            return self.sensors_data  # Lecture atomique de la référence
+
+    def calibrate_qmc5883l(self, duration=10, on_progress=None, on_done=None):
+        """Lance la calibration du compas en tâche de fond (non bloquant).
+
+        @param on_progress: callable(float) - avancement entre 0 et 1.
+        @param on_done: callable(bool) - appelé avec le résultat de la calibration
+                        (aussitôt avec False si aucun compas n'est détecté).
+        @return: bool - False si le compas est absent ou déjà en calibration.
+        """
+        if self.qmc5883l is None:
+            print("Compass calibration: QMC5883L non détecté")
+            if on_done is not None:
+                on_done(False)
+            return False
+        return self.compass.start(
+            self.read_raw_qmc5883l,
+            duration,
+            on_progress=on_progress,
+            on_done=on_done,
+        )
 
     def is_calibrated(self):
-        return self.x_offset is not None and self.y_offset is not None
+        return self.compass.is_calibrated()
+
+    def read_qmc5883l(self):
+        """Lit le registre d'état du QMC5883L puis, si DRDY est levé, les données.
+
+        La lecture des données efface DRDY : l'état doit être lu en premier.
+
+        @return: ((x, y, z), True) si une nouvelle mesure a été lue, (None, False)
+                 sinon.
+        """
+        status = self.qmc5883l.read_i2c_block_data(QMC5883L_ADDR, QMC5883L_STATUS, 1)
+        if not status[0] & QMC5883L_DRDY:
+            return None, False
+        return self.read_raw_qmc5883l(), True
 
     def read_raw_qmc5883l(self):
-        data = self.qmc5883l.read_i2c_block_data(QMC5883L_ADDR, 0x00, 6)
+        """Lit les registres de données du QMC5883L, sans consulter DRDY."""
+        data = self.qmc5883l.read_i2c_block_data(QMC5883L_ADDR, QMC5883L_DATA, 6)
         x = data[0] | (data[1] << 8)
         y = data[2] | (data[3] << 8)
         z = data[4] | (data[5] << 8)
@@ -61,60 +118,99 @@ class SensorsManager:
             z -= 65536
         return x, y, z
 
-    def read_heading(self):
-        if not self.is_calibrated():
+    def poll_qmc5883l(self):
+        """Lit le compas si une nouvelle mesure est prête (pendant une conversion)."""
+        if self.compass_fresh or self.qmc5883l is None or not self.is_calibrated():
+            return
+        try:
+            raw, ready = self.read_qmc5883l()
+            if ready:
+                self.compass_raw = raw
+                self.compass_fresh = True
+        except Exception as e:
+            print("SM compass exception:", e)
+
+    def read_heading(self, raw=None):
+        if not self.is_calibrated() or self.qmc5883l is None:
             return -1
-        x, y, z = self.read_raw_qmc5883l()
-        x -= self.x_offset
-        y -= self.y_offset
+        x, y, z = raw if raw is not None else self.read_raw_qmc5883l()
+        x, y = self.compass.correct(x, y)
         heading = math.degrees(math.atan2(y, x))
         if heading < 0:
             heading += 360
         return heading
 
-    def log_measurement(self):
-        """Journalise les mesures courantes dans le fichier JSON"""
-        data = {
-            "timestamp": datetime.utcnow().isoformat()
-            + "Z",  # temps UTC format ISO 8601
-            "temperature_c": self.sensors_data["temp"],
-            "pression_mbar": self.sensors_data["press"],
-            "profondeur_m": self.sensors_data["depth"],
-            "azimut_deg": self.sensors_data["azimut"],
-        }
-        with LOCK_JSON:
-            try:
-                with open(LOG_FILE, "r") as f:
-                    mesures = json.load(f)
-            except Exception as e:
-                print("Log measurement exception:", e)
-                return False
-        mesures.append(data)
-        with LOCK_JSON:
-            with open(LOG_FILE, "w") as f:
-                json.dump(mesures, f, indent=2)
-        return True
+    def acquire(self, oversampling=ms5837.OSR_8192, temperature=True):
+        """Lit le compas et le capteur de pression (hors verrou).
+
+        @param oversampling: int - suréchantillonnage MS5837 (ms5837.OSR_*).
+        @param temperature: bool - False pour réutiliser la dernière température.
+        @return: Sample - nouvelle mesure, ou None si la lecture MS5837 a échoué.
+        """
+        self.compass_fresh = False
+        if not self.ms5837.read(oversampling, temperature, idle=self.poll_qmc5883l):
+            return None
+        self.poll_qmc5883l()  # Sans effet si déjà lu pendant une conversion
+        azimut = self.read_heading(self.compass_raw)
+        depth = max(self.ms5837.depth() + 0.6, 0)
+        return Sample(
+            t=time.monotonic(),
+            epoch=time.time(),
+            temperature_c=self.ms5837.temperature(),
+            pression_mbar=self.ms5837.pressure(),
+            profondeur_m=depth,
+            profondeur_brute_m=depth,
+            azimut_deg=azimut,
+        )
+
+    def filter_depth(self, sample):
+        """Filtre la profondeur d'une mesure avant sa publication."""
+        depth = self.depth_filter.update(sample.t, sample.profondeur_brute_m)
+        sample.profondeur_m = max(depth, 0)
+        return sample
+
+    def publish(self, data):
+        """Remplace atomiquement l'instantané courant."""
+        with self.sensors_data_lock:
+            self.sensors_data = data
+
+    def log_measurement(self, sample):
+        """Ajoute une mesure au journal de plongée (JSON Lines)"""
+        return DIVE_LOG.write(sample.to_record())
 
     def job(self):
         """Boucle principale du thread qui lit les capteurs et met à jour les valeurs"""
         while not self.stop_thread:
-            with self.sensors_data_lock:
-                try:
-                    self.sensors_data["azimut"] = self.read_heading()
-                    if self.ms5837.read():
-                        self.sensors_data["temp"] = self.ms5837.temperature()
-                        self.sensors_data["press"] = self.ms5837.pressure()
-                        self.sensors_data["depth"] = self.ms5837.depth() + 0.6
-                        if self.sensors_data["depth"] < 0:
-                            self.sensors_data["depth"] = 0
-                        self.log_measurement()
-                except Exception as e:
-                    print("SM job exception:", e)
-            time.sleep(0.2)
+            started = time.monotonic()
+            period = self.policy.period
+            try:
+                depth = self.sensors_data.profondeur_m
+                temperature = self.temperature_schedule.due(depth)
+                with METRICS.timer("sensors.acquire"):
+                    sample = self.acquire(self.policy.oversampling, temperature)
+                if sample is not None:
+                    self.filter_depth(sample)
+                    self.publish(sample)
+                    self.policy.update(sample.t, sample.profondeur_m)
+                    SAMPLES.append(sample)
+                    VSPEED.update(sample.t, sample.profondeur_m)
+                    with METRICS.timer("log.write"):
+                        self.log_measurement(sample)
+            except Exception as e:
+                print("SM job exception:", e)
+            remaining = period - (time.monotonic() - started)
+            if remaining < 0:
+                METRICS.count("sensors.overrun")
+            time.sleep(max(0.0, remaining))
 
     def start(self):
         """Démarre le thread de lecture continue des capteurs."""
         try:
+            SAMPLES.clear()
+            VSPEED.reset()
+            self.depth_filter.reset()
+            self.policy.reset()
+            self.temperature_schedule.reset()
             self.stop_thread = False
             self.thread.start()
         except Exception as e:
@@ -130,4 +226,6 @@ class SensorsManager:
         except Exception as e:
             print("SM stop exception:", e)
             return False
+        finally:
+            DIVE_LOG.close()
         return True
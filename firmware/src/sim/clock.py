@@ -0,0 +1,59 @@
+import time as _time
+
+
+class SimClock:
+    """Horloge accélérée pour exécuter le firmware hors cible.
+
+    S'utilise à la place du module `time` dans les modules du firmware
+    (`install`) : `time()` et `monotonic()` avancent `speed` fois plus vite que
+    le temps réel et `sleep(s)` ne dort que s / `speed` secondes. Les autres
+    fonctions (`perf_counter`, ...) restent celles du module `time`, si bien que
+    les mesures de latence sont toujours exprimées en temps réel.
+    """
+
+    def __init__(self, speed=1.0):
+        # Initiate Attributs
+        self.speed = speed
+        self.real_start = _time.monotonic()
+        self.epoch_start = _time.time()
+        self.patched = []  # (module, nom, valeur d'origine)
+
+    def elapsed(self):
+        """Temps simulé écoulé depuis la création de l'horloge (s)."""
+        return (_time.monotonic() - self.real_start) * self.speed
+
+    def monotonic(self):
+        return self.real_start + self.elapsed()
+
+    def time(self):
+        return self.epoch_start + self.elapsed()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            _time.sleep(seconds / self.speed)
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+    def install(self, *modules):
+        """Remplace `time` (ou `sleep`/`monotonic` importés) dans `modules`."""
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if value is _time:
+                    replacement = self
+                elif value is _time.sleep:
+                    replacement = self.sleep
+                elif value is _time.monotonic:
+                    replacement = self.monotonic
+                elif value is _time.time:
+                    replacement = self.time
+                else:
+                    continue
+                self.patched.append((module, name, value))
+                setattr(module, name, replacement)
+
+    def uninstall(self):
+        """Restaure les modules modifiés par `install`."""
+        while self.patched:
+            module, name, value = self.patched.pop()
+            setattr(module, name, value)
@@ -0,0 +1,70 @@
+import threading
+
+
+class SimGPIO:
+    """Substitut du module `RPi.GPIO` permettant d'injecter des appuis.
+
+    Expose le sous-ensemble de l'API utilisé par `ButtonManager`. `press(pin)`
+    appelle le callback enregistré pour la broche, comme le ferait le thread
+    d'événements de RPi.GPIO sur un front montant ; avec `hold=True`, la broche
+    reste au niveau haut (`input`) jusqu'à `release(pin)`.
+    """
+
+    BCM = 11
+    IN = 1
+    PUD_DOWN = 21
+    RISING = 31
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        # Initiate Attributs
+        self.mode = None
+        self.callbacks = {}
+        self.presses = []  # Broches pressées, dans l'ordre
+        self.held = set()  # Broches maintenues au niveau haut
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+        self.ready = threading.Event()  # Callbacks enregistrés
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pins, direction, pull_up_down=None):
+        pass
+
+    def remove_event_detect(self, pin):
+        with self.lock:
+            self.callbacks.pop(pin, None)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self.lock:
+            self.callbacks[pin] = callback
+        self.ready.set()
+
+    def cleanup(self, pins=None):
+        with self.lock:
+            self.callbacks.clear()
+        self.ready.clear()
+
+    def input(self, pin):
+        with self.lock:
+            return self.HIGH if pin in self.held else self.LOW
+
+    def press(self, pin, hold=False):
+        """Simule un appui sur la broche `pin` (numéro BCM), maintenu si `hold`."""
+        with self.lock:
+            callback = self.callbacks.get(pin)
+            if hold:
+                self.held.add(pin)
+        if callback is None:
+            return False
+        self.presses.append(pin)
+        callback(pin)
+        return True
+
+    def release(self, pin):
+        """Relâche une broche maintenue par `press(pin, hold=True)`."""
+        with self.lock:
+            self.held.discard(pin)
@@ -0,0 +1,62 @@
+import math, time
+from utils.utils import QMC5883L_ADDR, QMC5883L_DRDY, QMC5883L_STATUS
+
+
+class SimMagnetometer:
+    """QMC5883L simulé, substituable au bus I2C du compas.
+
+    Le champ horizontal mesuré est un cercle de rayon `field` tournant à
+    `rotation_dps` degrés par seconde, déformé par un fer dur (`offset`) et un
+    fer doux diagonal (`scale`) comme sur un vrai boîtier. `read_i2c_block_data`
+    expose les registres 0x00 à 0x06 (données puis état). Comme sur le vrai
+    capteur, une nouvelle mesure est produite à `odr_hz` et DRDY est effacé dès
+    que les registres de données sont lus (y compris dans la même lecture).
+    """
+
+    def __init__(
+        self,
+        heading=0.0,
+        rotation_dps=0.0,
+        field=1500,
+        offset=(300, -200),
+        scale=(1.0, 0.8),
+        odr_hz=200.0,
+    ):
+        # Initiate Attributs
+        self.heading0 = heading
+        self.rotation_dps = rotation_dps
+        self.field = field
+        self.offset = offset
+        self.scale = scale
+        self.odr_hz = odr_hz
+        self.start = time.monotonic()
+        self.reads = 0
+        self.consumed = -1  # Indice de la dernière mesure lue
+
+    def heading(self):
+        """Cap simulé à l'instant courant (degrés)."""
+        elapsed = time.monotonic() - self.start
+        return (self.heading0 + self.rotation_dps * elapsed) % 360
+
+    def raw(self):
+        angle = math.radians(self.heading())
+        x = self.offset[0] + self.scale[0] * self.field * math.cos(angle)
+        y = self.offset[1] + self.scale[1] * self.field * math.sin(angle)
+        return int(round(x)), int(round(y)), 0
+
+    def write_byte_data(self, addr, register, value):
+        pass
+
+    def read_i2c_block_data(self, addr, register, length):
+        if addr != QMC5883L_ADDR:
+            raise OSError(f"Aucun périphérique simulé en 0x{addr:02X}")
+        self.reads += 1
+        measurement = int((time.monotonic() - self.start) * self.odr_hz)
+        data = []
+        for value in self.raw():
+            value &= 0xFFFF
+            data += [value & 0xFF, value >> 8]
+        if register < QMC5883L_STATUS:
+            self.consumed = measurement  # Lecture des données : DRDY effacé
+        data.append(QMC5883L_DRDY if measurement > self.consumed else 0x00)
+        return data[register : register + length]
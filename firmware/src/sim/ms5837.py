@@ -0,0 +1,132 @@
+import bisect, random, time
+import sensors.ms5837 as ms5837
+
+SURFACE_MBAR = 1013.0  # Pression atmosphérique (101300 Pa dans ms5837.depth)
+
+
+class DiveProfile:
+    """Profil de plongée scénarisé : profondeur interpolée linéairement.
+
+    @param points: list - points (temps en s, profondeur en m), temps croissants.
+                   Avant le premier point et après le dernier, la profondeur
+                   reste celle du point extrême.
+    """
+
+    def __init__(self, points):
+        # Initiate Attributs
+        self.times = [float(t) for t, _ in points]
+        self.depths = [float(d) for _, d in points]
+
+    @property
+    def duration(self):
+        return self.times[-1]
+
+    def depth(self, t):
+        i = bisect.bisect_right(self.times, t)
+        if i == 0:
+            return self.depths[0]
+        if i == len(self.times):
+            return self.depths[-1]
+        t0, t1 = self.times[i - 1], self.times[i]
+        d0, d1 = self.depths[i - 1], self.depths[i]
+        return d0 + (d1 - d0) * (t - t0) / (t1 - t0)
+
+    @classmethod
+    def square(
+        cls, depth=18.0, bottom_min=20.0, descent=18.0, ascent=9.0, surface_s=10
+    ):
+        """Profil carré avec palier de sécurité de 3 min à 5 m.
+
+        @param descent: float - vitesse de descente (m/min).
+        @param ascent: float - vitesse de remontée (m/min).
+        """
+        t = float(surface_s)
+        points = [(0.0, 0.0), (t, 0.0)]
+        t += depth / descent * 60
+        points.append((t, depth))
+        t += bottom_min * 60
+        points.append((t, depth))
+        if depth > 5.0:
+            t += (depth - 5.0) / ascent * 60
+            points.append((t, 5.0))
+            t += 180
+            points.append((t, 5.0))
+            t += 5.0 / ascent * 60
+        else:
+            t += depth / ascent * 60
+        points.append((t, 0.0))
+        points.append((t + surface_s, 0.0))
+        return cls(points)
+
+
+class SimMS5837:
+    """MS5837 simulé, substituable au pilote `sensors.ms5837.MS5837_30BA`.
+
+    La profondeur suit `profile` en fonction du temps écoulé depuis `init()` ;
+    la pression est celle que mesurerait le capteur (mêmes conventions que
+    `ms5837.depth()`), avec un bruit gaussien optionnel de `noise_m` mètres. La
+    température décroît de `surface_c` avec la profondeur (`gradient_c_m`).
+    `read` dure le temps de conversion du vrai capteur et appelle `idle`
+    pendant chaque conversion.
+    """
+
+    def __init__(
+        self,
+        profile,
+        noise_m=0.0,
+        surface_c=20.0,
+        gradient_c_m=0.2,
+        density=ms5837.DENSITY_FRESHWATER,
+        seed=0,
+    ):
+        # Initiate Attributs
+        self.profile = profile
+        self.noise_m = noise_m
+        self.surface_c = surface_c
+        self.gradient_c_m = gradient_c_m
+        self.density = density
+        self.random = random.Random(seed)
+        self.start = None
+        self.reads = 0
+        self._pressure = SURFACE_MBAR
+        self._temperature = surface_c
+
+    def init(self):
+        self.start = time.monotonic()
+        return True
+
+    def true_depth(self):
+        """Profondeur scénarisée à l'instant courant (m)."""
+        if self.start is None:
+            self.init()
+        return self.profile.depth(time.monotonic() - self.start)
+
+    def read(self, oversampling=ms5837.OSR_8192, temperature=True, idle=None):
+        conversion = 2.5e-6 * 2 ** (8 + oversampling)
+        self._wait(conversion, idle)
+        depth = self.true_depth()
+        if self.noise_m:
+            depth += self.random.gauss(0.0, self.noise_m)
+        self._pressure = SURFACE_MBAR + depth * self.density * 9.80665 / 100
+        if temperature:
+            self._wait(conversion, idle)
+            self._temperature = self.surface_c - self.gradient_c_m * depth
+        self.reads += 1
+        return True
+
+    def _wait(self, delay, idle=None):
+        deadline = time.monotonic() + delay
+        if idle is not None:
+            idle()
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def pressure(self, conversion=ms5837.UNITS_mbar):
+        return self._pressure * conversion
+
+    def temperature(self, conversion=ms5837.UNITS_Centigrade):
+        return self._temperature
+
+    def depth(self):
+        return (self.pressure(ms5837.UNITS_Pa) - 101300) / (self.density * 9.80665)
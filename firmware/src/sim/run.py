@@ -0,0 +1,155 @@
+"""Exécute le firmware complet hors cible, en temps accéléré.
+
+Le firmware (`main.main`) tourne avec les capteurs, les boutons et l'écran
+simulés : un scénario d'appuis calibre le compas, démarre la plongée, laisse
+dérouler le profil puis termine la plongée. Le journal et la calibration sont
+écrits dans le dossier de sortie ; un résumé (débit de mesures, images
+affichées, intervalles entre images et, avec --metrics, latences des chemins
+critiques sur la dernière fenêtre de `METRICS`) est affiché en JSON.
+
+Usage : python src/sim/run.py [--depth 18] [--bottom 20] [--speed 20]
+"""
+
+import argparse, contextlib, json, os, sys, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as firmware  # noqa: E402
+import button.buttons  # noqa: E402
+import display.display_manager  # noqa: E402
+import sensors.compass_calibration  # noqa: E402
+import sensors.sensors  # noqa: E402
+import sim.magnetometer  # noqa: E402
+import sim.ms5837  # noqa: E402
+from display.framebuffer import VirtualFramebuffer  # noqa: E402
+from sim.clock import SimClock  # noqa: E402
+from sim.gpio import SimGPIO  # noqa: E402
+from sim.magnetometer import SimMagnetometer  # noqa: E402
+from sim.ms5837 import DiveProfile, SimMS5837  # noqa: E402
+from utils.dive_log import read_log  # noqa: E402
+from utils.metrics import METRICS, LatencyHistogram  # noqa: E402
+from utils.utils import FB_HEIGHT, FB_WIDTH, LOG_FILE  # noqa: E402
+
+# Broches BCM des boutons (voir ButtonManager)
+PIN_ENTER, PIN_DOWN, PIN_UP, PIN_BACK = 5, 6, 13, 26
+# Écran de configuration : calibration du compas, puis démarrage de la plongée
+CALIBRATE = [PIN_DOWN, PIN_DOWN, PIN_ENTER]
+START_DIVE = [PIN_DOWN, PIN_DOWN, PIN_ENTER]
+# Écran de plongée -> écran de sortie -> "OUI"
+END_DIVE = [PIN_BACK, PIN_UP, PIN_ENTER]
+CLOCK_MODULES = (
+    firmware,
+    button.buttons,
+    display.display_manager,
+    sensors.compass_calibration,
+    sensors.sensors,
+    sim.magnetometer,
+    sim.ms5837,
+)
+
+
+def press(gpio, clock, pins, interval):
+    for pin in pins:
+        gpio.press(pin)
+        clock.sleep(interval)
+
+
+def run(profile, speed=20.0, noise_m=0.02, calibration_s=12.0, press_interval=1.0):
+    """Déroule un scénario complet et retourne (VirtualFramebuffer, SimGPIO, durées).
+
+    À appeler depuis le dossier de sortie : le firmware y écrit `logs/`.
+    """
+    clock = SimClock(speed)
+    clock.install(*CLOCK_MODULES)
+    try:
+        display = VirtualFramebuffer(FB_WIDTH, FB_HEIGHT)
+        gpio = SimGPIO()
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=firmware.main,
+            kwargs={
+                "display": display,
+                "ms5837": SimMS5837(profile, noise_m),
+                "qmc5883l": SimMagnetometer(rotation_dps=36.0),
+                "gpio": gpio,
+                "stop": stop,
+            },
+        )
+        real_start = time.monotonic()
+        sim_start = clock.elapsed()
+        thread.start()
+        if not gpio.ready.wait(5.0):
+            raise RuntimeError("Boutons simulés non initialisés")
+        press(gpio, clock, CALIBRATE, press_interval)
+        clock.sleep(calibration_s)
+        press(gpio, clock, START_DIVE, press_interval)
+        clock.sleep(profile.duration)
+        press(gpio, clock, END_DIVE, press_interval)
+        stop.set()
+        thread.join()
+        durations = (clock.elapsed() - sim_start, time.monotonic() - real_start)
+    finally:
+        clock.uninstall()
+    return display, gpio, durations
+
+
+def summarize(display, gpio, durations, log_path):
+    """Résumé des performances du firmware pendant la simulation."""
+    sim_s, real_s = durations
+    records = [r for r in read_log(log_path) if "profondeur_m" in r]
+    intervals = LatencyHistogram(min_s=1e-4, max_s=10.0)
+    times = list(display.frame_times)
+    for previous, current in zip(times, times[1:]):
+        intervals.record(current - previous)
+    frames = len(display.frame_bytes)
+    dive_s = records[-1]["t"] - records[0]["t"] if len(records) > 1 else 0.0
+    return {
+        "speed": round(sim_s / real_s, 1) if real_s else None,
+        "sim_s": round(sim_s, 1),
+        "real_s": round(real_s, 2),
+        "presses": len(gpio.presses),
+        "samples": len(records),
+        "sample_rate_hz": round(len(records) / dive_s, 2) if dive_s else None,
+        "max_depth_m": max((r["profondeur_m"] for r in records), default=None),
+        "frames": frames,
+        "fps": round(frames / real_s, 1) if real_s else None,
+        "bytes_per_frame": round(sum(display.frame_bytes) / frames) if frames else 0,
+        "frame_interval_s": intervals.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=float, default=18.0, help="profondeur (m)")
+    parser.add_argument(
+        "--bottom", type=float, default=20.0, help="temps au fond (min)"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=20.0, help="facteur d'accélération"
+    )
+    parser.add_argument("--noise", type=float, default=0.02, help="bruit capteur (m)")
+    parser.add_argument("--out", default="sim-out", help="dossier de sortie")
+    parser.add_argument(
+        "--verbose", action="store_true", help="affiche la sortie du firmware"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="ajoute les latences (METRICS) au résumé"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(os.path.join(args.out, "logs"), exist_ok=True)
+    os.chdir(args.out)
+    profile = DiveProfile.square(args.depth, args.bottom)
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            output = stack.enter_context(open("firmware.out", "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(output))
+        display, gpio, durations = run(profile, args.speed, args.noise)
+    summary = summarize(display, gpio, durations, LOG_FILE)
+    if args.metrics:
+        summary["metrics"] = METRICS.last
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import numpy as np
+from utils.utils import (
+    A_HE,
+    A_N2,
+    B_HE,
+    B_N2,
+    FRESH_WATER_M_TO_BAR,
+    K_HE,
+    K_N2,
+    PH2O_BAR,
+    TissueState,
+    normalize_gaz,
+)
+
+# Coefficients ZHL-16C sous forme de tableaux (16,)
+K_N2_ARR = np.array(K_N2)
+K_HE_ARR = np.array(K_HE)
+A_N2_ARR = np.array(A_N2)
+B_N2_ARR = np.array(B_N2)
+A_HE_ARR = np.array(A_HE)
+B_HE_ARR = np.array(B_HE)
+
+# Borne de k * durée d'un bloc pour que exp(k * t) reste loin du débordement
+MAX_BLOCK_DECAY = 50.0
+MAX_BLOCK_SAMPLES = 8192
+
+
+def depth_m_to_amb_bar(depth_m):
+    """Pression ambiante (bar) en eau douce, pour un scalaire ou un tableau."""
+    return 1.0 + np.asarray(depth_m, dtype=float) * FRESH_WATER_M_TO_BAR
+
+
+def inspired_pp(pamb, fraction):
+    """Pression partielle inspirée, pour un scalaire ou un tableau."""
+    return np.maximum(0.0, (pamb - PH2O_BAR) * fraction)
+
+
+def schreiner(P, Pi, rate, k, dt):
+    """Équation de Schreiner appliquée à tous les compartiments d'un coup."""
+    return (Pi + rate * (dt - 1.0 / k)) + (P - Pi + rate / k) * np.exp(-k * dt)
+
+
+def _composite_a_b(Pn2, Phe):
+    """Coefficients a, b pondérés N2/He, pour un état (16,) ou une série (n, 16)."""
+    Pt = Pn2 + Phe
+    safe_total = np.where(Pt > 1e-9, Pt, 1.0)
+    a = np.where(Pt > 1e-9, (A_N2_ARR * Pn2 + A_HE_ARR * Phe) / safe_total, A_N2_ARR)
+    b = np.where(Pt > 1e-9, (B_N2_ARR * Pn2 + B_HE_ARR * Phe) / safe_total, B_N2_ARR)
+    return a, b
+
+
+def can_surface(Pn2, Phe, gf_high):
+    """Tensions sous la valeur M de surface à GF haut (voir utils.can_surface).
+
+    @return: bool pour un état unique, tableau (n,) pour une série.
+    """
+    Pn2 = np.asarray(Pn2, dtype=float)
+    Phe = np.asarray(Phe, dtype=float)
+    a, b = _composite_a_b(Pn2, Phe)
+    limit = a * gf_high + (gf_high / b + 1.0 - gf_high)
+    ok = (Pn2 + Phe <= limit).all(axis=-1)
+    return bool(ok) if ok.ndim == 0 else ok
+
+
+def ceiling(Pn2, Phe, pamb, gf_low, gf_high):
+    """Plafond (m) avec interpolation GF, pour un état (16,) ou une série (n, 16).
+
+    @return: float pour un état unique, tableau (n,) pour une série.
+    """
+    Pn2 = np.asarray(Pn2, dtype=float)
+    Phe = np.asarray(Phe, dtype=float)
+    pamb = np.asarray(pamb, dtype=float)
+    depth = np.maximum(0.0, (pamb - 1.0) / FRESH_WATER_M_TO_BAR)
+    gf = np.clip(gf_low + (gf_high - gf_low) * (1 - depth / 100.0), 0.0, 1.0)
+    gf = gf[..., np.newaxis]
+    Pt = Pn2 + Phe
+    a, b = _composite_a_b(Pn2, Phe)
+    amb_min = (Pt - a * gf) / (gf / b + 1.0 - gf)
+    max_amb_needed = np.maximum(amb_min.max(axis=-1), 0.0)
+    ceiling_m = np.maximum(0.0, (max_amb_needed - 1.0) / FRESH_WATER_M_TO_BAR)
+    return float(ceiling_m) if ceiling_m.ndim == 0 else ceiling_m
+
+
+def _integrate_gas(P0, Pi, dt, k, history):
+    """Intègre une composante gazeuse sur tout le profil, bloc par bloc.
+
+    Chaque pas de Schreiner s'écrit P[j+1] = e[j] * P[j] + c[j] ; sur un bloc, la
+    récurrence se résout par sommes cumulées :
+        P[j] = E[j] * (P0 + cumsum(c / E)[j])   avec E[j] = exp(-k * cumsum(dt)[j])
+    Les blocs sont bornés en durée pour garder E dans la plage des flottants.
+    """
+    n = len(dt)
+    rate = np.divide(np.diff(Pi), dt, out=np.zeros(n), where=dt > 0)
+    Pi0 = Pi[:-1]
+    P = np.array(P0, dtype=float)
+    out = np.empty((n, 16)) if history else None
+    elapsed = np.concatenate(([0.0], np.cumsum(dt)))
+    k_max = k.max()
+    start = 0
+    while start < n:
+        limit = elapsed[start] + MAX_BLOCK_DECAY / k_max
+        stop = int(np.searchsorted(elapsed, limit, side="right")) - 1
+        stop = min(max(stop, start + 1), start + MAX_BLOCK_SAMPLES, n)
+        block_dt = dt[start:stop, np.newaxis]
+        block_rate = rate[start:stop, np.newaxis]
+        block_pi = Pi0[start:stop, np.newaxis]
+        decay = np.exp(-k * block_dt)
+        c = (
+            block_pi
+            + block_rate * (block_dt - 1.0 / k)
+            - (block_pi - block_rate / k) * decay
+        )
+        if stop - start == 1:
+            states = P * decay + c  # Pas isolé (longue interruption)
+        else:
+            tau = elapsed[start + 1 : stop + 1, np.newaxis] - elapsed[start]
+            growth = np.exp(k * tau)  # 1 / E
+            states = (P + np.cumsum(c * growth, axis=0)) / growth
+        if history:
+            out[start:stop] = states
+        P = states[-1]
+        start = stop
+    return (P, out) if history else (P, None)
+
+
+def integrate_profile(t, depth_m, gaz, Pn2_0=None, Phe_0=None, history=False):
+    """Intègre un profil complet (tableaux de temps en s et de profondeur en m).
+
+    Les tissus partent de l'équilibre à la première profondeur, sauf si un état
+    initial est fourni. Le profil doit être trié par temps croissant.
+
+    @return: (Pn2, Phe) tableaux (16,) de l'état final, ou séries (n - 1, 16)
+             des états après chaque pas si `history` est vrai.
+    """
+    _, fN2, fHe = normalize_gaz(gaz)
+    t = np.asarray(t, dtype=float)
+    pamb = depth_m_to_amb_bar(depth_m)
+    PiN2 = inspired_pp(pamb, fN2)
+    PiHe = inspired_pp(pamb, fHe)
+    if Pn2_0 is None:
+        Pn2_0 = np.full(16, PiN2[0])
+    if Phe_0 is None:
+        Phe_0 = np.full(16, PiHe[0])
+    if len(t) < 2:
+        empty = np.empty((0, 16))
+        if history:
+            return empty, empty
+        return np.array(Pn2_0, dtype=float), np.array(Phe_0, dtype=float)
+    dt = np.maximum(np.diff(t), 0.0)
+    Pn2, Pn2_hist = _integrate_gas(Pn2_0, PiN2, dt, K_N2_ARR, history)
+    Phe, Phe_hist = _integrate_gas(Phe_0, PiHe, dt, K_HE_ARR, history)
+    if history:
+        return Pn2_hist, Phe_hist
+    return Pn2, Phe
+
+
+class VectorTissueState(TissueState):
+    """Variante de TissueState dont les compartiments sont des tableaux NumPy."""
+
+    def reset(self, t, depth_m):
+        super().reset(t, depth_m)
+        self.Pn2 = np.array(self.Pn2)
+        self.Phe = np.array(self.Phe)
+
+    def advance(self, t, depth_m):
+        if self.t is None:
+            self.reset(t, depth_m)
+            return
+        dt = t - self.t
+        if dt < 0:
+            return  # Mesure hors ordre
+        if dt > 0:
+            pamb0 = 1.0 + self.depth * FRESH_WATER_M_TO_BAR
+            pamb1 = 1.0 + depth_m * FRESH_WATER_M_TO_BAR
+            for gas, fraction, k in (
+                ("Pn2", self.fN2, K_N2_ARR),
+                ("Phe", self.fHe, K_HE_ARR),
+            ):
+                Pi0 = max(0.0, (pamb0 - PH2O_BAR) * fraction)
+                Pi1 = max(0.0, (pamb1 - PH2O_BAR) * fraction)
+                P = schreiner(getattr(self, gas), Pi0, (Pi1 - Pi0) / dt, k, dt)
+                setattr(self, gas, P)
+            self.t = t
+        self.depth = depth_m
+
+    def advance_profile(self, t, depth_m):
+        """Intègre d'un coup un tableau de mesures postérieures à l'état courant."""
+        t = np.asarray(t, dtype=float)
+        depth_m = np.asarray(depth_m, dtype=float)
+        if self.t is None:
+            if len(t) == 0:
+                return
+            self.reset(t[0], depth_m[0])
+        keep = t >= self.t
+        t = np.concatenate(([self.t], t[keep]))
+        depth_m = np.concatenate(([self.depth], depth_m[keep]))
+        gaz = {"O2": 1.0 - self.fN2 - self.fHe, "N2": self.fN2, "He": self.fHe}
+        self.Pn2, self.Phe = integrate_profile(t, depth_m, gaz, self.Pn2, self.Phe)
+        self.t = t[-1]
+        self.depth = depth_m[-1]
+
+    def can_surface(self):
+        return self.t is None or can_surface(self.Pn2, self.Phe, self.gf_high)
+
+    def ceiling(self):
+        if self.t is None:
+            return 0.0
+        pamb = 1.0 + self.depth * FRESH_WATER_M_TO_BAR
+        return ceiling(self.Pn2, self.Phe, pamb, self.gf_low, self.gf_high)
@@ -0,0 +1,161 @@
+import json, os, re, time, threading
+
+
+class DiveLogWriter:
+    """Journal de plongée en ajout seul (JSON Lines : un enregistrement par ligne).
+
+    Le fichier reste ouvert pendant la plongée et les écritures sont vidées vers le
+    système par lots (`flush_every` enregistrements ou `flush_interval` secondes).
+    """
+
+    def __init__(self, path, lock=None, flush_every=25, flush_interval=2.0):
+        # Initiate Attributs
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.file = None
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+        # Initiate Threading
+        self.lock = lock if lock is not None else threading.Lock()
+
+    def open(self):
+        """Ouvre le fichier en mode ajout (converti s'il est au format tableau)."""
+        with self.lock:
+            self._open()
+
+    def _open(self):
+        if self.file is not None:
+            return
+        _migrate_legacy(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, record):
+        """Ajoute un enregistrement au journal.
+
+        @param record: dict sérialisable en JSON.
+        @return: bool - True si l'enregistrement a été ajouté, False sinon.
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            try:
+                self._open()
+                self.file.write(line)
+                self.pending += 1
+                if (
+                    self.pending >= self.flush_every
+                    or time.monotonic() - self.last_flush >= self.flush_interval
+                ):
+                    self._flush()
+            except Exception as e:
+                print("Log write exception:", e)
+                return False
+        return True
+
+    def flush(self):
+        """Vide immédiatement les enregistrements en attente vers le fichier."""
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.file is None:
+            return
+        self.file.flush()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Vide les données en attente, synchronise le fichier et le ferme."""
+        with self.lock:
+            if self.file is None:
+                return
+            try:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            except Exception as e:
+                print("Log close exception:", e)
+            finally:
+                self.file.close()
+                self.file = None
+                self.pending = 0
+
+
+def iter_log(path):
+    """Itère sur les enregistrements d'un journal, JSON Lines ou ancien tableau JSON.
+
+    Une dernière ligne tronquée (coupure pendant une écriture) est ignorée. Un
+    ancien tableau tronqué est relu jusqu'au dernier enregistrement complet.
+    """
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        if not head:
+            return
+        if head == "[":
+            f.seek(0)
+            text = f.read()
+            try:
+                records = json.loads(text)
+            except json.JSONDecodeError:
+                records = _salvage_array(text)
+            yield from records
+            return
+        f.seek(0)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def read_log(path):
+    """Retourne la liste complète des enregistrements d'un journal."""
+    return list(iter_log(path))
+
+
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def _salvage_array(text):
+    """Enregistrements complets d'un tableau JSON tronqué (réécriture interrompue)."""
+    decoder = json.JSONDecoder()
+    records = []
+    pos = text.index("[") + 1
+    while True:
+        pos = _SEPARATOR.match(text, pos).end()
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            record, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            print(f"Log legacy truncated, {len(records)} records recovered")
+            break
+        records.append(record)
+    return records
+
+
+def _migrate_legacy(path):
+    """Réécrit un journal au format tableau JSON en JSON Lines (une seule fois)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read(1) != "[":
+                return
+    except FileNotFoundError:
+        return
+    records = read_log(path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
@@ -0,0 +1,222 @@
+import bisect, json, math, os, threading, time
+
+STATS_FILE = "logs/stats.json"  # JSON Lines, une fenêtre par ligne
+STATS_MAX_BYTES = 512 * 1024  # Taille au-delà de laquelle le fichier est archivé
+
+
+class LatencyHistogram:
+    """Histogramme de latences à seaux logarithmiques, thread-safe.
+
+    Les seaux couvrent [min_s, max_s] avec `buckets_per_decade` seaux par décade ;
+    les percentiles sont estimés par la borne supérieure du seau concerné.
+    """
+
+    def __init__(self, min_s=1e-6, max_s=1.0, buckets_per_decade=10):
+        # Initiate Attributs
+        decades = math.log10(max_s / min_s)
+        n = int(round(decades * buckets_per_decade))
+        self.bounds = [min_s * 10 ** (i / buckets_per_decade) for i in range(n + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)  # Dernier seau : > max_s
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        """Ajoute une mesure de latence (secondes)."""
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p):
+        """Latence (s) sous laquelle se trouvent `p` % des mesures (None si vide)."""
+        with self.lock:
+            if self.count == 0:
+                return None
+            rank = math.ceil(self.count * p / 100.0)
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= max(rank, 1):
+                    if index < len(self.bounds):
+                        return min(self.bounds[index], self.max)
+                    return self.max
+            return self.max
+
+    def summary(self):
+        """Résumé {count, mean, p50, p99, max} en secondes."""
+        with self.lock:
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean": total / count if count else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": maximum if count else None,
+        }
+
+    def reset(self):
+        """Remet l'histogramme à zéro."""
+        with self.lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+
+class Timer:
+    """Chronomètre (contexte `with`) alimentant un histogramme de latences."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class NullTimer:
+    """Chronomètre sans effet, utilisé quand l'instrumentation est désactivée."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class MetricsRegistry:
+    """Registre des chronomètres et compteurs des chemins critiques.
+
+    Désactivé à la création : `timer()` retourne alors un contexte vide partagé
+    et `count()` rend la main aussitôt (un test d'attribut par appel). Le
+    firmware l'active au démarrage (`METRICS_ENABLED`). Une fois activé, les
+    durées sont agrégées par fenêtres de `interval` secondes : `tick()` clôt la
+    fenêtre écoulée, la conserve dans `last` (percentiles glissants affichés par
+    l'écran de diagnostic) et l'ajoute à `path` ; `close()` enregistre la
+    fenêtre en cours à l'arrêt. Quand `path` dépasse `max_bytes`, il est renommé
+    en `path.1` (archive précédente écrasée) : le fichier ne grossit pas sans fin
+    sur la carte SD.
+    """
+
+    def __init__(
+        self, path=STATS_FILE, interval=10.0, enabled=False, max_bytes=STATS_MAX_BYTES
+    ):
+        # Initiate Attributs
+        self.path = path
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.enabled = enabled
+        self.timers = {}  # nom -> LatencyHistogram
+        self.counters = {}  # nom -> int
+        self.window_start = time.monotonic()
+        self.last = None  # Résumé de la dernière fenêtre close
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def timer(self, name):
+        """Contexte chronométrant le bloc `with` sous le nom `name`."""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self.histogram(name))
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def histogram(self, name):
+        histogram = self.timers.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.timers.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def snapshot(self):
+        """Résumé de la fenêtre courante {t, window_s, timers, counters}."""
+        with self.lock:
+            timers = dict(self.timers)
+            counters = dict(self.counters)
+        return {
+            "t": time.time(),
+            "window_s": time.monotonic() - self.window_start,
+            "timers": {name: h.summary() for name, h in sorted(timers.items())},
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def tick(self):
+        """Clôt la fenêtre si `interval` est écoulé (à appeler régulièrement).
+
+        @return: bool - True si une fenêtre a été close et enregistrée.
+        """
+        if not self.enabled or time.monotonic() - self.window_start < self.interval:
+            return False
+        self.last = self.snapshot()
+        self.reset()
+        return self.dump(self.last)
+
+    def dump(self, stats):
+        """Ajoute un résumé au fichier de statistiques (archivé s'il est plein)."""
+        if self.path is None:
+            return True
+        try:
+            if (
+                os.path.exists(self.path)
+                and os.path.getsize(self.path) >= self.max_bytes
+            ):
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(stats) + "\n")
+        except Exception as e:
+            print("Metrics dump exception:", e)
+            return False
+        return True
+
+    def close(self):
+        """Enregistre la fenêtre en cours (si activé) puis désactive le registre."""
+        if self.enabled:
+            self.last = self.snapshot()
+            self.reset()
+            self.dump(self.last)
+        self.enabled = False
+
+    def reset(self):
+        """Ouvre une nouvelle fenêtre."""
+        with self.lock:
+            for histogram in self.timers.values():
+                histogram.reset()
+            self.counters = {}
+            self.window_start = time.monotonic()
+
+
+# Registre global des mesures de performance (voir display.screens.diag_screen)
+METRICS = MetricsRegistry()
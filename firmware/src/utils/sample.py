@@ -0,0 +1,118 @@
+from datetime import datetime
+
+
+class Sample:
+    """Mesure d'un cycle d'acquisition.
+
+    `t` est l'instant de la mesure en secondes `time.monotonic()` (insensible aux
+    sauts d'horloge, utilisé pour la vitesse verticale et la décompression) ;
+    `epoch` est l'heure murale correspondante, qui ne sert qu'au journal. Les
+    champs valent None tant qu'aucune mesure n'a été faite.
+    Un échantillon publié par `SensorsManager` n'est plus modifié.
+    """
+
+    __slots__ = (
+        "t",
+        "epoch",
+        "temperature_c",
+        "pression_mbar",
+        "profondeur_m",
+        "profondeur_brute_m",
+        "azimut_deg",
+    )
+
+    def __init__(
+        self,
+        t=None,
+        epoch=None,
+        temperature_c=None,
+        pression_mbar=None,
+        profondeur_m=None,
+        profondeur_brute_m=None,
+        azimut_deg=None,
+    ):
+        # Initiate Attributs
+        self.t = t
+        self.epoch = epoch
+        self.temperature_c = temperature_c
+        self.pression_mbar = pression_mbar
+        self.profondeur_m = profondeur_m
+        self.profondeur_brute_m = profondeur_brute_m
+        self.azimut_deg = azimut_deg
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Sample({fields})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Sample):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def to_record(self):
+        """Enregistrement JSON du journal de plongée (format inchangé)."""
+        return {
+            "t": self.epoch,  # secondes epoch
+            "timestamp": datetime.utcfromtimestamp(self.epoch).isoformat()
+            + "Z",  # temps UTC format ISO 8601
+            "temperature_c": self.temperature_c,
+            "pression_mbar": self.pression_mbar,
+            "profondeur_m": self.profondeur_m,
+            "profondeur_brute_m": self.profondeur_brute_m,
+            "azimut_deg": self.azimut_deg,
+        }
+
+
+class DiveFrame:
+    """Valeurs affichées en plongée : mesure courante et résultats de calcul."""
+
+    __slots__ = (
+        "temperature_c",
+        "profondeur_m",
+        "azimut_deg",
+        "mod",
+        "ndl",
+        "palier",
+        "palier_time",
+        "tts",
+    )
+
+    def __init__(
+        self,
+        temperature_c=None,
+        profondeur_m=None,
+        azimut_deg=None,
+        mod=None,
+        ndl="-",
+        palier="-",
+        palier_time="-",
+        tts="-",
+    ):
+        # Initiate Attributs
+        self.temperature_c = temperature_c
+        self.profondeur_m = profondeur_m
+        self.azimut_deg = azimut_deg
+        self.mod = mod
+        self.ndl = ndl
+        self.palier = palier
+        self.palier_time = palier_time
+        self.tts = tts
+
+    @classmethod
+    def from_sample(cls, sample, mod, ndl, palier, palier_time, tts="-"):
+        return cls(
+            sample.temperature_c,
+            sample.profondeur_m,
+            sample.azimut_deg,
+            mod,
+            ndl,
+            palier,
+            palier_time,
+            tts,
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"DiveFrame({fields})"
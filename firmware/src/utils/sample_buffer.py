@@ -0,0 +1,122 @@
+import threading
+import numpy as np
+from utils.sample import Sample
+
+# Colonnes conservées : (champ de Sample, type NumPy). Le temps reste en float64
+# (float32 ne garde que ~0,1 s de précision sur une horloge monotone de plusieurs
+# jours) ; les mesures tiennent en float32. Une valeur absente est stockée en NaN.
+COLUMNS = (
+    ("t", np.float64),
+    ("temperature_c", np.float32),
+    ("pression_mbar", np.float32),
+    ("profondeur_m", np.float32),
+    ("profondeur_brute_m", np.float32),
+    ("azimut_deg", np.float32),
+)
+
+
+class SampleBuffer:
+    """Historique circulaire, borné et thread-safe des mesures de la plongée.
+
+    Alimenté par le thread des capteurs, il sert de source de données à l'affichage
+    et au calcul de décompression ; le journal sur disque ne sert qu'à la persistance.
+    Les mesures (`Sample`, `t` croissant) sont rangées par colonnes dans des
+    tableaux NumPy alloués une fois pour toutes : 28 octets par mesure, sans
+    allocation par mesure.
+
+    Les lectures (`since`, `last`, `all`) retournent un dict {colonne: tableau}
+    en copie, dans l'ordre chronologique.
+    """
+
+    def __init__(self, capacity):
+        # Initiate Attributs
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype) for name, dtype in COLUMNS}
+        self.head = 0  # Prochain emplacement écrit
+        self.size = 0
+        self.max_depth = None
+        self.count = 0
+        self.generation = 0  # Incrémenté à chaque remise à zéro (nouvelle plongée)
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            return self.size
+
+    def append(self, sample):
+        """Ajoute une mesure et met à jour la profondeur maximale."""
+        depth = sample.profondeur_m
+        with self.lock:
+            i = self.head
+            for name, column in self.columns.items():
+                value = getattr(sample, name)
+                column[i] = np.nan if value is None else value
+            self.head = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self.count += 1
+            if depth is not None and (self.max_depth is None or depth > self.max_depth):
+                self.max_depth = depth
+
+    def clear(self):
+        """Vide le tampon au début d'une nouvelle plongée."""
+        with self.lock:
+            self.head = 0
+            self.size = 0
+            self.max_depth = None
+            self.count = 0
+            self.generation += 1
+
+    def latest(self):
+        """Retourne la dernière mesure (`Sample`) ou None."""
+        with self.lock:
+            if not self.size:
+                return None
+            i = self.head - 1
+            values = {}
+            for name, column in self.columns.items():
+                value = column[i].item()
+                values[name] = None if value != value else value  # NaN -> None
+        return Sample(**values)
+
+    def last(self, n):
+        """Retourne les `n` dernières mesures, de la plus ancienne à la plus récente."""
+        with self.lock:
+            return self._slice(max(self.size - max(n, 0), 0))
+
+    def since(self, t):
+        """Retourne les mesures strictement postérieures à `t` (secondes monotones)."""
+        with self.lock:
+            # Recherche dichotomique sur les indices chronologiques (t croissant)
+            low, high = 0, self.size
+            times = self.columns["t"]
+            offset = self.head - self.size
+            while low < high:
+                mid = (low + high) // 2
+                if times[(offset + mid) % self.capacity] <= t:
+                    low = mid + 1
+                else:
+                    high = mid
+            return self._slice(low)
+
+    def all(self):
+        """Retourne une copie de toutes les mesures du tampon."""
+        with self.lock:
+            return self._slice(0)
+
+    def _slice(self, start):
+        """Copie chronologique des mesures d'indice `start` à la fin (verrou acquis)."""
+        first = (self.head - self.size + start) % self.capacity
+        count = self.size - start
+        if first + count <= self.capacity:
+            return {
+                name: column[first : first + count].copy()
+                for name, column in self.columns.items()
+            }
+        return {
+            name: np.concatenate(
+                (column[first:], column[: first + count - self.capacity])
+            )
+            for name, column in self.columns.items()
+        }
@@ -1,9 +1,16 @@
 from enum import Enum
-import math, json, threading, smbus2
+from collections import OrderedDict
+import bisect, math, threading
 from datetime import datetime
 from typing import List, Dict, Tuple
 from PIL import ImageFont
 import sensors.ms5837 as ms5837
+from sensors.i2c_bus import I2CBus
+from display.framebuffer import Framebuffer, VirtualFramebuffer
+from display.glyph_atlas import GlyphAtlas
+from utils.dive_log import DiveLogWriter
+from utils.sample_buffer import SampleBuffer
+from utils.vertical_speed import VerticalSpeedEstimator
 
 # Global fonts
 try:
@@ -15,16 +22,35 @@ except Exception as e:
     print(f"Font loading exception: {e}")
     FT_BIG = ImageFont.load_default()
     FT_SMALL = ImageFont.load_default()
+# Global glyph caches (champs numériques dessinés sans FreeType)
+GLYPHS = {FT_BIG: GlyphAtlas(FT_BIG), FT_SMALL: GlyphAtlas(FT_SMALL)}
 
 # Global attributs
 LOCK_JSON = threading.Lock()
 FBDEV = "/dev/fb1"
-LOG_FILE = "logs/mesures.json"
+FB_WIDTH = 480
+FB_HEIGHT = 320
+DISPLAY_MIN_INTERVAL = 0.1  # s, délai minimal entre deux images
+DISPLAY_MAX_INTERVAL = 1.0  # s, délai maximal sans rafraîchissement
+MAIN_PERIOD = 0.5  # s, période (et budget) de la boucle principale
+DIAG_HOLD_S = 2.0  # s, appui long sur BACK (configuration) : écran de diagnostic
+METRICS_ENABLED = True  # Instrumentation (utils.metrics) active dès le démarrage
+LOG_FILE = "logs/mesures.json"  # JSON Lines (un enregistrement par ligne)
+DIVE_LOG = DiveLogWriter(LOG_FILE, LOCK_JSON)
+SAMPLE_BUFFER_SIZE = 4 * 3600 * 10  # 4 h de mesures à 10 Hz (~4 Mo)
+SAMPLES = SampleBuffer(SAMPLE_BUFFER_SIZE)
+VSPEED = VerticalSpeedEstimator()  # Vitesse verticale, alimentée par les capteurs
+I2C_BUS = 1
+I2C = {"bus": None}  # Bus partagé par le MS5837 et le QMC5883L (voir get_i2c)
+LOCK_I2C = threading.Lock()
 # Compas config
-QMC5883L_BUS = 1
 QMC5883L_ADDR = 0x0D
 QMC5883L_REGISTER = 0x09
 QMC5883L_VALUE = 0b00011101
+QMC5883L_DATA = 0x00  # Registres X, Y, Z (LSB puis MSB) : 6 octets
+QMC5883L_STATUS = 0x06  # Registre d'état
+QMC5883L_DRDY = 0x01  # Nouvelle mesure disponible (effacé par la lecture des données)
+COMPASS_CALIBRATION_FILE = "logs/compas.json"  # Coefficients fer dur / fer doux
 
 
 # Global enum
@@ -90,26 +116,44 @@ class EXIT_SELECTOR(Enum):
 def init_display():
     """Initialise le framebuffer pour l'affichage."""
     try:
-        fb = open(FBDEV, "wb")
+        fb = Framebuffer(FBDEV, FB_WIDTH, FB_HEIGHT)
     except Exception as e:
         print(f"Impossible d'ouvrir {FBDEV} ({e}), mode simulation")
-        return None
+        return VirtualFramebuffer(FB_WIDTH, FB_HEIGHT)
     return fb
 
 
-def init_ms5837():
-    """Initialise le capteur MS5837 (pression/température)."""
-    sensor = ms5837.MS5837_30BA()
-    if not sensor.init():
-        print(f"Erreur: MS5837 non détecté")
+def get_i2c():
+    """Retourne le bus I2C partagé, ouvert au premier appel."""
+    with LOCK_I2C:
+        if I2C["bus"] is None:
+            I2C["bus"] = I2CBus(I2C_BUS)
+        return I2C["bus"]
+
+
+def init_ms5837(bus=None):
+    """Initialise le capteur MS5837 (pression/température).
+
+    @param bus: I2CBus - bus à utiliser (par défaut le bus partagé `get_i2c()`).
+    """
+    sensor = ms5837.MS5837_30BA(bus if bus is not None else get_i2c())
+    try:
+        if not sensor.init():
+            print(f"Erreur: MS5837 non détecté")
+            return None
+    except Exception as e:
+        print(f"Erreur ({e}): MS5837 non détecté")
         return None
     return sensor
 
 
-def init_qmc5883l():
-    """Initialise le compas QMC5883L"""
+def init_qmc5883l(bus=None):
+    """Initialise le compas QMC5883L
+
+    @param bus: I2CBus - bus à utiliser (par défaut le bus partagé `get_i2c()`).
+    """
+    bus = bus if bus is not None else get_i2c()
     try:
-        bus = smbus2.SMBus(QMC5883L_BUS)
         bus.write_byte_data(QMC5883L_ADDR, QMC5883L_REGISTER, QMC5883L_VALUE)
     except Exception as e:
         print(f"Erreur ({e}): qmc5883l non détecté")
@@ -118,9 +162,7 @@ def init_qmc5883l():
 
 
 def get_max_depth():
-    with open(LOG_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return min(item["profondeur_m"] for item in data)
+    return SAMPLES.max_depth
 
 
 def log_end(dive_time):
@@ -130,49 +172,27 @@ def log_end(dive_time):
         "dive_time": dive_time,
         "max_depth": get_max_depth(),
     }
-    with LOCK_JSON:
-        try:
-            with open(LOG_FILE, "r") as f:
-                mesures = json.load(f)
-        except Exception as e:
-            print("Log measurement exception:", e)
-            return False
-        mesures.append(data)
-        with open(LOG_FILE, "w") as f:
-            json.dump(mesures, f, indent=2)
+    if not DIVE_LOG.write(data):
+        return False
+    DIVE_LOG.close()
     return True
 
 
-def up_down_from_file():
-    """Calcule la vitesse verticale"""
-    with LOCK_JSON:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list) or len(data) < 2:
-            return "↑ 00"
-    last = data[-5:]
-    times = [
-        datetime.fromisoformat(d["timestamp"].replace("Z", "+00:00")) for d in last
-    ]
-    profondeurs = [d["profondeur_m"] for d in last]
-    delta_profondeur = profondeurs[-1] - profondeurs[0]
-    delta_temps = (times[-1] - times[0]).total_seconds() / 60
-    if delta_temps == 0:
-        return "↑ 00"
-    vitesse = delta_profondeur / delta_temps
-    if vitesse > 0:
-        return f"↓ {abs(int(vitesse)):02d}"
+def up_down():
+    """Vitesse verticale lissée au format affiché (flèche et m/min)."""
+    rate = VSPEED.smoothed
+    if rate > 0:
+        return f"↓ {abs(int(rate)):02d}"
     else:
-        return f"↑ {abs(int(vitesse)):02d}"
+        return f"↑ {abs(int(rate)):02d}"
 
 
 # Dive specifics methods and variables
 PH2O_BAR = 0.0627  # Pression vapeur d'eau alvéolaire (bar)
 FRESH_WATER_M_TO_BAR = 0.0980665  # bar par mètre d'eau douce
 LN2 = math.log(2.0)
-# Demi-vies (minutes) ZHL-16C
+# Demi-vies (minutes) ZHL-16C, compartiments 1b à 16 (alignées sur a, b)
 HALF_TIMES_N2 = [
-    4.0,
     5.0,
     8.0,
     12.5,
@@ -188,9 +208,9 @@ HALF_TIMES_N2 = [
     305.0,
     390.0,
     498.0,
+    635.0,
 ]
 HALF_TIMES_HE = [
-    1.51,
     1.88,
     3.02,
     4.72,
@@ -206,6 +226,7 @@ HALF_TIMES_HE = [
     115.29,
     147.42,
     188.24,
+    240.03,
 ]
 # Coefficients ZHL-16C (a, b) pour N2
 A_N2 = [
@@ -213,17 +234,17 @@ A_N2 = [
     1.0000,
     0.8618,
     0.7562,
-    0.6667,
-    0.5933,
-    0.5282,
-    0.4701,
-    0.4187,
-    0.3798,
-    0.3497,
-    0.3223,
-    0.2971,
-    0.2737,
-    0.2523,
+    0.6200,
+    0.5043,
+    0.4410,
+    0.4000,
+    0.3750,
+    0.3500,
+    0.3295,
+    0.3065,
+    0.2835,
+    0.2610,
+    0.2480,
     0.2327,
 ]
 B_N2 = [
@@ -282,6 +303,21 @@ B_HE = [
     0.9267,
 ]
 
+# Temps sans palier maximal affiché (min) et précision de la dichotomie avec He
+NDL_MAX_MIN = 99
+NDL_HE_ITERATIONS = 24
+# Vitesse de remontée (m/min) et durée maximale d'un palier (min) pour le planificateur
+ASCENT_RATE_M_MIN = 10.0
+MAX_STOP_MIN = 999
+# Pas nominaux mis en cache par DecayCache (s) : périodes d'acquisition
+# (sensors.acquisition.DEFAULT_TIERS), remontée d'un palier de 3 m et paliers de
+# 1 à 10 min du planificateur
+DECAY_STEPS = [0.1, 0.2, 0.5, 3.0 / ASCENT_RATE_M_MIN * 60.0]
+DECAY_STEPS += [60.0 * minutes for minutes in range(1, 11)]
+# Constantes de tissu k = ln(2) / demi-vie (s⁻¹)
+K_N2 = [LN2 / (half_time * 60.0) for half_time in HALF_TIMES_N2]
+K_HE = [LN2 / (half_time * 60.0) for half_time in HALF_TIMES_HE]
+
 
 def parse_iso_timestamp(ts: str) -> float:
     """Convertit un timestamp ISO8601 (UTC 'Z') en secondes depuis epoch."""
@@ -312,21 +348,92 @@ def schreiner_equation(Pt: float, Pi: float, rate: float, k: float, dt: float) -
     k : constante de tissu
     dt : durée (s)
     """
-    return (Pi + rate * (dt - 1.0 / k)) + (Pt - Pi - rate / k) * math.exp(-k * dt)
+    return (Pi + rate * (dt - 1.0 / k)) + (Pt - Pi + rate / k) * math.exp(-k * dt)
+
+
+class DecayCache:
+    """Cache des facteurs de Schreiner d'une composante gazeuse pour un pas `dt`.
+
+    Pour chaque compartiment, e = exp(-k·dt) et g = (1 - e) / k, de sorte qu'un
+    pas de Schreiner devienne : P' = P·e + Pi·(1 - e) + rate·(dt - g).
+    Seuls les pas à moins de `tolerance` s d'un pas nominal (`steps` : périodes
+    d'acquisition, pas du planificateur) sont mis en cache, quantifiés à
+    `quantum` s (erreur relative sur e < k·quantum/2) ; le cache peut contenir
+    toutes ces clés. Les autres pas sont calculés exactement.
+    """
+
+    def __init__(self, ks, steps=None, tolerance=0.005, quantum=0.001, size=None):
+        # Initiate Attributs
+        self.ks = ks
+        self.steps = sorted(steps if steps is not None else DECAY_STEPS)
+        self.tolerance = tolerance
+        self.quantum = quantum
+        keys_per_step = 2 * round(tolerance / quantum) + 1
+        self.size = size if size is not None else len(self.steps) * keys_per_step
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.exact = 0  # Pas hors des pas nominaux, calculés sans cache
+
+        # Initiate Threading
+        self.lock = threading.Lock()
+
+    def compute(self, dt):
+        """Calcule exactement (e, g) pour un pas `dt`."""
+        e = [math.exp(-k * dt) for k in self.ks]
+        g = [(1.0 - e_i) / k for e_i, k in zip(e, self.ks)]
+        return e, g
+
+    def is_nominal(self, dt):
+        """Indique si `dt` est à moins de `tolerance` d'un pas nominal."""
+        i = bisect.bisect_left(self.steps, dt - self.tolerance)
+        return i < len(self.steps) and self.steps[i] <= dt + self.tolerance
+
+    def hit_rate(self):
+        """Part des appels à `get` servis par le cache (None sans appel)."""
+        calls = self.hits + self.misses + self.exact
+        return self.hits / calls if calls else None
+
+    def get(self, dt):
+        """Retourne (e, g) pour un pas `dt`, depuis le cache si possible."""
+        if not self.is_nominal(dt):
+            self.exact += 1
+            return self.compute(dt)
+        key = round(dt / self.quantum)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = self.compute(key * self.quantum)
+        with self.lock:
+            self.entries[key] = entry
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return entry
+
+
+DECAY_N2 = DecayCache(K_N2)
+DECAY_HE = DecayCache(K_HE)
 
 
 def update_compartments(Pn2, Phe, PiN2_0, PiHe_0, PiN2_1, PiHe_1, dt):
     """
     Met à jour les 16 compartiments en utilisant Schreiner (variation linéaire).
+    Les facteurs exponentiels proviennent des caches DECAY_N2 / DECAY_HE.
     """
-    newN2, newHe = [], []
     rateN2 = (PiN2_1 - PiN2_0) / dt if dt > 0 else 0
     rateHe = (PiHe_1 - PiHe_0) / dt if dt > 0 else 0
-    for i in range(16):
-        kN2 = LN2 / (HALF_TIMES_N2[i] * 60.0)
-        kHe = LN2 / (HALF_TIMES_HE[i] * 60.0)
-        newN2.append(schreiner_equation(Pn2[i], PiN2_0, rateN2, kN2, dt))
-        newHe.append(schreiner_equation(Phe[i], PiHe_0, rateHe, kHe, dt))
+    eN2, gN2 = DECAY_N2.get(dt)
+    eHe, gHe = DECAY_HE.get(dt)
+    newN2 = [
+        P * e + PiN2_0 * (1.0 - e) + rateN2 * (dt - g) for P, e, g in zip(Pn2, eN2, gN2)
+    ]
+    newHe = [
+        P * e + PiHe_0 * (1.0 - e) + rateHe * (dt - g) for P, e, g in zip(Phe, eHe, gHe)
+    ]
     return newN2, newHe
 
 
@@ -339,20 +446,326 @@ def composite_a_b(Pn2_t: float, Phe_t: float, idx: int) -> Tuple[float, float]:
     return a, b
 
 
+def gradient_factor(depth_m: float, gf_low: float, gf_high: float) -> float:
+    """Facteur de gradient à une profondeur (interpolation linéaire sur 100 m)."""
+    gf = gf_low + (gf_high - gf_low) * (1 - depth_m / 100.0)
+    return max(0.0, min(1.0, gf))
+
+
 def ceiling_with_gf(Pn2, Phe, pamb, gf_low, gf_high) -> float:
     """Calcule le plafond courant (m) avec interpolation GF."""
-    depth = amb_bar_to_depth_m(pamb)
-    gf = gf_low + (gf_high - gf_low) * (1 - depth / 100.0)  # interpolation linéaire
-    gf = max(0.0, min(1.0, gf))
+    gf = gradient_factor(amb_bar_to_depth_m(pamb), gf_low, gf_high)
     max_amb_needed = 0.0
     for i in range(16):
         a, b = composite_a_b(Pn2[i], Phe[i], i)
         Pt = Pn2[i] + Phe[i]
-        amb_min = (Pt - a * gf) / (b * gf)
+        amb_min = (Pt - a * gf) / (gf / b + 1.0 - gf)
         max_amb_needed = max(max_amb_needed, amb_min)
     return amb_bar_to_depth_m(max_amb_needed)
 
 
+def surfacing_limit(a: float, b: float, gf: float) -> float:
+    """Tension tissulaire maximale (bar) permettant de remonter en surface (1 bar)."""
+    return a * gf + (gf / b + 1.0 - gf)
+
+
+def can_surface(Pn2, Phe, gf_high: float) -> bool:
+    """Indique si toutes les tensions sont sous la valeur M de surface à GF haut."""
+    for i in range(16):
+        a, b = composite_a_b(Pn2[i], Phe[i], i)
+        if Pn2[i] + Phe[i] > surfacing_limit(a, b, gf_high):
+            return False
+    return True
+
+
+def time_to_limit(P0: float, Pi: float, k: float, limit: float) -> float:
+    """Temps (s) pour que P(t) = Pi + (P0 - Pi)·e^(-kt) atteigne `limit` (Haldane).
+
+    @return: 0 si la limite est déjà atteinte, math.inf si elle ne l'est jamais.
+    """
+    if P0 >= limit:
+        return 0.0
+    if Pi <= limit:
+        return math.inf
+    return math.log((P0 - Pi) / (limit - Pi)) / k
+
+
+def normalize_gaz(gaz: Dict[str, float]) -> Tuple[float, float, float]:
+    """Normalise les fractions (O2, N2, He) d'un mélange (somme égale à 1)."""
+    fO2 = gaz.get("O2", 0.21)
+    fN2 = gaz.get("N2", 0.79)
+    fHe = gaz.get("He", 0.0)
+    s = fO2 + fN2 + fHe
+    return fO2 / s, fN2 / s, fHe / s
+
+
+class TissueState:
+    """État des 16 compartiments ZHL-16C, avancé incrémentalement.
+
+    Chaque nouvelle mesure coûte un pas de Schreiner ; le plafond et le prochain
+    palier se calculent en O(16), quelle que soit la durée de la plongée.
+    """
+
+    def __init__(
+        self,
+        gaz: Dict[str, float],
+        gf_low: float = 0.3,
+        gf_high: float = 0.85,
+        stop_interval_m: float = 3.0,
+    ):
+        # Initiate Attributs
+        _, self.fN2, self.fHe = normalize_gaz(gaz)
+        self.gf_low = gf_low
+        self.gf_high = gf_high
+        self.stop_interval_m = stop_interval_m
+        self.Pn2 = None
+        self.Phe = None
+        self.t = None
+        self.depth = None
+        self.planner = DecoPlanner()
+
+    def reset(self, t: float, depth_m: float):
+        """Initialise les tissus à l'équilibre à la profondeur donnée."""
+        pamb = depth_m_to_amb_bar(depth_m)
+        self.Pn2 = [inspired_pp(pamb, self.fN2)] * 16
+        self.Phe = [inspired_pp(pamb, self.fHe)] * 16
+        self.t = t
+        self.depth = depth_m
+
+    def copy(self):
+        """Retourne une copie indépendante (listes) de l'état, pour simulation."""
+        state = TissueState.__new__(TissueState)
+        state.__dict__.update(self.__dict__)
+        state.Pn2 = list(self.Pn2) if self.Pn2 is not None else None
+        state.Phe = list(self.Phe) if self.Phe is not None else None
+        state.planner = None
+        return state
+
+    def advance(self, t: float, depth_m: float):
+        """Intègre le segment linéaire entre la dernière mesure et (t, depth_m)."""
+        if self.t is None:
+            self.reset(t, depth_m)
+            return
+        dt = t - self.t
+        if dt < 0:
+            return  # Mesure hors ordre
+        if dt > 0:
+            pamb0 = depth_m_to_amb_bar(self.depth)
+            pamb1 = depth_m_to_amb_bar(depth_m)
+            self.Pn2, self.Phe = update_compartments(
+                self.Pn2,
+                self.Phe,
+                inspired_pp(pamb0, self.fN2),
+                inspired_pp(pamb0, self.fHe),
+                inspired_pp(pamb1, self.fN2),
+                inspired_pp(pamb1, self.fHe),
+                dt,
+            )
+            self.t = t
+        self.depth = depth_m
+
+    def ceiling(self) -> float:
+        """Plafond courant (m) avec interpolation GF."""
+        if self.t is None:
+            return 0.0
+        pamb = depth_m_to_amb_bar(self.depth)
+        return ceiling_with_gf(self.Pn2, self.Phe, pamb, self.gf_low, self.gf_high)
+
+    def can_surface(self) -> bool:
+        """Remontée directe possible : tensions sous la valeur M de surface (GF haut)."""
+        return self.t is None or can_surface(self.Pn2, self.Phe, self.gf_high)
+
+    def next_stop(self) -> float:
+        """Profondeur (m) du prochain palier, 0 si la remontée directe est possible.
+
+        Comme dans l'algorithme GF, la surface est jugée avec GF haut ; le plafond
+        (GF interpolé) ne sert qu'à placer le premier palier.
+        """
+        if self.can_surface():
+            return 0.0
+        stop = math.ceil(self.ceiling() / self.stop_interval_m) * self.stop_interval_m
+        return max(stop, self.stop_interval_m)
+
+    def ndl(self) -> float:
+        """Temps sans palier (min) à profondeur constante, borné à NDL_MAX_MIN.
+
+        Pour chaque compartiment, l'équation de Haldane est résolue analytiquement
+        pour l'instant où la tension atteint la valeur M de surface ajustée par GF
+        haut, la limite de `can_surface`. Avec de l'hélium, la somme des deux
+        exponentielles est résolue par dichotomie en NDL_HE_ITERATIONS itérations.
+        """
+        if self.t is None:
+            return NDL_MAX_MIN
+        pamb = depth_m_to_amb_bar(self.depth)
+        gf = self.gf_high
+        PiN2 = inspired_pp(pamb, self.fN2)
+        PiHe = inspired_pp(pamb, self.fHe)
+        horizon = NDL_MAX_MIN * 60.0
+        ndl_s = horizon
+        for i in range(16):
+            if self.fHe == 0.0 and self.Phe[i] <= 1e-9:
+                limit = surfacing_limit(A_N2[i], B_N2[i], gf)
+                t_i = time_to_limit(self.Pn2[i], PiN2, K_N2[i], limit)
+            else:
+                t_i = self._time_to_limit_mixed(i, PiN2, PiHe, gf, ndl_s)
+            ndl_s = min(ndl_s, t_i)
+            if ndl_s <= 0.0:
+                return 0.0
+        return ndl_s / 60.0
+
+    def _time_to_limit_mixed(self, i, PiN2, PiHe, gf, horizon):
+        """Temps (s, borné à `horizon`) avant dépassement pour un mélange N2/He."""
+
+        def margin(t):
+            Pn2 = PiN2 + (self.Pn2[i] - PiN2) * math.exp(-K_N2[i] * t)
+            Phe = PiHe + (self.Phe[i] - PiHe) * math.exp(-K_HE[i] * t)
+            a, b = composite_a_b(Pn2, Phe, i)
+            return surfacing_limit(a, b, gf) - (Pn2 + Phe)
+
+        if margin(0.0) <= 0.0:
+            return 0.0
+        if margin(horizon) > 0.0:
+            return horizon
+        low, high = 0.0, horizon
+        for _ in range(NDL_HE_ITERATIONS):
+            mid = (low + high) / 2
+            if margin(mid) > 0.0:
+                low = mid
+            else:
+                high = mid
+        return low
+
+    def plan(self):
+        """Retourne le plan de décompression courant (mémoïsé, voir DecoPlanner)."""
+        return self.planner.plan(self)
+
+    def ndl_palier_tpalier(self):
+        """Retourne (NDL, prochain palier, temps au palier) formatés pour l'écran."""
+        next_stop = self.next_stop()
+        if next_stop <= 0.0:
+            return f"{int(self.ndl()):02d}", "-", "-"
+        stops = self.plan()["stops"]
+        depth, minutes = stops[0] if stops else (next_stop, 0)
+        return "-", f"{int(depth):02d}", f"{minutes:02d}"
+
+
+class DecoPlanner:
+    """Planificateur de décompression : remontée à vitesse fixe et paliers de
+    `stop_interval_m` mètres tenus jusqu'à ce que le plafond atteigne le palier
+    suivant.
+
+    La durée de chaque palier est obtenue par recherche binaire sur des minutes
+    entières, chaque essai évaluant l'équation de Haldane en O(16). Le dernier
+    plan est mémoïsé et n'est recalculé que si l'état tissulaire a bougé de plus
+    de `tension_eps` bar, la profondeur de plus de `depth_eps` m, ou après
+    `max_age` secondes.
+    """
+
+    def __init__(
+        self,
+        ascent_rate_m_min=ASCENT_RATE_M_MIN,
+        tension_eps=0.01,
+        depth_eps=0.5,
+        max_age=30.0,
+    ):
+        # Initiate Attributs
+        self.ascent_rate_m_min = ascent_rate_m_min
+        self.tension_eps = tension_eps
+        self.depth_eps = depth_eps
+        self.max_age = max_age
+        self.cached = None
+        self.key = None
+        self.computations = 0
+
+    def is_fresh(self, state):
+        """Indique si le plan mémoïsé est encore valable pour `state`."""
+        if self.cached is None:
+            return False
+        Pn2, Phe, depth, t = self.key
+        if abs(state.depth - depth) > self.depth_eps or state.t - t > self.max_age:
+            return False
+        for cached, current in ((Pn2, state.Pn2), (Phe, state.Phe)):
+            for old, new in zip(cached, current):
+                if abs(new - old) > self.tension_eps:
+                    return False
+        return True
+
+    def plan(self, state):
+        """Retourne {"stops": [(profondeur_m, minutes), ...], "tts": minutes}.
+
+        Les paliers de durée nulle (plafond dégagé pendant la remontée) sont omis.
+        """
+        if not self.is_fresh(state):
+            self.cached = self.compute(state)
+            self.key = (list(state.Pn2), list(state.Phe), state.depth, state.t)
+            self.computations += 1
+        return self.cached
+
+    def compute(self, state):
+        """Simule la remontée depuis `state` et construit le plan complet."""
+        sim = state.copy()
+        stops = []
+        tts = 0.0
+        stop_depth = sim.next_stop()
+        while stop_depth > 0.0:
+            tts += self.ascend(sim, stop_depth)
+            next_depth = max(0.0, stop_depth - sim.stop_interval_m)
+            minutes = self.stop_minutes(sim, next_depth)
+            if minutes > 0:
+                sim.advance(sim.t + minutes * 60.0, stop_depth)
+                stops.append((stop_depth, minutes))
+                tts += minutes
+            stop_depth = next_depth
+        tts += self.ascend(sim, 0.0)
+        return {"stops": stops, "tts": math.ceil(tts)}
+
+    def ascend(self, sim, depth_m):
+        """Remonte `sim` jusqu'à `depth_m` et retourne la durée (min)."""
+        if depth_m >= sim.depth:
+            return 0.0
+        minutes = (sim.depth - depth_m) / self.ascent_rate_m_min
+        sim.advance(sim.t + minutes * 60.0, depth_m)
+        return minutes
+
+    def stop_minutes(self, sim, next_depth):
+        """Durée minimale (min entières) au palier pour que le plafond atteigne
+        `next_depth` (la surface : `can_surface`)."""
+        pamb = depth_m_to_amb_bar(sim.depth)
+        PiN2 = inspired_pp(pamb, sim.fN2)
+        PiHe = inspired_pp(pamb, sim.fHe)
+
+        def cleared(minutes):
+            seconds = minutes * 60.0
+            Pn2 = [
+                PiN2 + (P - PiN2) * math.exp(-k * seconds)
+                for P, k in zip(sim.Pn2, K_N2)
+            ]
+            Phe = [
+                PiHe + (P - PiHe) * math.exp(-k * seconds)
+                for P, k in zip(sim.Phe, K_HE)
+            ]
+            if next_depth <= 0.0:
+                return can_surface(Pn2, Phe, sim.gf_high)
+            ceiling_m = ceiling_with_gf(Pn2, Phe, pamb, sim.gf_low, sim.gf_high)
+            return ceiling_m <= next_depth
+
+        if cleared(0):
+            return 0
+        high = 1
+        while not cleared(high):
+            if high >= MAX_STOP_MIN:
+                return MAX_STOP_MIN
+            high = min(high * 2, MAX_STOP_MIN)
+        low = high // 2  # non suffisant (ou 0)
+        while high - low > 1:
+            mid = (low + high) // 2
+            if cleared(mid):
+                high = mid
+            else:
+                low = mid
+        return high
+
+
 def buehlmann_zhl16c_ndl_palier(
     profile: List[Dict],
     gaz: Dict[str, float],
@@ -363,50 +776,43 @@ def buehlmann_zhl16c_ndl_palier(
     """
     Calcule NDL, prochain palier et temps au palier avec ZHL-16C + GF.
     """
-    fO2 = gaz.get("O2", 0.21)
-    fN2 = gaz.get("N2", 0.79)
-    fHe = gaz.get("He", 0.0)
-    s = fO2 + fN2 + fHe
-    fO2, fN2, fHe = fO2 / s, fN2 / s, fHe / s
-    # Tri et conversion timestamp
-    prof = sorted(profile, key=lambda x: x["timestamp"])
-    for rec in prof:
-        rec["t"] = parse_iso_timestamp(rec["timestamp"])
-    # Init tissus à l'équilibre surface
-    pamb0 = depth_m_to_amb_bar(prof[0]["profondeur_m"])
-    Pn2 = [inspired_pp(pamb0, fN2) for _ in range(16)]
-    Phe = [inspired_pp(pamb0, fHe) for _ in range(16)]
-    # Intégration du profil
-    for i in range(1, len(prof)):
-        dt = prof[i]["t"] - prof[i - 1]["t"]
-        if dt <= 0:
-            continue
-        pamb0 = depth_m_to_amb_bar(prof[i - 1]["profondeur_m"])
-        pamb1 = depth_m_to_amb_bar(prof[i]["profondeur_m"])
-        PiN2_0 = inspired_pp(pamb0, fN2)
-        PiHe_0 = inspired_pp(pamb0, fHe)
-        PiN2_1 = inspired_pp(pamb1, fN2)
-        PiHe_1 = inspired_pp(pamb1, fHe)
-        Pn2, Phe = update_compartments(Pn2, Phe, PiN2_0, PiHe_0, PiN2_1, PiHe_1, dt)
-    # Conditions finales
-    depth_now = prof[-1]["profondeur_m"]
-    pamb_now = depth_m_to_amb_bar(depth_now)
-    ceiling_m = ceiling_with_gf(Pn2, Phe, pamb_now, gf_low, gf_high)
-    if ceiling_m <= 0.0:
-        return "-", "-", "-"
-    else:
-        next_stop = math.ceil(ceiling_m / stop_interval_m) * stop_interval_m
-        return "-", f"{next_stop:02d}", "-"
+    state = TissueState(gaz, gf_low, gf_high, stop_interval_m)
+    # Tri puis intégration du profil (les enregistrements ne sont pas modifiés)
+    for rec in sorted(profile, key=lambda x: x["timestamp"]):
+        t = rec["t"] if "t" in rec else parse_iso_timestamp(rec["timestamp"])
+        state.advance(t, rec["profondeur_m"])
+    return state.ndl_palier_tpalier()
+
+
+# État tissulaire de la plongée en cours, alimenté par SAMPLES
+DECO = {"state": None, "o2": None, "generation": None}
 
 
 def ndl_palier_tpalier(o2):
-    with LOCK_JSON:
-        with open(LOG_FILE, "r") as f:
-            profile = json.load(f)
-    return buehlmann_zhl16c_ndl_palier(
-        profile=profile,
-        gaz={"O2": o2, "N2": 100 - o2, "He": 0.0},
-    )
+    """Met à jour l'état tissulaire avec les nouvelles mesures ; retourne NDL/palier."""
+    state = DECO["state"]
+    if state is None or DECO["o2"] != o2 or DECO["generation"] != SAMPLES.generation:
+        state = TissueState({"O2": o2, "N2": 1 - o2, "He": 0.0})
+        DECO.update(state=state, o2=o2, generation=SAMPLES.generation)
+        new_samples = SAMPLES.all()
+    else:
+        new_samples = SAMPLES.since(state.t) if state.t is not None else SAMPLES.all()
+    for t, depth in zip(
+        new_samples["t"].tolist(), new_samples["profondeur_m"].tolist()
+    ):
+        state.advance(t, depth)
+    return state.ndl_palier_tpalier()
+
+
+def time_to_surface():
+    """Durée de remontée (TTS, min) formatée de la plongée en cours, "-" sans palier.
+
+    Lit le plan mémoïsé de l'état alimenté par `ndl_palier_tpalier`.
+    """
+    state = DECO["state"]
+    if state is None or state.next_stop() <= 0.0:
+        return "-"
+    return f"{state.plan()['tts']:02d}"
 
 
 def calc_mod(f_o2, ppO2_max=1.4):
@@ -0,0 +1,78 @@
+from collections import deque
+
+RESYNC_EVERY = 256  # Recalcul exact des sommes (dérive des arrondis)
+
+
+class VerticalSpeedEstimator:
+    """Estimation en continu de la vitesse verticale (m/min, positive en descente).
+
+    `rate` est la pente d'une régression linéaire (moindres carrés) de la
+    profondeur sur les `window_s` dernières secondes ; les sommes de la
+    régression sont mises à jour à l'ajout et au retrait de chaque mesure, d'où
+    un coût O(1) amorti par mesure. `smoothed` est une moyenne exponentielle de
+    `rate` (coefficient `alpha`) destinée à l'affichage et aux alarmes.
+    """
+
+    def __init__(self, window_s=4.0, alpha=0.3):
+        # Initiate Attributs
+        self.window_s = window_s
+        self.alpha = alpha
+        self.samples = deque()  # (t, profondeur)
+        self.t0 = None  # Origine des temps des sommes (précision numérique)
+        self.sums = [0.0, 0.0, 0.0, 0.0]  # Σx, Σy, Σx², Σxy avec x = t - t0
+        self.updates = 0
+        self.rate = 0.0
+        self.smoothed = 0.0
+        self.ready = False  # Au moins une estimation disponible
+
+    def update(self, t, depth):
+        """Intègre une mesure et retourne la vitesse lissée (m/min)."""
+        if self.samples and t <= self.samples[-1][0]:
+            return self.smoothed  # Mesure hors ordre ou dupliquée
+        if self.t0 is None:
+            self.t0 = t
+        self.samples.append((t, depth))
+        self.accumulate(t, depth, 1.0)
+        while len(self.samples) > 2 and t - self.samples[1][0] >= self.window_s:
+            old_t, old_depth = self.samples.popleft()
+            self.accumulate(old_t, old_depth, -1.0)
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self.resync()
+
+        n = len(self.samples)
+        sx, sy, sxx, sxy = self.sums
+        denominator = n * sxx - sx * sx
+        if n < 2 or denominator <= 0:
+            return self.smoothed
+        self.rate = (n * sxy - sx * sy) / denominator * 60.0
+        if self.ready:
+            self.smoothed += self.alpha * (self.rate - self.smoothed)
+        else:
+            self.smoothed = self.rate  # Première estimation
+            self.ready = True
+        return self.smoothed
+
+    def accumulate(self, t, depth, sign):
+        x = t - self.t0
+        self.sums[0] += sign * x
+        self.sums[1] += sign * depth
+        self.sums[2] += sign * x * x
+        self.sums[3] += sign * x * depth
+
+    def resync(self):
+        """Recentre l'origine des temps et recalcule exactement les sommes."""
+        self.t0 = self.samples[0][0]
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+        for t, depth in self.samples:
+            self.accumulate(t, depth, 1.0)
+
+    def reset(self):
+        """Remet l'estimateur à zéro (nouvelle plongée)."""
+        self.samples.clear()
+        self.t0 = None
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+        self.updates = 0
+        self.rate = 0.0
+        self.smoothed = 0.0
+        self.ready = False
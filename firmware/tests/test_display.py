@@ -5,12 +5,17 @@ from PIL import Image
 
 # Import des classes à tester
 from display.display_manager import DisplayManager
+from display.framebuffer import Framebuffer, VirtualFramebuffer
+from display.glyph_atlas import GlyphAtlas
 from display.screens.template_screen import TemplateScreen
 from display.screens.config_screen import ConfigScreen
 from display.screens.general_screen import GeneralScreen
-from display.screens.palier_screen import PalierScreen
 from display.screens.exit_screen import ExitScreen
-from utils.utils import BUTTON, CONF_OPT, EXIT_SELECTOR, FT_SMALL
+from display.screens.diag_screen import DiagScreen
+from PIL import ImageDraw
+from utils.utils import BUTTON, CONF_OPT, EXIT_SELECTOR, FT_BIG, FT_SMALL
+from utils.metrics import METRICS
+from utils.sample import DiveFrame
 
 
 class TestTemplateScreen:
@@ -36,6 +41,54 @@ class TestTemplateScreen:
         )
         assert result == mock_img
 
+    def test_static_layer_and_dirty_rects(self):
+        screen = TemplateScreen()
+        screen.add_field("ind_label", 10, 10, FT_SMALL)
+        screen.modify_field("ind_label", "NDL")
+        screen.add_field("val_a", 10, 50, FT_SMALL)
+        screen.add_field("val_b", 200, 50, FT_SMALL)
+        screen.modify_field("val_a", "12")
+        screen.modify_field("val_b", "34")
+
+        screen.generate_image()
+        assert screen.dirty_rects == [(0, 0, 480, 320)]
+
+        screen.generate_image()
+        assert screen.dirty_rects == []
+
+        screen.modify_field("val_a", "7")
+        img = screen.generate_image()
+        # Ancienne et nouvelle zone de "val_a" uniquement
+        assert screen.dirty_rects
+        assert all(x0 >= 10 and x1 < 200 for x0, _, x1, _ in screen.dirty_rects)
+
+        # Le rendu partiel est identique à un rendu complet
+        screen.invalidate()
+        assert screen.generate_image().tobytes() == img.tobytes()
+
+    def test_version_and_wait_change(self):
+        screen = TemplateScreen()
+        screen.add_field("val_a", 10, 50, FT_SMALL)
+        screen.generate_image()
+        assert screen.wait_change(0) is False
+
+        version = screen.version
+        screen.modify_field("val_a", "")  # Valeur identique : pas de changement
+        screen.modifiy_x_y("val_a", (10, 50))
+        assert screen.version == version
+
+        woken = []
+        waiter = threading.Thread(target=lambda: woken.append(screen.wait_change(5)))
+        waiter.start()
+        screen.modify_field("val_a", "12")
+        waiter.join(1)
+        assert woken == [True]
+        assert screen.version == version + 1
+
+        screen.generate_image()
+        assert screen.wait_change(0) is False
+        assert screen.wait_change(5, stop=lambda: True) is False
+
     def test_update_default(self):
         screen = TemplateScreen()
         result = screen.update(BUTTON.UP_BUTTON)
@@ -57,12 +110,23 @@ class TestConfigScreen:
         screen.down_phase()
         assert screen.phase != original_phase
 
+    def test_compas_progress(self):
+        screen = ConfigScreen()
+        screen.compas = CONF_OPT.CMP_CL
+        screen.compas_progress = 0.4
+        screen.update_values()
+        assert screen.fields["val_compas"]["value"] == "Calibration  40%"
+
+        screen.compas = CONF_OPT.CMP_OK
+        screen.update_values()
+        assert screen.fields["val_compas"]["value"] == CONF_OPT.CMP_OK.value
+
 
 class TestGeneralScreen:
     """Tests pour GeneralScreen"""
 
     @patch("display.screens.general_screen.datetime")
-    @patch("display.screens.general_screen.up_down_from_file")
+    @patch("display.screens.general_screen.up_down")
     def test_update_values(self, mock_up_down, mock_datetime):
         screen = GeneralScreen()
 
@@ -71,19 +135,12 @@ class TestGeneralScreen:
         mock_up_down.return_value = "1.5"
 
         # Données de capteur factices
-        sensor_raw = [
-            25.5,
-            0,
-            15.2,
-            0,
-            30,
-            45,
-            3,
-            5,
-        ]  # temp, _, depth, _, mod, ndl, palier, palier_time
+        frame = DiveFrame(
+            temperature_c=25.5, profondeur_m=15.2, mod=30, ndl=45, palier=3
+        )
         timer = "05:30"
 
-        screen.update_values(sensor_raw, timer)
+        screen.update_values(frame, timer)
 
         assert screen.fields["val_time"]["value"] == "12:34:56"
         assert screen.fields["val_temp"]["value"] == "25.50"
@@ -146,5 +203,196 @@ class TestExitScreen:
         assert result is True
 
 
+class TestDisplayManager:
+    """Tests pour les changements d'écran du DisplayManager"""
+
+    @patch("display.display_manager.init_display")
+    def test_pooled_screens(self, mock_init_display):
+        dm = DisplayManager()
+        general = dm.screens["general"]
+        dm.dive_mode()
+        assert dm.screen is general
+
+        dm.press_up()
+        assert dm.screen is dm.screens["palier"]
+        dm.press_down()
+        assert dm.screen is general
+
+        dm.press_back()
+        assert dm.screen is dm.screens["exit"]
+        dm.press_up()
+        assert dm.screen.quit == EXIT_SELECTOR.OUI
+        dm.resume_dive()
+        assert dm.screen is general
+
+        # L'écran de sortie est réinitialisé à chaque affichage
+        dm.press_back()
+        assert dm.screen.quit == EXIT_SELECTOR.NON
+
+    @patch("display.screens.palier_screen.up_down", return_value="↑ 00")
+    @patch("display.screens.general_screen.up_down", return_value="↑ 00")
+    @patch("display.display_manager.init_display")
+    def test_switch_syncs_values(self, mock_init_display, *_):
+        dm = DisplayManager()
+        dm.dive_mode()
+        dm.update_values(DiveFrame(25.5, 15.2, mod=30, ndl="45", tts="12"), "001:00")
+
+        dm.press_up()
+        palier = dm.screens["palier"]
+        assert dm.screen is palier
+        assert palier.fields["val_depth"]["value"] == "15.20"
+        assert palier.fields["val_tts"]["value"] == "12"
+        assert palier.fields["val_timer"]["value"] == "001:00"
+        assert palier.wait_change(0)  # Nouvelle image attendue
+
+    @patch("display.screens.general_screen.up_down", return_value="↑ 00")
+    @patch("display.display_manager.init_display")
+    def test_new_dive_clears_previous_values(self, mock_init_display, _):
+        dm = DisplayManager()
+        dm.dive_mode()
+        dm.update_values(DiveFrame(25.5, 15.2, mod=30, ndl="45"), "001:00")
+        general = dm.screens["general"]
+        assert general.fields["val_depth"]["value"] == "15.20"
+
+        dm.config_mode()
+        dm.dive_mode()
+
+        assert dm.screen is general
+        assert general.fields["val_depth"]["value"] == ""
+        assert general.fields["val_timer"]["value"] == ""
+        assert general.fields["ind_ndl"]["value"] == "NDL"
+
+    @patch("display.display_manager.init_display")
+    def test_diag_screen_long_press(self, mock_init_display):
+        dm = DisplayManager()
+        config = dm.screen
+        try:
+            for _ in range(3):
+                dm.press_back()  # Navigation ordinaire
+            assert dm.screen is config
+
+            dm.press_back_long()
+            assert isinstance(dm.screen, DiagScreen)
+            assert METRICS.enabled
+            dm.screen.update_values()
+            assert dm.screen.fields["val_0"]["value"]
+
+            dm.calibrated(True)
+            dm.press_back()
+            assert dm.screen is config
+            assert config.compas == CONF_OPT.CMP_OK
+            assert not METRICS.enabled  # État configuré restauré
+
+            dm.dive_mode()
+            dm.press_back_long()  # Sans effet en plongée
+            assert dm.screen is dm.screens["general"]
+        finally:
+            METRICS.enable(False)
+
+    @patch("display.display_manager.init_display")
+    def test_diag_keeps_calibration_in_progress(self, mock_init_display):
+        dm = DisplayManager()
+        config = dm.screen
+        with patch.object(config, "update", return_value=CONF_OPT.CMP_CL):
+            assert dm.press_enter() == CONF_OPT.CMP_CL
+        config.compas = CONF_OPT.CMP_CL
+
+        dm.press_back_long()
+        dm.press_back()
+
+        assert dm.screen is config
+        assert config.compas == CONF_OPT.CMP_CL
+        dm.calibrated(True)
+        assert config.compas == CONF_OPT.CMP_OK
+
+
+class TestFramebuffer:
+    """Tests pour la conversion RGB565 et le framebuffer"""
+
+    def make_image(self):
+        img = Image.new("RGB", (4, 2), "#d3d3d3")
+        img.putpixel((0, 0), (255, 0, 0))
+        img.putpixel((1, 0), (0, 255, 0))
+        img.putpixel((2, 0), (0, 0, 255))
+        img.putpixel((3, 1), (255, 255, 255))
+        return img
+
+    def test_image_to_rgb565(self):
+        dm = DisplayManager.__new__(DisplayManager)
+        data = dm.image_to_rgb565(self.make_image())
+
+        assert len(data) == 4 * 2 * 2
+        assert data[0:6] == bytes([0xF8, 0x00, 0x07, 0xE0, 0x00, 0x1F])
+        assert data[-2:] == bytes([0xFF, 0xFF])
+
+    def test_show_writes_through_mmap(self, tmp_path):
+        path = tmp_path / "fb"
+        path.write_bytes(bytes(4 * 2 * 2))
+        img = self.make_image()
+
+        fb = Framebuffer(str(path), 4, 2)
+        fb.show(img)
+        fb.close()
+
+        dm = DisplayManager.__new__(DisplayManager)
+        assert path.read_bytes() == dm.image_to_rgb565(img)
+
+    def test_virtual_framebuffer_records_frames(self):
+        img = self.make_image()
+        fb = VirtualFramebuffer(4, 2, keep=2)
+
+        assert fb.show(img) == 4 * 2 * 2
+        img.putpixel((0, 1), (0, 0, 0))
+        assert fb.show(img) == 2
+
+        assert list(fb.frame_bytes) == [16, 2]
+        assert len(fb.frame_times) == len(fb.images) == 2
+        assert fb.to_image().getpixel((0, 0)) == (248, 0, 0)
+        assert fb.to_image().getpixel((0, 1)) == (0, 0, 0)
+
+    def test_show_writes_only_changed_rows(self, tmp_path):
+        path = tmp_path / "fb"
+        path.write_bytes(bytes(4 * 2 * 2))
+        img = self.make_image()
+
+        fb = Framebuffer(str(path), 4, 2)
+        assert fb.show(img) == 4 * 2 * 2
+        assert fb.show(img) == 0  # Image identique : rien n'est écrit
+
+        img.putpixel((2, 1), (0, 0, 0))
+        assert fb.show(img) == 2  # Un seul pixel de la ligne 1
+        assert fb.show(img, [(0, 0, 4, 1)]) == 0
+        assert fb.bytes_written == 4 * 2 * 2 + 2
+        assert fb.frames == 4
+        fb.close()
+
+        dm = DisplayManager.__new__(DisplayManager)
+        assert path.read_bytes() == dm.image_to_rgb565(img)
+
+
+class TestGlyphAtlas:
+    """Tests pour le cache de glyphes"""
+
+    @pytest.mark.parametrize("font", [FT_BIG, FT_SMALL])
+    @pytest.mark.parametrize("text", ["12.34", "045:07", "99%", "↓ 05", "-"])
+    def test_same_pixels_as_freetype(self, font, text):
+        atlas = GlyphAtlas(font)
+        assert atlas.covers(text)
+
+        expected = Image.new("RGB", (300, 60), "#d3d3d3")
+        ImageDraw.Draw(expected).text((5, 3), text, font=font, fill="black")
+        result = Image.new("RGB", (300, 60), "#d3d3d3")
+        bbox = atlas.draw(ImageDraw.Draw(result), (5, 3), text)
+
+        assert result.tobytes() == expected.tobytes()
+        assert bbox == font.getbbox(text)
+
+    def test_covers(self):
+        atlas = GlyphAtlas(FT_SMALL)
+        assert not atlas.covers("NDL")
+        assert not atlas.covers("")
+        assert not atlas.covers(45)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
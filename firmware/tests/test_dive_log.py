@@ -0,0 +1,73 @@
+import json
+import pytest
+
+from utils.dive_log import DiveLogWriter, read_log
+
+
+class TestDiveLogWriter:
+
+    def test_append_and_read(self, tmp_path):
+        path = str(tmp_path / "mesures.json")
+        log = DiveLogWriter(path, flush_every=2)
+
+        log.write({"profondeur_m": 1.0})
+        log.write({"profondeur_m": 2.0})
+        log.write({"profondeur_m": 3.0})
+        log.close()
+
+        assert read_log(path) == [
+            {"profondeur_m": 1.0},
+            {"profondeur_m": 2.0},
+            {"profondeur_m": 3.0},
+        ]
+
+    def test_flush_batches(self, tmp_path):
+        path = str(tmp_path / "mesures.json")
+        log = DiveLogWriter(path, flush_every=3, flush_interval=60)
+
+        log.write({"profondeur_m": 1.0})
+        assert read_log(path) == []  # Encore dans le tampon
+
+        log.write({"profondeur_m": 2.0})
+        log.write({"profondeur_m": 3.0})
+        assert len(read_log(path)) == 3
+        log.close()
+
+    def test_legacy_array_is_migrated(self, tmp_path):
+        path = str(tmp_path / "mesures.json")
+        with open(path, "w") as f:
+            json.dump([{"profondeur_m": 1.0}], f, indent=2)
+
+        assert read_log(path) == [{"profondeur_m": 1.0}]
+
+        log = DiveLogWriter(path)
+        log.write({"profondeur_m": 2.0})
+        log.close()
+
+        assert read_log(path) == [{"profondeur_m": 1.0}, {"profondeur_m": 2.0}]
+
+    def test_torn_legacy_array_is_salvaged(self, tmp_path):
+        path = str(tmp_path / "mesures.json")
+        with open(path, "w") as f:
+            f.write('[\n {"profondeur_m": 1.0},\n {"profondeur_m": 2.0},\n {"timest')
+
+        log = DiveLogWriter(path)
+        assert log.write({"profondeur_m": 3.0})
+        assert log.write({"profondeur_m": 4.0})
+        log.close()
+
+        assert [r["profondeur_m"] for r in read_log(path)] == [1.0, 2.0, 3.0, 4.0]
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        path = str(tmp_path / "mesures.json")
+        with open(path, "w") as f:
+            f.write('{"profondeur_m": 1.0}\n{"profondeur_m": 2.')
+
+        assert read_log(path) == [{"profondeur_m": 1.0}]
+
+    def test_missing_file(self, tmp_path):
+        assert read_log(str(tmp_path / "absent.json")) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+import csv
+import json
+
+import pytest
+
+from replay.replay import find_logs, iter_dives, replay, replay_dive
+from utils.utils import buehlmann_zhl16c_ndl_palier
+
+AIR = {"O2": 0.21, "N2": 0.79, "He": 0.0}
+
+
+def write_log(path, dives, start=1.7e9, period=2.0):
+    """Journal JSON Lines : une liste de profondeurs par plongée, suivie de sa fin."""
+    t = start
+    with open(path, "w", encoding="utf-8") as f:
+        for depths in dives:
+            for depth in depths:
+                f.write(json.dumps({"t": t, "profondeur_m": depth}) + "\n")
+                t += period
+            f.write(json.dumps({"dive_time": "001:00", "max_depth": max(depths)}))
+            f.write("\n")
+            t += 3600.0
+
+
+def square(depth, bottom_samples):
+    return [min(depth, i * 0.6) for i in range(bottom_samples)]
+
+
+class TestReplay:
+    """Tests pour le rejeu des journaux de plongée"""
+
+    def test_iter_dives_splits_on_end_and_gap(self, tmp_path):
+        path = tmp_path / "mesures.json"
+        write_log(path, [[0.0, 5.0, 2.0], [1.0, 3.0]])
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"t": 1.8e9, "profondeur_m": 4.0}) + "\n")
+
+        dives = list(iter_dives(str(path)))
+
+        assert [list(depth) for _, depth in dives] == [[0, 5, 2], [1, 3], [4]]
+
+    def test_matches_prefix_recomputation(self):
+        depths = square(40.0, 1200)
+        t = [i * 2.0 for i in range(len(depths))]
+        records = [
+            {"t": ti, "timestamp": ti, "profondeur_m": d} for ti, d in zip(t, depths)
+        ]
+
+        series = replay_dive(t, depths, AIR, [(0.3, 0.85)])[(0.3, 0.85)]
+
+        assert series["next_stop_m"][-1] > 0  # Décompression atteinte
+        for i in (10, 300, 600, len(t) - 1):
+            ndl, stop, stop_time = buehlmann_zhl16c_ndl_palier(records[: i + 1], AIR)
+            if stop == "-":
+                assert ndl == f"{int(series['ndl_min'][i]):02d}"
+            else:
+                assert stop == f"{int(series['next_stop_m'][i]):02d}"
+                assert stop_time == f"{int(series['stop_min'][i]):02d}"
+
+    def test_gf_settings_share_tensions(self):
+        depths = square(40.0, 1200)
+        t = [i * 2.0 for i in range(len(depths))]
+
+        results = replay_dive(t, depths, AIR, [(0.3, 0.85), (0.5, 0.8)])
+
+        conservative = results[(0.3, 0.85)]["ceiling_m"]
+        assert (conservative >= results[(0.5, 0.8)]["ceiling_m"] - 1e-9).all()
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_replay_writes_series_and_summary(self, tmp_path, jobs):
+        logs = tmp_path / "logs"
+        for name in ("a", "b"):
+            (logs / name).mkdir(parents=True)
+            write_log(logs / name / "mesures.json", [square(18.0, 100), square(12, 50)])
+        out = tmp_path / "out"
+
+        rows = replay(find_logs([str(logs)]), AIR, [(0.3, 0.85)], str(out), jobs=jobs)
+
+        assert len(rows) == 4
+        assert [row["samples"] for row in rows] == [100, 50, 100, 50]
+        with open(out / "summary.csv", encoding="utf-8") as f:
+            summary = list(csv.DictReader(f))
+        assert [row["output"] for row in summary] == [row["output"] for row in rows]
+        with open(out / rows[0]["output"], encoding="utf-8") as f:
+            series = list(csv.DictReader(f))
+        assert len(series) == 100
+        assert float(series[-1]["profondeur_m"]) == 18.0
+        assert series[-1]["ndl_min"] and not series[-1]["tts_min"]
+
+    def test_unreadable_log_is_reported(self, tmp_path):
+        good = tmp_path / "good.jsonl"
+        write_log(good, [square(18.0, 100)])
+        bad = tmp_path / "bad.json"
+        bad.write_bytes(b'{"t": 1.7e9, "profondeur_m": 1.0}\n\xff\xfe\n')
+        out = tmp_path / "out"
+
+        rows = replay([str(bad), str(good)], AIR, [(0.3, 0.85)], str(out), jobs=2)
+
+        assert rows[0]["log"] == str(bad) and "UnicodeDecodeError" in rows[0]["error"]
+        assert [row["samples"] for row in rows[1:]] == [100]
+        with open(out / "summary.csv", encoding="utf-8") as f:
+            summary = list(csv.DictReader(f))
+        assert [bool(row["error"]) for row in summary] == [True, False]
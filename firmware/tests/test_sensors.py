@@ -0,0 +1,374 @@
+import math
+import threading
+import numpy as np
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+import sensors.ms5837 as ms5837
+from sensors.acquisition import AcquisitionPolicy, TemperatureSchedule
+from sensors.compass_calibration import CompassCalibrator
+from sensors.filters import AlphaBetaFilter, PassThroughFilter
+from sensors.i2c_bus import I2CBus
+from sensors.sensors import SensorsManager
+from utils.metrics import METRICS
+from utils.sample import Sample
+
+
+class SlowMS5837:
+    """MS5837 factice dont la lecture bloque comme deux conversions OSR_8192"""
+
+    def __init__(self, delay=0.04):
+        self.delay = delay
+        self.reads = 0
+
+    def read(self, oversampling=ms5837.OSR_8192, temperature=True, idle=None):
+        self.oversampling = oversampling
+        time.sleep(self.delay)
+        self.reads += 1
+        return True
+
+    def temperature(self):
+        return 20.0
+
+    def pressure(self):
+        return 1013.25 + self.reads
+
+    def depth(self):
+        return 1.0
+
+
+@patch("sensors.sensors.SAMPLES")
+@patch("sensors.sensors.DIVE_LOG")
+@patch("sensors.sensors.init_qmc5883l", return_value=Mock())
+@patch("sensors.sensors.init_ms5837")
+class TestSensorsManager:
+    """Tests pour l'acquisition des capteurs"""
+
+    def test_publish_snapshot(self, mock_ms5837, *_):
+        mock_ms5837.return_value = SlowMS5837(delay=0)
+        sm = SensorsManager()
+        assert sm.get_data() == Sample()
+
+        sample = sm.acquire()
+        sm.publish(sample)
+
+        data = sm.get_data()
+        assert data is sample
+        assert (data.temperature_c, data.pression_mbar) == (20.0, 1014.25)
+        assert (data.profondeur_m, data.azimut_deg) == (1.6, -1)
+        record = data.to_record()
+        assert record["t"] == data.epoch
+        assert record["timestamp"].endswith("Z")
+        assert record["profondeur_m"] == 1.6
+
+    def test_calibration_without_compass(self, mock_ms5837, mock_qmc, *_):
+        mock_ms5837.return_value = SlowMS5837(delay=0)
+        mock_qmc.return_value = None
+        sm = SensorsManager()
+        done = []
+
+        assert not sm.calibrate_qmc5883l(on_done=done.append)
+
+        assert done == [False]
+        assert sm.compass.thread is None
+
+    def test_filtered_depth_keeps_raw(self, mock_ms5837, *_):
+        mock_ms5837.return_value = SlowMS5837(delay=0)
+        sm = SensorsManager(depth_filter=AlphaBetaFilter(alpha=0.5, beta=0.0))
+        sm.filter_depth(Sample(t=0.0, profondeur_m=1.0, profondeur_brute_m=1.0))
+        sample = sm.filter_depth(
+            Sample(t=1.0, profondeur_m=2.0, profondeur_brute_m=2.0)
+        )
+
+        assert sample.profondeur_m == pytest.approx(1.5)
+        assert sample.profondeur_brute_m == 2.0
+
+    def test_get_data_never_waits_on_hardware(
+        self, mock_ms5837, mock_qmc, mock_log, mock_samples
+    ):
+        mock_ms5837.return_value = SlowMS5837()
+        sm = SensorsManager()
+        sm.stop_thread = False
+        thread = threading.Thread(target=sm.job)
+        METRICS.enable()
+        thread.start()
+        try:
+            deadline = time.time() + 0.5
+            while time.time() < deadline:
+                sm.get_data()
+        finally:
+            sm.stop_thread = True
+            thread.join()
+            summary = METRICS.snapshot()["timers"]["sensors.get_data"]
+            METRICS.enable(False)
+
+        assert summary["count"] > 1000
+        assert summary["p99"] < 1e-3  # Bien en dessous d'une conversion (~40 ms)
+        assert mock_log.write.called
+
+
+class TestAcquisitionPolicy:
+    """Tests pour le choix du suréchantillonnage et de la cadence"""
+
+    def feed(self, policy, start, duration, depth0, rate_m_min, period=0.1):
+        result = None
+        for i in range(int(duration / period) + 1):
+            t = start + i * period
+            result = policy.update(t, depth0 + rate_m_min * (t - start) / 60.0)
+        return result
+
+    def test_stable_depth_uses_full_resolution(self):
+        policy = AcquisitionPolicy()
+        assert self.feed(policy, 0.0, 10.0, 20.0, 0.0) == (ms5837.OSR_8192, 0.5)
+
+    def test_fast_ascent_switches_immediately(self):
+        policy = AcquisitionPolicy()
+        self.feed(policy, 0.0, 10.0, 20.0, 0.0)
+        osr, period = self.feed(policy, 10.0, 2.5, 20.0, -15.0)
+        assert (osr, period) == (ms5837.OSR_1024, 0.1)
+        assert policy.rate == pytest.approx(-15.0)
+
+    def test_slowing_down_waits_for_hold(self):
+        policy = AcquisitionPolicy(hold_s=5.0)
+        self.feed(policy, 0.0, 3.0, 20.0, 12.0)
+        assert policy.oversampling == ms5837.OSR_1024
+        self.feed(policy, 3.1, 4.0, 20.6, 0.0)
+        assert policy.oversampling == ms5837.OSR_1024  # Encore dans le délai
+        self.feed(policy, 7.2, 4.0, 20.6, 0.0)
+        assert policy.oversampling == ms5837.OSR_8192
+
+    def test_custom_tiers(self):
+        policy = AcquisitionPolicy(tiers=[(math.inf, ms5837.OSR_2048, 0.25)])
+        assert self.feed(policy, 0.0, 1.0, 0.0, 30.0) == (ms5837.OSR_2048, 0.25)
+
+
+def datasheet_ms5837(D1=4958179, D2=6815414):
+    """MS5837-30BA sur bus factice, coefficients de l'exemple du datasheet"""
+    sensor = ms5837.MS5837_30BA.__new__(ms5837.MS5837_30BA)
+    ms5837.MS5837.__init__(sensor, ms5837.MODEL_30BA, bus=None)
+    sensor._bus = Mock()
+    sensor._C = [0, 34982, 36352, 20328, 22354, 26646, 26146]
+    adc = {0x40: D1, 0x50: D2}  # D1 et D2 (OSR_256, décalés selon l'OSR)
+
+    def convert(addr, command):
+        sensor.last = adc[command & 0xF0]
+
+    def read_adc(addr, reg, n):
+        return [
+            (sensor.last >> 16) & 0xFF,
+            (sensor.last >> 8) & 0xFF,
+            sensor.last & 0xFF,
+        ]
+
+    sensor._bus.write_byte.side_effect = convert
+    sensor._bus.read_i2c_block_data.side_effect = read_adc
+    return sensor
+
+
+@patch("sensors.ms5837.sleep")
+class TestMS5837CachedTemperature:
+    """Tests pour la réutilisation de la conversion D2"""
+
+    def test_first_read_always_converts_temperature(self, mock_sleep):
+        sensor = datasheet_ms5837()
+        assert sensor.read(ms5837.OSR_256, temperature=False)
+        assert sensor._bus.write_byte.call_count == 2
+        assert sensor.pressure() == pytest.approx(3999.84, abs=0.01)
+
+    def test_cached_temperature_skips_d2(self, mock_sleep):
+        sensor = datasheet_ms5837()
+        sensor.read(ms5837.OSR_256)
+        temperature = sensor.temperature()
+
+        sensor._bus.write_byte.reset_mock()
+        mock_sleep.reset_mock()
+        assert sensor.read(ms5837.OSR_256, temperature=False)
+
+        assert sensor._bus.write_byte.call_count == 1  # D1 uniquement
+        assert mock_sleep.call_count == 1
+        assert sensor.temperature() == temperature
+        assert sensor.pressure() == pytest.approx(3999.84, abs=0.01)
+
+
+class TestTemperatureSchedule:
+
+    def test_every_n_samples(self):
+        schedule = TemperatureSchedule(every=3, depth_step_m=10.0)
+        results = [schedule.due(20.0) for _ in range(7)]
+        assert results == [True, False, False, True, False, False, True]
+
+    def test_depth_change_forces_refresh(self):
+        schedule = TemperatureSchedule(every=100, depth_step_m=0.5)
+        assert schedule.due(20.0)
+        assert not schedule.due(20.3)
+        assert schedule.due(20.6)
+        assert not schedule.due(20.4)
+        assert schedule.due(None)
+
+
+def ellipse_reader(cx=120, cy=-80, rx=400, ry=200, steps=36):
+    """Magnétomètre factice tournant sur une ellipse (fer dur + fer doux)"""
+    angles = iter(range(10**6))
+
+    def read_raw():
+        a = 2 * math.pi * (next(angles) % steps) / steps
+        return cx + rx * math.cos(a), cy + ry * math.sin(a), 0
+
+    return read_raw
+
+
+class TestCompassCalibrator:
+    """Tests pour la calibration du compas en tâche de fond"""
+
+    def test_background_fit_and_persistence(self, tmp_path):
+        path = str(tmp_path / "compas.json")
+        calibrator = CompassCalibrator(path)
+        progress, done = [], []
+
+        assert calibrator.start(
+            ellipse_reader(),
+            duration=0.3,
+            period=0.005,
+            on_progress=progress.append,
+            on_done=done.append,
+        )
+        assert not calibrator.start(ellipse_reader(), duration=0.3)  # Déjà lancée
+        calibrator.thread.join(2)
+
+        assert done == [True]
+        assert progress[-1] == 1.0
+        assert calibrator.x_offset == pytest.approx(120)
+        assert calibrator.y_offset == pytest.approx(-80)
+        x, y = calibrator.correct(120 + 400, -80)
+        assert (x, y) == pytest.approx((300, 0))
+        assert calibrator.correct(120, -80 + 200) == pytest.approx((0, 300))
+
+        reloaded = CompassCalibrator(path)
+        assert reloaded.load()
+        assert reloaded.is_calibrated()
+        assert reloaded.y_scale == pytest.approx(1.5)
+
+    def test_insufficient_rotation_keeps_previous(self, tmp_path):
+        calibrator = CompassCalibrator(str(tmp_path / "compas.json"))
+        assert not calibrator.load()
+        calibrator.add_sample(10, 10)
+        calibrator.add_sample(20, 15)
+        assert not calibrator.finish()
+        assert not calibrator.is_calibrated()
+
+
+class FakeSMBus:
+    """SMBus factice : MS5837 (0x76) et QMC5883L (0x0D) sur le même bus"""
+
+    def __init__(self):
+        self.log = []
+        self.adc = 0
+        self.drdy = True  # QMC5883L : mesure non lue
+
+    def write_byte(self, addr, value):
+        self.log.append(("write", addr, value))
+        self.adc = {0x40: 4958179, 0x50: 6815414}.get(value & 0xF0, 0)
+
+    def i2c_rdwr(self, write, read):
+        addr, register = write.addr, list(write)[0]
+        self.log.append(("rdwr", addr, register, read.len))
+        if addr == 0x76:
+            data = [(self.adc >> 16) & 0xFF, (self.adc >> 8) & 0xFF, self.adc & 0xFF]
+        else:
+            data = [0x2C, 0x01, 0x00, 0x00, 0x00, 0x00]  # x=300
+            if register < 0x06:
+                self.drdy = False  # Lecture des données : DRDY effacé
+            data = (data + [0x01 if self.drdy else 0x00])[register:]
+        for i, value in enumerate(data[: read.len]):
+            read.buf[i] = bytes([value])
+
+    def close(self):
+        pass
+
+
+class TestI2CBus:
+    """Tests pour le bus I2C partagé"""
+
+    def test_unavailable_bus_raises(self):
+        bus = I2CBus(smbus=FakeSMBus())
+        bus.smbus = None
+        assert not bus.is_open()
+        with pytest.raises(OSError):
+            bus.write_byte(0x76, 0x1E)
+
+    @patch("sensors.ms5837.sleep")
+    @patch("sensors.sensors.init_qmc5883l")
+    @patch("sensors.sensors.init_ms5837")
+    def test_compass_read_overlaps_pressure_conversion(
+        self, mock_ms5837, mock_qmc, mock_sleep
+    ):
+        bus = I2CBus(smbus=FakeSMBus())
+        sensor = ms5837.MS5837_30BA(bus)
+        sensor._C = [0, 34982, 36352, 20328, 22354, 26646, 26146]
+        mock_ms5837.return_value = sensor
+        mock_qmc.return_value = bus
+        sm = SensorsManager()
+        sm.compass.x_offset = sm.compass.y_offset = 0.0
+
+        data = sm.acquire(ms5837.OSR_256, temperature=True)
+
+        assert data.pression_mbar == pytest.approx(3999.84, abs=0.01)
+        assert data.azimut_deg == pytest.approx(0.0)
+        ops = [op[:3] for op in bus.smbus.log]
+        # Conversion D1 lancée, compas lu pendant la conversion (état puis
+        # données), puis ADC
+        assert ops[:4] == [
+            ("write", 0x76, 0x40),  # D1, OSR_256
+            ("rdwr", 0x0D, 0x06),
+            ("rdwr", 0x0D, 0x00),
+            ("rdwr", 0x76, 0x00),
+        ]
+        assert ops.count(("rdwr", 0x0D, 0x00)) == 1  # Une seule lecture du compas
+
+    @patch("sensors.sensors.init_qmc5883l")
+    @patch("sensors.sensors.init_ms5837")
+    def test_compass_data_not_read_without_drdy(self, mock_ms5837, mock_qmc):
+        bus = I2CBus(smbus=FakeSMBus())
+        mock_qmc.return_value = bus
+        sm = SensorsManager()
+        sm.compass.x_offset = sm.compass.y_offset = 0.0
+
+        sm.poll_qmc5883l()
+        assert sm.compass_raw == (300, 0, 0)
+        sm.compass_fresh = False
+        sm.compass_raw = None
+        sm.poll_qmc5883l()  # DRDY effacé par la lecture précédente
+
+        assert sm.compass_raw is None and not sm.compass_fresh
+        assert [op[2] for op in bus.smbus.log] == [0x06, 0x00, 0x06]
+
+
+class TestDepthFilters:
+    """Tests pour l'étage de filtrage de la profondeur"""
+
+    def test_alpha_beta_reduces_noise_and_tracks_ramp(self):
+        rng = np.random.default_rng(1)
+        depth_filter = AlphaBetaFilter()
+        errors, rates = [], []
+        for i in range(3000):
+            t = i * 0.2
+            true = 20.0 if i < 1500 else 20.0 + 18.0 * (t - 300.0) / 60.0
+            filtered = depth_filter.update(t, true + rng.normal(0.0, 0.02))
+            errors.append(filtered - true)
+            rates.append(depth_filter.velocity * 60.0)
+
+        assert np.std(errors[500:1500]) < 0.6 * 0.02  # Bruit réduit à l'arrêt
+        assert abs(np.mean(errors[2000:])) < 0.005  # Pas de retard en descente
+        assert np.mean(rates[2000:]) == pytest.approx(18.0, abs=0.2)
+
+    def test_reset_and_pass_through(self):
+        depth_filter = AlphaBetaFilter()
+        depth_filter.update(0.0, 5.0)
+        depth_filter.update(1.0, 6.0)
+        depth_filter.reset()
+        assert depth_filter.update(2.0, 10.0) == 10.0
+        assert depth_filter.update(2.0, 12.0) == 10.0  # dt nul : ignorée
+
+        assert PassThroughFilter().update(0.0, 3.2) == 3.2
@@ -0,0 +1,136 @@
+import math
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from button.buttons import ButtonManager
+import sim.magnetometer
+import sim.ms5837
+from sensors.compass_calibration import CompassCalibrator
+from sim.clock import SimClock
+from sim.gpio import SimGPIO
+from sim.magnetometer import SimMagnetometer
+from sim.ms5837 import DiveProfile, SimMS5837
+from sim.run import run
+from utils.dive_log import read_log
+from utils.utils import DIAG_HOLD_S, LOG_FILE
+
+
+class TestSimClock:
+    """Tests pour l'horloge accélérée"""
+
+    def test_install_scales_time(self):
+        clock = SimClock(speed=100.0)
+        clock.install(sim.ms5837)
+        try:
+            assert sim.ms5837.time is clock
+            start = sim.ms5837.time.monotonic()
+            real = time.monotonic()
+            sim.ms5837.time.sleep(1.0)
+            assert time.monotonic() - real < 0.5
+            assert sim.ms5837.time.monotonic() - start >= 1.0
+            assert sim.ms5837.time.perf_counter is time.perf_counter
+        finally:
+            clock.uninstall()
+        assert sim.ms5837.time is time
+
+
+class TestSimSensors:
+    """Tests pour les capteurs simulés"""
+
+    def test_profile_interpolation(self):
+        profile = DiveProfile.square(depth=18, bottom_min=10, surface_s=10)
+
+        assert profile.depth(0) == 0.0
+        assert profile.depth(10 + 30) == pytest.approx(9.0)  # Descente à 18 m/min
+        assert profile.depth(10 + 60 + 300) == 18.0
+        assert profile.depth(profile.duration + 100) == 0.0
+
+    def test_ms5837_reports_profile_depth(self):
+        sensor = SimMS5837(DiveProfile([(0, 12.0), (1, 12.0)]))
+
+        assert sensor.read(0, idle=Mock())
+        assert sensor.depth() == pytest.approx(12.0)
+        assert sensor.pressure() == pytest.approx(1013.0 + 12.0 * 997 * 9.80665 / 100)
+        assert sensor.temperature() == pytest.approx(20.0 - 0.2 * 12.0)
+
+    def test_magnetometer_heading_after_calibration(self):
+        calibrator = CompassCalibrator("unused.json")
+        for heading in range(0, 360, 10):
+            x, y, _ = SimMagnetometer(heading=heading).raw()
+            calibrator.add_sample(x, y)
+        calibrator.save = Mock()
+        assert calibrator.finish()
+
+        data = SimMagnetometer(heading=123.0).read_i2c_block_data(0x0D, 0x00, 6)
+        x = (data[0] | data[1] << 8) - (65536 if data[1] & 0x80 else 0)
+        y = (data[2] | data[3] << 8) - (65536 if data[3] & 0x80 else 0)
+        x, y = calibrator.correct(x, y)
+        assert math.degrees(math.atan2(y, x)) % 360 == pytest.approx(123.0, abs=1.0)
+
+    def test_magnetometer_data_read_clears_drdy(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(sim.magnetometer, "time", Mock(monotonic=lambda: now[0]))
+        sensor = SimMagnetometer(odr_hz=10.0)
+
+        assert sensor.read_i2c_block_data(0x0D, 0x06, 1) == [0x01]
+        assert sensor.read_i2c_block_data(0x0D, 0x06, 1) == [0x01]  # État seul
+        sensor.read_i2c_block_data(0x0D, 0x00, 6)
+        assert sensor.read_i2c_block_data(0x0D, 0x06, 1) == [0x00]
+        now[0] = 0.1  # Mesure suivante
+        assert sensor.read_i2c_block_data(0x0D, 0x06, 1) == [0x01]
+        # Lecture groupée données + état : DRDY déjà effacé
+        assert sensor.read_i2c_block_data(0x0D, 0x00, 7)[6] == 0x00
+
+    def test_gpio_press_calls_callback(self):
+        gpio = SimGPIO()
+        callback = Mock()
+        assert not gpio.press(5)
+
+        gpio.add_event_detect(5, gpio.RISING, callback=callback)
+
+        assert gpio.ready.is_set()
+        assert gpio.press(5)
+        callback.assert_called_once_with(5)
+
+    def test_long_back_press(self):
+        gpio = SimGPIO()
+        display = Mock()
+        bm = ButtonManager(display, Mock(), gpio)
+        gpio.add_event_detect(26, gpio.RISING, callback=bm.action)
+
+        gpio.press(26)  # Appui bref : relâché aussitôt
+        bm.check_long_press()
+        assert bm.back_since is None
+
+        gpio.press(26, hold=True)
+        bm.check_long_press()
+        display.press_back_long.assert_not_called()
+        bm.back_since -= DIAG_HOLD_S
+        bm.check_long_press()
+        gpio.release(26)
+
+        assert display.press_back.call_count == 2
+        display.press_back_long.assert_called_once_with()
+
+
+class TestSimRun:
+    """Exécution complète du firmware sur les backends simulés"""
+
+    def test_full_dive(self, tmp_path, monkeypatch):
+        (tmp_path / "logs").mkdir()
+        monkeypatch.chdir(tmp_path)
+        profile = DiveProfile([(0, 0.0), (10, 5.0), (40, 5.0), (60, 0.0)])
+
+        display, gpio, (sim_s, real_s) = run(profile, speed=50.0, noise_m=0.0)
+
+        records = [r for r in read_log(LOG_FILE) if "profondeur_m" in r]
+        assert len(gpio.presses) == 9
+        assert sim_s > profile.duration
+        assert len(records) > 60  # Au moins 1 Hz sur la plongée
+        max_depth = max(r["profondeur_m"] for r in records)
+        assert max_depth == pytest.approx(5.6, abs=0.3)  # Dépassement du filtre
+        assert all(r["azimut_deg"] >= 0 for r in records)  # Compas calibré
+        assert display.frames > 0
+        assert len(display.frame_times) == display.frames
@@ -0,0 +1,468 @@
+import json
+import math
+import numpy as np
+import pytest
+
+from utils.deco_numpy import VectorTissueState, ceiling, integrate_profile
+from utils.metrics import NULL_TIMER, LatencyHistogram, MetricsRegistry
+from utils.sample import Sample
+from utils.sample_buffer import SampleBuffer
+from utils.vertical_speed import VerticalSpeedEstimator
+from utils.utils import (
+    DECO,
+    K_N2,
+    NDL_MAX_MIN,
+    DecayCache,
+    TissueState,
+    buehlmann_zhl16c_ndl_palier,
+    schreiner_equation,
+    time_to_surface,
+    update_compartments,
+)
+
+AIR = {"O2": 0.21, "N2": 0.79, "He": 0.0}
+
+
+def make_sample(t, depth):
+    return Sample(t=t, profondeur_m=depth)
+
+
+class TestSampleBuffer:
+
+    def test_bounded_capacity(self):
+        buffer = SampleBuffer(3)
+        for i in range(5):
+            buffer.append(make_sample(i, i))
+
+        assert len(buffer) == 3
+        assert buffer.all()["t"].tolist() == [2, 3, 4]
+        assert buffer.count == 5
+
+    def test_views(self):
+        buffer = SampleBuffer(10)
+        for i, depth in enumerate([1.0, 5.0, 3.0, 2.0]):
+            buffer.append(make_sample(i, depth))
+
+        assert buffer.last(2)["t"].tolist() == [2, 3]
+        assert len(buffer.last(10)["t"]) == 4
+        assert buffer.since(1)["t"].tolist() == [2, 3]
+        assert buffer.since(1)["profondeur_m"].tolist() == [3.0, 2.0]
+        assert len(buffer.since(3)["t"]) == 0
+        assert buffer.latest() == Sample(t=3, profondeur_m=2.0)
+        assert buffer.max_depth == 5.0
+
+    def test_views_after_wraparound(self):
+        buffer = SampleBuffer(4)
+        for i in range(7):
+            buffer.append(make_sample(i, i / 2))
+
+        assert buffer.all()["t"].tolist() == [3, 4, 5, 6]
+        assert buffer.since(4.5)["t"].tolist() == [5, 6]
+        assert buffer.since(-1)["profondeur_m"].tolist() == [1.5, 2.0, 2.5, 3.0]
+        assert buffer.last(3)["t"].tolist() == [4, 5, 6]
+        assert buffer.latest().t == 6
+
+    def test_max_depth_survives_eviction(self):
+        buffer = SampleBuffer(2)
+        for i, depth in enumerate([10.0, 1.0, 2.0]):
+            buffer.append(make_sample(i, depth))
+
+        assert buffer.max_depth == 10.0
+
+    def test_clear(self):
+        buffer = SampleBuffer(10)
+        buffer.append(make_sample(0, 4.0))
+        generation = buffer.generation
+
+        buffer.clear()
+
+        assert len(buffer) == 0
+        assert buffer.latest() is None
+        assert buffer.max_depth is None
+        assert buffer.generation == generation + 1
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(10e-6)
+        histogram.record(0.02)
+
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["max"] == 0.02
+        assert 10e-6 <= summary["p50"] < 13e-6
+        assert 10e-6 <= summary["p99"] < 13e-6
+        assert histogram.percentile(100) == 0.02
+
+    def test_empty_and_reset(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) is None
+        histogram.record(5.0)  # Au-delà du dernier seau
+        assert histogram.percentile(50) == 5.0
+        histogram.reset()
+        assert histogram.summary()["count"] == 0
+
+
+class TestMetricsRegistry:
+
+    def test_disabled_records_nothing(self):
+        metrics = MetricsRegistry(path=None)
+        assert metrics.timer("deco") is NULL_TIMER
+        with metrics.timer("deco"):
+            pass
+        metrics.count("display.frames")
+        metrics.record("log.write", 0.01)
+
+        assert metrics.snapshot()["timers"] == {}
+        assert metrics.snapshot()["counters"] == {}
+        assert metrics.tick() is False
+
+    def test_timers_counters_and_dump(self, tmp_path):
+        path = tmp_path / "stats.json"
+        metrics = MetricsRegistry(path=str(path), interval=0.0, enabled=True)
+        for _ in range(3):
+            with metrics.timer("deco"):
+                pass
+        metrics.count("display.bytes", 100)
+        metrics.count("display.bytes", 20)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["timers"]["deco"]["count"] == 3
+        assert snapshot["counters"] == {"display.bytes": 120}
+
+        assert metrics.tick()
+        assert metrics.last["counters"] == {"display.bytes": 120}
+        assert metrics.snapshot()["timers"]["deco"]["count"] == 0  # Nouvelle fenêtre
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["timers"]["deco"]["count"] == 3
+
+    def test_close_dumps_current_window(self, tmp_path):
+        path = tmp_path / "stats.json"
+        metrics = MetricsRegistry(path=str(path), interval=60.0, enabled=True)
+        metrics.count("main.overrun")
+        assert not metrics.tick()  # Fenêtre non écoulée
+
+        metrics.close()
+
+        assert not metrics.enabled
+        assert metrics.last["counters"] == {"main.overrun": 1}
+        assert len(path.read_text().splitlines()) == 1
+
+    def test_stats_file_is_rotated(self, tmp_path):
+        path = tmp_path / "stats.json"
+        metrics = MetricsRegistry(
+            path=str(path), interval=0.0, enabled=True, max_bytes=300
+        )
+        for _ in range(20):
+            metrics.count("display.frames")
+            metrics.close()
+            metrics.enable()
+
+        assert path.stat().st_size < 600
+        assert (tmp_path / "stats.json.1").stat().st_size < 600
+        assert len(list(tmp_path.iterdir())) == 2
+
+
+class TestVerticalSpeedEstimator:
+
+    def test_linear_descent(self):
+        estimator = VerticalSpeedEstimator(window_s=4.0)
+        for i in range(50):
+            t = 1.7e9 + i * 0.2  # Temps epoch : précision des sommes
+            estimator.update(t, 10.0 + 18.0 * i * 0.2 / 60.0)
+
+        assert estimator.rate == pytest.approx(18.0, rel=1e-6)
+        assert estimator.smoothed == pytest.approx(18.0, rel=1e-6)
+        assert len(estimator.samples) <= 4.0 / 0.2 + 2
+
+    def test_noise_is_smoothed(self):
+        estimator = VerticalSpeedEstimator(window_s=4.0, alpha=0.3)
+        rng = np.random.default_rng(0)
+        endpoint = []
+        for i in range(300):
+            depth = 20.0 + rng.normal(0.0, 0.02)  # Profondeur stable bruitée
+            estimator.update(i * 0.2, depth)
+            endpoint.append(depth)
+        # Ancienne méthode : différence des extrémités sur 5 mesures
+        naive = (endpoint[-1] - endpoint[-5]) / (0.8 / 60.0)
+
+        assert abs(estimator.smoothed) < 0.5
+        assert abs(estimator.smoothed) < abs(naive)
+
+    def test_resync_and_reset(self):
+        estimator = VerticalSpeedEstimator(window_s=2.0)
+        for i in range(1000):
+            estimator.update(i * 0.1, -6.0 * i * 0.1 / 60.0)
+        assert estimator.rate == pytest.approx(-6.0, rel=1e-6)
+        estimator.update(50.0, 0.0)  # Hors ordre : ignorée
+        assert estimator.rate == pytest.approx(-6.0, rel=1e-6)
+
+        estimator.reset()
+        assert estimator.update(0.0, 5.0) == 0.0
+        assert not estimator.ready
+
+
+def square_profile(bottom_min, depth=30.0, period=1.0):
+    """Profil carré : descente à 20 m/min puis palier au fond."""
+    profile = []
+    for i in range(int(bottom_min * 60 / period) + 1):
+        t = i * period
+        profile.append(
+            {"t": t, "timestamp": f"{t:012.1f}", "profondeur_m": min(depth, t / 3.0)}
+        )
+    return profile
+
+
+class TestDecayCache:
+
+    def test_cached_factors(self):
+        cache = DecayCache(K_N2, size=2)
+        e, g = cache.get(0.2)
+
+        assert cache.get(0.2) is not None
+        assert cache.hits == 1 and cache.misses == 1
+        assert e[0] == pytest.approx(math.exp(-K_N2[0] * 0.2))
+        assert g[0] == pytest.approx((1 - e[0]) / K_N2[0])
+
+    def test_lru_bound(self):
+        cache = DecayCache(K_N2, steps=[0.2, 1.0, 60.0], size=2)
+        for dt in (0.2, 1.0, 60.0, 0.2):
+            cache.get(dt)
+
+        assert len(cache.entries) == 2
+        assert cache.misses == 4  # 0.2 a été évincé par 60.0
+
+    def test_only_nominal_steps_are_cached(self):
+        cache = DecayCache(K_N2, steps=[0.2], tolerance=0.005)
+        cache.get(0.2)
+        cache.get(0.203)  # Gigue autour de la période nominale
+        e, _ = cache.get(0.37)
+        cache.get(3600.0)
+
+        assert cache.misses == 2 and cache.exact == 2
+        assert e[0] == math.exp(-K_N2[0] * 0.37)
+        assert len(cache.entries) == 2
+        assert cache.size == 11  # Toutes les clés autour du pas nominal
+
+    def test_hit_rate_on_jittered_dive(self, monkeypatch):
+        cache = DecayCache(K_N2)
+        monkeypatch.setattr("utils.utils.DECAY_N2", cache)
+        state = TissueState(AIR)
+        t = 0.0
+        for i in range(int(45 * 60 / 0.2)):
+            t += 0.2 + (0.003 if i % 3 == 0 else -0.002)  # Période 5 Hz avec gigue
+            state.advance(t, min(40.0, t / 3.0))
+            state.ndl_palier_tpalier()  # Plans de décompression (pas du planificateur)
+
+        assert state.next_stop() > 0
+        assert cache.hit_rate() > 0.95
+        assert len(cache.entries) <= cache.size
+
+    def test_update_matches_schreiner(self):
+        Pn2, _ = update_compartments([0.75] * 16, [0.0] * 16, 0.74, 0, 1.5, 0, 0.2)
+
+        for i in range(16):
+            rate = (1.5 - 0.74) / 0.2
+            expected = schreiner_equation(0.75, 0.74, rate, K_N2[i], 0.2)
+            assert Pn2[i] == pytest.approx(expected, rel=1e-9)
+
+
+class TestTissueState:
+
+    def test_schreiner_is_continuous(self):
+        assert schreiner_equation(1.2, 0.74, 0.01, 0.002, 0.0) == pytest.approx(1.2)
+
+    def test_incremental_matches_batch(self):
+        profile = square_profile(25)
+        state = TissueState(AIR)
+        for rec in profile:
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        assert state.ndl_palier_tpalier() == buehlmann_zhl16c_ndl_palier(profile, AIR)
+
+    def test_batch_does_not_modify_profile(self):
+        profile = [
+            {"timestamp": "2025-06-01T10:00:00Z", "profondeur_m": 0.0},
+            {"timestamp": "2025-06-01T10:05:00Z", "profondeur_m": 20.0},
+        ]
+        copy = [dict(rec) for rec in profile]
+
+        assert buehlmann_zhl16c_ndl_palier(profile, AIR)[1:] == ("-", "-")
+        assert profile == copy
+
+    def test_short_dive_has_no_stop(self):
+        state = TissueState(AIR)
+        for rec in square_profile(5):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        assert state.ceiling() == 0.0
+        assert state.ndl_palier_tpalier()[1:] == ("-", "-")
+
+    def test_long_dive_requires_stop(self):
+        state = TissueState(AIR)
+        for rec in square_profile(40):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        assert state.next_stop() > 0
+        assert state.next_stop() % 3 == 0
+
+    @pytest.mark.parametrize("gaz", [AIR, {"O2": 0.21, "N2": 0.44, "He": 0.35}])
+    def test_ndl_matches_stop_onset(self, gaz):
+        state = TissueState(gaz)
+        state.advance(0.0, 0.0)
+        state.advance(90.0, 30.0)
+        ndl = state.ndl()
+        assert 0 < ndl < NDL_MAX_MIN
+
+        state.advance(90.0 + ndl * 60 - 5, 30.0)
+        assert state.next_stop() == 0.0
+        state.advance(90.0 + ndl * 60 + 5, 30.0)
+        assert state.next_stop() > 0.0
+
+    @pytest.mark.parametrize("depth, reference", [(30.0, 17.0), (40.0, 9.0)])
+    def test_ndl_matches_reference(self, depth, reference):
+        # Tables ZHL-16C GF 100/100, air, descente instantanée
+        state = TissueState(AIR, 1.0, 1.0)
+        state.advance(0.0, 0.0)
+        state.advance(0.01, depth)
+
+        assert state.ndl() == pytest.approx(reference, abs=1.0)
+
+    def test_ndl_uses_gf_high(self):
+        state = TissueState(AIR, 0.3, 0.85)
+        state.advance(0.0, 0.0)
+        state.advance(0.01, 40.0)
+
+        assert 5.0 < state.ndl() < 9.0  # GF haut : 85 % de la marge GF 100/100
+
+    def test_ndl_bounds(self):
+        shallow = TissueState(AIR)
+        shallow.advance(0.0, 5.0)
+        assert shallow.ndl() == NDL_MAX_MIN
+        assert shallow.ndl_palier_tpalier() == ("99", "-", "-")
+
+        deco = TissueState(AIR)
+        for rec in square_profile(40):
+            deco.advance(rec["t"], rec["profondeur_m"])
+        assert deco.ndl() == 0.0
+
+    def test_out_of_order_sample_is_ignored(self):
+        state = TissueState(AIR)
+        state.advance(10.0, 0.0)
+        state.advance(20.0, 10.0)
+        pn2 = list(state.Pn2)
+
+        state.advance(15.0, 30.0)
+
+        assert state.Pn2 == pn2
+        assert state.t == 20.0
+
+
+class TestDecoPlanner:
+
+    def test_schedule(self):
+        state = TissueState(AIR)
+        for rec in square_profile(40):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        plan = state.plan()
+        depths = [depth for depth, _ in plan["stops"]]
+
+        assert depths == sorted(depths, reverse=True)
+        assert all(depth % 3 == 0 and minutes > 0 for depth, minutes in plan["stops"])
+        assert plan["tts"] >= sum(minutes for _, minutes in plan["stops"]) + 3
+        ndl, stop, stop_time = state.ndl_palier_tpalier()
+        assert (stop, stop_time) == (
+            f"{int(depths[0]):02d}",
+            f"{plan['stops'][0][1]:02d}",
+        )
+
+    def test_plan_clears_ceiling(self):
+        state = TissueState(AIR)
+        for rec in square_profile(40):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        sim = state.copy()
+        for depth, minutes in state.plan()["stops"]:
+            state.planner.ascend(sim, depth)
+            sim.advance(sim.t + minutes * 60, depth)
+            assert sim.next_stop() <= depth - 3
+
+    def test_time_to_surface(self, monkeypatch):
+        state = TissueState(AIR)
+        for rec in square_profile(40):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        monkeypatch.setitem(DECO, "state", state)
+        assert time_to_surface() == f"{state.plan()['tts']:02d}"
+        monkeypatch.setitem(DECO, "state", None)
+        assert time_to_surface() == "-"
+
+    def test_memoization(self):
+        state = TissueState(AIR)
+        for rec in square_profile(40):
+            state.advance(rec["t"], rec["profondeur_m"])
+
+        state.plan()
+        state.advance(state.t + 1.0, state.depth)
+        state.plan()
+        assert state.planner.computations == 1
+
+        state.advance(state.t + 60.0, state.depth - 5.0)
+        state.plan()
+        assert state.planner.computations == 2
+
+
+class TestDecoNumpy:
+
+    def test_integrate_profile_matches_incremental(self):
+        profile = square_profile(30, period=0.2)
+        times = [rec["t"] for rec in profile]
+        depths = [rec["profondeur_m"] for rec in profile]
+        state = TissueState(AIR)
+        for t, depth in zip(times, depths):
+            state.advance(t, depth)
+
+        Pn2, Phe = integrate_profile(times, depths, AIR)
+
+        np.testing.assert_allclose(Pn2, state.Pn2, rtol=1e-9)
+        np.testing.assert_allclose(Phe, state.Phe, atol=1e-12)
+        pamb = 1.0 + depths[-1] * 0.0980665
+        assert ceiling(Pn2, Phe, pamb, 0.3, 0.85) == pytest.approx(state.ceiling())
+
+    def test_history_and_long_gap(self):
+        times = [0.0, 60.0, 1200.0, 50000.0]
+        depths = [0.0, 20.0, 20.0, 0.0]
+
+        Pn2_hist, Phe_hist = integrate_profile(times, depths, AIR, history=True)
+        Pn2, _ = integrate_profile(times, depths, AIR)
+
+        assert Pn2_hist.shape == (3, 16)
+        np.testing.assert_allclose(Pn2_hist[-1], Pn2)
+        assert np.all(np.isfinite(Pn2_hist))
+
+    def test_vector_state_matches_scalar_state(self):
+        state = TissueState(AIR)
+        vector = VectorTissueState(AIR)
+        chunked = VectorTissueState(AIR)
+        profile = square_profile(20)
+        for rec in profile:
+            state.advance(rec["t"], rec["profondeur_m"])
+            vector.advance(rec["t"], rec["profondeur_m"])
+        half = len(profile) // 2
+        for part in (profile[:half], profile[half:]):
+            chunked.advance_profile(
+                [rec["t"] for rec in part], [rec["profondeur_m"] for rec in part]
+            )
+
+        np.testing.assert_allclose(vector.Pn2, state.Pn2, rtol=1e-9)
+        np.testing.assert_allclose(chunked.Pn2, state.Pn2, rtol=1e-9)
+        assert vector.next_stop() == state.next_stop()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])